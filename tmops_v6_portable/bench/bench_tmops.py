@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# bench/bench_tmops.py
+# Benchmark the checkpoint tools against a synthetic .tmops tree and write JSON results
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+import threading
+import statistics
+import subprocess
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Callable
+
+BENCH_DIR = Path(__file__).resolve().parent
+PACKAGE_DIR = BENCH_DIR.parent
+TOOLS_DIR = PACKAGE_DIR / "tmops_tools"
+sys.path.insert(0, str(TOOLS_DIR))
+sys.path.insert(0, str(BENCH_DIR))
+
+from generate_tmops_tree import generate_tree, parse_size  # noqa: E402
+from monitor_checkpoints import CheckpointMonitor  # noqa: E402
+from checkpoint_index import INDEX_FILENAME  # noqa: E402
+from extract_metrics import MetricsExtractor, extract_fleet_metrics  # noqa: E402
+
+RESULTS_VERSION = 1
+BENCH_FEATURE = "feature-000"
+BENCH_ROLE = "bench"
+
+
+def _summarize(samples: List[float]) -> Dict[str, Any]:
+    """Reduce timing samples (seconds) to the figures we track"""
+    return {"runs": len(samples), "min": min(samples), "median": statistics.median(samples),
+            "max": max(samples), "unit": "s"}
+
+
+def _time(fn: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """Time fn repeat times, running setup (untimed) before each call"""
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return _summarize(samples)
+
+
+def _remove(path: Path):
+    """Delete a file if present"""
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _drop_index(monitor: CheckpointMonitor):
+    """Close and delete the feature's checkpoint index so the next listing rebuilds it"""
+    if monitor._index is not None:
+        monitor._index.close()
+        monitor._index = None
+    _remove(monitor.feature_dir / INDEX_FILENAME)
+
+
+def bench_wait_latency(monitor: CheckpointMonitor, repeat: int, delay: float = 0.2) -> Dict[str, Any]:
+    """
+    Time from a checkpoint being written to wait_for_checkpoint returning it
+
+    Args:
+        monitor: Monitor of the benchmark feature
+        repeat: Number of waits
+        delay: Seconds the writer sleeps before writing, so the waiter is already blocked
+
+    Returns:
+        Latency summary
+    """
+    samples = []
+    for i in range(repeat):
+        name = f"900-bench-{i:03d}.md"
+        written: Dict[str, float] = {}
+
+        def writer():
+            time.sleep(delay)
+            (monitor.checkpoint_dir / name).write_text(f"# Checkpoint: {name}\n")
+            written["at"] = time.perf_counter()
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        monitor.wait_for_checkpoint_file(name, timeout=60)
+        found = time.perf_counter()
+        thread.join()
+        samples.append(max(found - written["at"], 0.0))
+        _remove(monitor.checkpoint_dir / name)
+    return _summarize(samples)
+
+
+def bench_list_features(root: Path, repeat: int) -> Optional[Dict[str, Any]]:
+    """Time list_features.sh over the tree (None when bash or git is missing)"""
+    if not shutil.which("bash") or not shutil.which("git"):
+        return None
+    if not (root / ".git").exists():
+        subprocess.run(["git", "init", "-q", str(root)], check=True)
+    script = str(TOOLS_DIR / "list_features.sh")
+    return _time(lambda: subprocess.run(["bash", script], cwd=root, stdout=subprocess.DEVNULL,
+                                        stderr=subprocess.DEVNULL), repeat)
+
+
+def run_benchmarks(root: Path, repeat: int, jobs: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Run every benchmark against <root>/.tmops
+
+    The tools resolve ../.tmops from the working directory, so this chdirs into
+    <root>/work for the duration.
+
+    Args:
+        root: Project root containing a generated .tmops tree
+        repeat: Samples per benchmark
+        jobs: Worker processes for the fleet extraction
+
+    Returns:
+        Timing summaries keyed by benchmark name
+    """
+    work = root / "work"
+    work.mkdir(exist_ok=True)
+    old_cwd = os.getcwd()
+    os.chdir(work)
+    try:
+        monitor = CheckpointMonitor(BENCH_FEATURE, BENCH_ROLE)
+        results: Dict[str, Dict[str, Any]] = {}
+
+        results["list_checkpoints.cold"] = _time(monitor.list_checkpoints, repeat,
+                                                 setup=lambda: _drop_index(monitor))
+        results["list_checkpoints.warm"] = _time(monitor.list_checkpoints, repeat)
+
+        results["extract_all_metrics.uncached"] = _time(
+            lambda: MetricsExtractor(BENCH_FEATURE, use_cache=False).extract_all_metrics(), repeat)
+        cache_file = MetricsExtractor(BENCH_FEATURE).cache_file
+        results["extract_all_metrics.cold_cache"] = _time(
+            lambda: MetricsExtractor(BENCH_FEATURE).extract_all_metrics(), repeat,
+            setup=lambda: _remove(cache_file))
+        results["extract_all_metrics.warm_cache"] = _time(
+            lambda: MetricsExtractor(BENCH_FEATURE).extract_all_metrics(), repeat)
+
+        extractor = MetricsExtractor(BENCH_FEATURE)
+        metrics = extractor.extract_all_metrics()
+        results["generate_report"] = _time(lambda: extractor.generate_report(metrics), repeat)
+
+        tmops_dir = Path("../.tmops")
+        results["extract_fleet_metrics.uncached"] = _time(
+            lambda: extract_fleet_metrics(tmops_dir, jobs, use_cache=False), repeat)
+
+        results["wait_for_checkpoint.detect_latency"] = bench_wait_latency(monitor, repeat)
+        results["wait_for_checkpoint.existing"] = _time(
+            lambda: monitor.wait_for_checkpoint("001-*.md", timeout=5), repeat)
+
+        list_features = bench_list_features(root, repeat)
+        if list_features:
+            results["list_features.sh"] = list_features
+
+        monitor.logger.flush()
+        return results
+    finally:
+        os.chdir(old_cwd)
+
+
+def _tmops_version() -> Optional[str]:
+    """Version from package.json, if readable"""
+    try:
+        return json.loads((PACKAGE_DIR / "package.json").read_text()).get("version")
+    except (OSError, ValueError):
+        return None
+
+
+def _git_commit() -> Optional[str]:
+    """Current commit of the checkout being benchmarked, if any"""
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PACKAGE_DIR,
+                             capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> str:
+    """
+    Render median changes against an earlier results file
+
+    Args:
+        current: Results of this run
+        baseline: Results loaded from an earlier run
+
+    Returns:
+        A plain-text table
+    """
+    lines = [f"{'benchmark':40} {'baseline':>12} {'current':>12} {'change':>8}"]
+    for name, result in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if not old:
+            lines.append(f"{name:40} {'-':>12} {result['median']:>12.6f} {'new':>8}")
+            continue
+        change = (result["median"] - old["median"]) / old["median"] * 100 if old["median"] else 0.0
+        lines.append(f"{name:40} {old['median']:>12.6f} {result['median']:>12.6f} {change:>+7.1f}%")
+    return "\n".join(lines)
+
+
+def main():
+    """Command-line interface for the benchmark harness"""
+    parser = argparse.ArgumentParser(description="Benchmark TeamOps checkpoint tools on a synthetic tree")
+    parser.add_argument("--features", type=int, default=10, help="Number of features")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per feature")
+    parser.add_argument("--checkpoints", type=int, default=16, help="Checkpoints per run")
+    parser.add_argument("--min-size", default="2K", help="Smallest checkpoint size")
+    parser.add_argument("--max-size", default="2M", help="Largest checkpoint size")
+    parser.add_argument("--archive-depth", type=int, default=2, help="Archived runs per feature")
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per benchmark")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes for the fleet extraction")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the tree")
+    parser.add_argument("--root", help="Reuse or keep the tree here instead of a temporary directory")
+    parser.add_argument("--output", default="bench_results.json", help="Results file (default: %(default)s)")
+    parser.add_argument("--compare", help="Earlier results file to compare medians against")
+
+    args = parser.parse_args()
+
+    try:
+        min_size, max_size = parse_size(args.min_size), parse_size(args.max_size)
+    except ValueError as e:
+        print(f"Error: Invalid size ({e})", file=sys.stderr)
+        sys.exit(1)
+
+    root = Path(args.root).resolve() if args.root else Path(tempfile.mkdtemp(prefix="tmops-bench-"))
+    try:
+        print(f"Generating tree in {root}...", file=sys.stderr)
+        if (root / ".tmops").exists():
+            tree = {"root": str(root), "reused": True}
+        else:
+            tree = generate_tree(root, args.features, args.runs, args.checkpoints, min_size, max_size,
+                                 args.archive_depth, args.seed)
+        print("Running benchmarks...", file=sys.stderr)
+        results = run_benchmarks(root, args.repeat, args.jobs)
+    finally:
+        if not args.root:
+            shutil.rmtree(root, ignore_errors=True)
+
+    report = {
+        "results_version": RESULTS_VERSION,
+        "timestamp": datetime.now().isoformat(),
+        "tmops_version": _tmops_version(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "root")},
+        "tree": tree,
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2))
+
+    for name, result in results.items():
+        print(f"{name:40} median {result['median'] * 1000:10.3f} ms  (min {result['min'] * 1000:.3f}, "
+              f"max {result['max'] * 1000:.3f}, n={result['runs']})")
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        try:
+            baseline = json.loads(Path(args.compare).read_text())
+        except (OSError, ValueError) as e:
+            print(f"Error: Cannot read baseline {args.compare} ({e})", file=sys.stderr)
+            sys.exit(1)
+        print()
+        print(compare(report, baseline))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# bench/generate_tmops_tree.py
+# Build a synthetic .tmops tree (features, runs, checkpoints, archives) for benchmarks
+
+import os
+import sys
+import random
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List
+
+ROLES = ("orchestrator", "tester", "impl", "verify")
+
+# (suffix, from, to) for a standard run, in protocol order
+CHECKPOINT_SEQUENCE = [
+    ("discovery-trigger", "orchestrator", "working instances"),
+    ("discovery-complete", "tester", "orchestrator"),
+    ("tests-trigger", "orchestrator", "tester"),
+    ("tests-complete", "tester", "orchestrator"),
+    ("impl-trigger", "orchestrator", "impl"),
+    ("impl-complete", "impl", "orchestrator"),
+    ("verify-trigger", "orchestrator", "verify"),
+    ("verify-complete", "verify", "orchestrator"),
+]
+
+
+def parse_size(text: str) -> int:
+    """
+    Parse a byte size such as 4096, 64K, 2M or 1.5MB
+
+    Args:
+        text: Size string
+
+    Returns:
+        Size in bytes
+    """
+    text = text.strip().upper().rstrip("B")
+    for suffix, factor in (("K", 1024), ("M", 1024 ** 2), ("G", 1024 ** 3)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * factor)
+    return int(text)
+
+
+def _body(suffix: str, rng: random.Random) -> str:
+    """Metric lines extract_metrics.py understands for the checkpoint's phase"""
+    if "discovery" in suffix:
+        return f"Files discovered: {rng.randint(10, 500)}\nDirectories: {rng.randint(2, 40)}\n"
+    if suffix == "tests-complete":
+        n = rng.randint(5, 80)
+        return (f"Tests written: {n}\nCreated tests/test_{rng.randint(1, 99)}.py\n"
+                f"Coverage: {rng.uniform(50, 99):.1f}%\nAll tests failing as expected\n")
+    if suffix == "impl-complete":
+        total = rng.randint(5, 80)
+        return (f"Passing: {rng.randint(total // 2, total)}/{total} tests\n"
+                f"Created: src/module_{rng.randint(1, 99)}.py\nModified: src/app.py\n"
+                f"Lines added: {rng.randint(50, 2000)}\nPerformance: {rng.uniform(1, 50):.1f}ms\n")
+    if suffix == "verify-complete":
+        return (f"Issues found: {rng.randint(0, 5)}\nEdge cases: {rng.randint(0, 12)}\n"
+                f"Quality: {rng.choice(['Excellent', 'Good', 'Needs improvement'])}\n"
+                f"No security issues\nRecommend: {rng.choice(['more tests', 'refactor', 'docs'])}\n")
+    return "Proceed to the next phase.\n"
+
+
+def _checkpoint(number: int, suffix: str, src: str, dst: str, feature: str,
+                when: datetime, size: int, rng: random.Random) -> str:
+    """Render one checkpoint padded with log-like lines to roughly size bytes"""
+    text = (f"# Checkpoint: {number:03d}-{suffix}.md\n\n"
+            f"**From:** {src}\n**To:** {dst}\n"
+            f"**Timestamp:** {when.strftime('%Y-%m-%d %H:%M:%S')}\n**Feature:** {feature}\n\n"
+            f"## Content\n{_body(suffix, rng)}\n")
+    if len(text) < size:
+        # Pasted test output is the usual reason checkpoints get large
+        line = "PASSED tests/test_generated.py::test_case_{:07d} [ 42%] in 0.01s\n"
+        padding = ["## Log\n"]
+        total = len(text) + len(padding[0])
+        i = 0
+        while total < size:
+            padding.append(line.format(i))
+            total += len(padding[-1])
+            i += 1
+        text += "".join(padding)
+    return text
+
+
+def _write_run(run_dir: Path, feature: str, checkpoints: int, start: datetime,
+               min_size: int, max_size: int, rng: random.Random) -> int:
+    """Write one run's checkpoints and role logs; return bytes written"""
+    checkpoint_dir = run_dir / "checkpoints"
+    log_dir = run_dir / "logs"
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    log_dir.mkdir(parents=True, exist_ok=True)
+
+    written = 0
+    logs: Dict[str, List[str]] = {role: [] for role in ROLES}
+    when = start
+    for i in range(checkpoints):
+        suffix, src, dst = CHECKPOINT_SEQUENCE[i % len(CHECKPOINT_SEQUENCE)]
+        if i >= len(CHECKPOINT_SEQUENCE):
+            suffix = f"{suffix}-{i // len(CHECKPOINT_SEQUENCE) + 1}"
+        size = int(min_size * (max_size / min_size) ** rng.random()) if max_size > min_size else min_size
+        text = _checkpoint(i + 1, suffix, src, dst, feature, when, size, rng)
+        name = f"{i + 1:03d}-{suffix}.md"
+        (checkpoint_dir / name).write_text(text)
+        written += len(text)
+
+        stamp = when.strftime("%Y-%m-%d %H:%M:%S")
+        logs[src].append(f"[{stamp}] [INFO] Created checkpoint: {name}")
+        for role in ROLES:
+            if role != src and (dst == role or dst == "working instances"):
+                logs[role].append(f"[{stamp}] [INFO] Found checkpoint: {name}")
+        when += timedelta(minutes=rng.randint(1, 30))
+
+    for role, lines in logs.items():
+        (log_dir / f"{role}.log").write_text("\n".join(lines) + ("\n" if lines else ""))
+    return written
+
+
+def generate_tree(root: Path, features: int = 3, runs: int = 2, checkpoints: int = 8,
+                  min_size: int = 2048, max_size: int = 2048, archive_depth: int = 1,
+                  seed: int = 0) -> Dict[str, Any]:
+    """
+    Build <root>/.tmops with the given shape
+
+    Every feature gets `runs` runs under runs/ (the last one linked as current),
+    `archive_depth` archived runs under <feature>/.archive/, and one extra archived
+    copy under .tmops/.archive/ as cleanup_safe.sh leaves them when depth > 1.
+
+    Args:
+        root: Project root to create .tmops in
+        features: Number of features
+        runs: Runs per feature
+        checkpoints: Checkpoints per run
+        min_size: Smallest checkpoint size in bytes
+        max_size: Largest checkpoint size in bytes (sizes are log-uniform in between)
+        archive_depth: Archived runs per feature
+        seed: Random seed, so trees are reproducible
+
+    Returns:
+        Summary with counts and total bytes
+    """
+    rng = random.Random(seed)
+    tmops = Path(root) / ".tmops"
+    tmops.mkdir(parents=True, exist_ok=True)
+    base = datetime(2025, 1, 1, 9, 0, 0)
+    total_bytes = 0
+    total_checkpoints = 0
+    feature_lines = []
+
+    for f in range(features):
+        feature = f"feature-{f:03d}"
+        feature_dir = tmops / feature
+        start = base + timedelta(days=f)
+
+        for r in range(runs):
+            run = "initial" if r == 0 else f"run-{r:03d}"
+            total_bytes += _write_run(feature_dir / "runs" / run, feature, checkpoints,
+                                      start + timedelta(hours=r), min_size, max_size, rng)
+            total_checkpoints += checkpoints
+        # Shell tools follow <feature>/current, the Python tools runs/current
+        for link, target in ((feature_dir / "current", f"runs/{run}"), (feature_dir / "runs" / "current", run)):
+            if link.is_symlink():
+                link.unlink()
+            os.symlink(target, link)
+
+        for a in range(archive_depth):
+            # Same naming as run_manager.sh clear: <timestamp>-<run>
+            archived = start - timedelta(days=a + 1)
+            archive = feature_dir / ".archive" / f"{archived.strftime('%Y%m%d-%H%M%S')}-initial"
+            total_bytes += _write_run(archive, feature, checkpoints, archived, min_size, max_size, rng)
+            total_checkpoints += checkpoints
+        if archive_depth > 1:
+            # Same naming as cleanup_safe.sh: .tmops/.archive/<date>-<feature>
+            retired = start - timedelta(days=30)
+            old = tmops / ".archive" / f"{retired.strftime('%Y%m%d')}-{feature}" / "runs" / "initial"
+            total_bytes += _write_run(old, feature, checkpoints, retired, min_size, max_size, rng)
+            total_checkpoints += checkpoints
+
+        feature_lines.append(f"{feature}:active:{start.isoformat()}:feature/{feature}")
+
+    (tmops / "FEATURES.txt").write_text("\n".join(feature_lines) + "\n")
+    return {"root": str(root), "features": features, "runs_per_feature": runs,
+            "checkpoints_per_run": checkpoints, "archive_depth": archive_depth,
+            "checkpoints": total_checkpoints, "bytes": total_bytes}
+
+
+def main():
+    """Command-line interface for the tree generator"""
+    parser = argparse.ArgumentParser(description="Generate a synthetic .tmops tree")
+    parser.add_argument("root", help="Project root to create .tmops in")
+    parser.add_argument("--features", type=int, default=3, help="Number of features")
+    parser.add_argument("--runs", type=int, default=2, help="Runs per feature")
+    parser.add_argument("--checkpoints", type=int, default=8, help="Checkpoints per run")
+    parser.add_argument("--min-size", default="2K", help="Smallest checkpoint size (e.g. 2K)")
+    parser.add_argument("--max-size", default=None, help="Largest checkpoint size (e.g. 4M; default: --min-size)")
+    parser.add_argument("--archive-depth", type=int, default=1, help="Archived runs per feature")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    args = parser.parse_args()
+
+    try:
+        min_size = parse_size(args.min_size)
+        max_size = parse_size(args.max_size) if args.max_size else min_size
+    except ValueError as e:
+        print(f"Error: Invalid size ({e})", file=sys.stderr)
+        sys.exit(1)
+    if max_size < min_size:
+        print("Error: --max-size must not be smaller than --min-size", file=sys.stderr)
+        sys.exit(1)
+
+    summary = generate_tree(Path(args.root), args.features, args.runs, args.checkpoints,
+                            min_size, max_size, args.archive_depth, args.seed)
+    print(f"Generated {summary['checkpoints']} checkpoints ({summary['bytes'] / 1024 / 1024:.1f} MiB) "
+          f"in {args.root}/.tmops")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@
  TeamOps CLI (portable)
  - demo-gherkin: create a tiny curated doc and extract runnable features
  - bdd-scaffold: wrapper around tmops_tools/bdd_scaffold.sh
+ - broker: wrapper around tmops_tools/checkpoint_broker.py
+ - status: wrapper around tmops_tools/feature_status.py
 */
 
 const fs = require('fs');
@@ -29,6 +31,16 @@ function runBash(scriptPath, args = []) {
   });
 }
 
+function runPython(scriptPath, args = []) {
+  // Python tools resolve ../.tmops relative to the package directory
+  return new Promise((resolve, reject) => {
+    const proc = spawn('python3', [scriptPath, ...args], { stdio: 'inherit', cwd: portableDir() });
+    proc.on('exit', (code) => {
+      if (code === 0) resolve(); else reject(new Error(`Exit ${code}`));
+    });
+  });
+}
+
 async function cmdDemoGherkin(argv) {
   const root = projectRoot();
   const docsDir = path.join(root, 'docs', 'product', 'gherkin');
@@ -216,12 +228,25 @@ async function cmdRunManager(argv) {
   await runBash(script, args);
 }
 
+async function cmdBroker(argv) {
+  const args = argv.length ? argv : ['serve'];
+  const script = path.join(portableDir(), 'tmops_tools', 'checkpoint_broker.py');
+  await runPython(script, args);
+}
+
+async function cmdStatus(argv) {
+  const script = path.join(portableDir(), 'tmops_tools', 'feature_status.py');
+  await runPython(script, argv);
+}
+
 async function main() {
   const cmd = process.argv[2];
   if (!cmd || cmd === '-h' || cmd === '--help') {
     console.log('Usage: tmops <command>');
     console.log('  init             Initialize a feature (supports --interactive)');
     console.log('  run-manager      Manage runs: list/new/clear/switch');
+    console.log('  broker           Checkpoint broker daemon: serve/ping/create/list/get/wait/subscribe');
+    console.log('  status           Features, branches and checkpoint counts (--json)');
     console.log('  demo-gherkin     Create a tiny curated doc and extract features');
     console.log('  bdd-scaffold     Extract features from a curated doc (supports --interactive)');
     console.log('  doctor           Environment checks and suggestions');
@@ -236,6 +261,10 @@ async function main() {
       await cmdInit(process.argv.slice(3));
     } else if (cmd === 'run-manager') {
       await cmdRunManager(process.argv.slice(3));
+    } else if (cmd === 'broker') {
+      await cmdBroker(process.argv.slice(3));
+    } else if (cmd === 'status') {
+      await cmdStatus(process.argv.slice(3));
     } else if (cmd === 'demo-gherkin') {
       await cmdDemoGherkin(process.argv.slice(3));
     } else if (cmd === 'bdd-scaffold') {
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# test_async_monitor.py
+# Behavior tests for tmops_tools/async_monitor.py and checkpoint_broker.py
+#
+# Run: python3 -m unittest test_async_monitor  (from tmops_v6_portable/)
+
+import io
+import os
+import sys
+import json
+import asyncio
+import contextlib
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tmops_tools"))
+
+from tmops_test_support import TmopsTestCase  # noqa: E402
+from async_monitor import AsyncCheckpointMonitor  # noqa: E402
+import monitor_checkpoints  # noqa: E402
+from broker_client import BrokerClient  # noqa: E402
+from checkpoint_broker import CheckpointBroker  # noqa: E402
+from monitor_checkpoints import IN_Q_OVERFLOW  # noqa: E402
+
+
+class AsyncTestCase(TmopsTestCase):
+    """A throwaway .tmops tree with feature "demo" (see TmopsTestCase)"""
+
+    def run_async(self, coro, timeout=20):
+        """Run coro on a fresh loop; fails if the loop logged an exception (a stray traceback)"""
+        loop = asyncio.new_event_loop()
+        errors = []
+        loop.set_exception_handler(lambda loop, context: errors.append(context["message"]))
+        try:
+            return loop.run_until_complete(asyncio.wait_for(coro, timeout))
+        finally:
+            # Let connection handlers still winding down finish before the loop goes
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
+            self.assertEqual(errors, [])
+
+    @staticmethod
+    async def collect(arrivals, quiet=1.0):
+        """Names yielded by an arrivals() iterator until it stays quiet for a while"""
+        names = []
+        while True:
+            try:
+                arrival = await asyncio.wait_for(arrivals.__anext__(), quiet)
+            except asyncio.TimeoutError:
+                return names
+            names.append(arrival.name)
+
+    @staticmethod
+    def write(path, text="x"):
+        """Write a file in place, the way a plain editor or shell redirect would"""
+        with open(path, "w") as f:
+            f.write(text)
+
+
+class BrokerSubscribeTest(AsyncTestCase):
+    """Subscribers see each created checkpoint exactly once, and never temp files or sidecars"""
+
+    async def request(self, socket_path, message):
+        reader, writer = await asyncio.open_unix_connection(str(socket_path))
+        writer.write(json.dumps(message).encode() + b"\n")
+        reply = json.loads(await reader.readline())
+        writer.close()
+        return reply
+
+    def test_one_event_per_create(self):
+        socket_path = self.root / "broker.sock"
+        names = ["010-arr.md", "011-arr.md", "012-arr-shard-1-of-2.md"]
+
+        async def scenario():
+            with contextlib.redirect_stdout(io.StringIO()):
+                server = asyncio.ensure_future(CheckpointBroker(socket_path).serve())
+                while not socket_path.exists():
+                    await asyncio.sleep(0.01)
+            reader, writer = await asyncio.open_unix_connection(str(socket_path))
+            writer.write(b'{"op": "subscribe", "feature": "demo"}\n')
+            self.assertTrue(json.loads(await reader.readline())["ok"])
+
+            for name in names:
+                reply = await self.request(socket_path, {"op": "create", "feature": "demo", "role": "tester",
+                                                         "name": name, "content": "x"})
+                self.assertTrue(reply["ok"], reply)
+
+            events = []
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), 1.0)
+                except asyncio.TimeoutError:
+                    break
+                events.append(json.loads(line)["name"])
+            writer.close()
+            server.cancel()
+            await asyncio.gather(server, return_exceptions=True)
+            return events
+
+        self.assertEqual(self.run_async(scenario()), names)
+        self.assertEqual(sorted(p.name for p in self.checkpoint_dir.iterdir()),
+                         sorted(names + [name + ".json" for name in names]))
+        self.assertEqual([p.name for p in self.checkpoint_dir.parent.iterdir() if p.name.endswith(".tmp")], [])
+
+
+class BrokerClientTest(AsyncTestCase):
+    """create, list and get through the client, and monitor_checkpoints.py using a live broker"""
+
+    def serve(self, calls):
+        """Run a broker on the default socket and call calls(socket_path) from a worker thread"""
+        socket_path = self.root / ".tmops" / "broker.sock"
+
+        async def scenario():
+            with contextlib.redirect_stdout(io.StringIO()):
+                server = asyncio.ensure_future(CheckpointBroker(socket_path).serve())
+                while not socket_path.exists():
+                    await asyncio.sleep(0.01)
+            try:
+                return await asyncio.get_running_loop().run_in_executor(None, calls, socket_path)
+            finally:
+                server.cancel()
+                await asyncio.gather(server, return_exceptions=True)
+
+        return self.run_async(scenario())
+
+    @staticmethod
+    def monitor_cli(*argv):
+        """Run monitor_checkpoints.py main() and return its stdout; going to disk fails the test"""
+        out = io.StringIO()
+        with mock.patch.object(sys, "argv", ["monitor_checkpoints.py", "demo", "tester"] + list(argv)), \
+                mock.patch("monitor_checkpoints.CheckpointMonitor", side_effect=AssertionError("used disk")), \
+                contextlib.redirect_stdout(out):
+            monitor_checkpoints.main()
+        return out.getvalue()
+
+    def test_create_list_get(self):
+        def calls(socket_path):
+            with BrokerClient(socket_path) as client:
+                created = client.request("create", feature="demo", role="tester", name="001-a.md", content="hello")
+                listed = client.request("list", feature="demo")["checkpoints"]
+                content = client.request("get", feature="demo", name="001-a.md")["content"]
+                with self.assertRaises(RuntimeError):
+                    client.request("get", feature="demo", name="002-missing.md")
+            return Path(created["path"]).name, listed, content
+
+        name, listed, content = self.serve(calls)
+        self.assertEqual(name, "001-a.md")
+        self.assertEqual(listed, ["001-a.md"])
+        self.assertIn("hello", content)
+        self.assertIn("hello", (self.checkpoint_dir / "001-a.md").read_text())
+
+    def test_monitor_cli_uses_live_broker(self):
+        def calls(socket_path):
+            created = self.monitor_cli("create", "002-b.md", "body")
+            listed = self.monitor_cli("list")
+            header = json.loads(self.monitor_cli("wait", "002-*.md", "--timeout", "5", "--header-only"))
+            return created, listed, header
+
+        created, listed, header = self.serve(calls)
+        self.assertEqual(created, "Created checkpoint: 002-b.md\n")
+        self.assertEqual(listed, "Checkpoints:\n  - 002-b.md\n")
+        self.assertEqual(header["name"], "002-b.md")
+        self.assertEqual(Path(header["path"]).resolve(), self.checkpoint_dir.resolve() / "002-b.md")
+        self.assertIn("tester", (self.runs / "initial" / "logs" / "tester.log").read_text())
+
+    def test_monitor_cli_falls_back_to_disk(self):
+        # A socket file left behind by a broker that is gone
+        (self.root / ".tmops" / "broker.sock").touch()
+        with mock.patch.object(sys, "argv", ["monitor_checkpoints.py", "demo", "tester", "create", "003-c.md", "x"]), \
+                contextlib.redirect_stdout(io.StringIO()):
+            monitor_checkpoints.main()
+        self.assertTrue((self.checkpoint_dir / "003-c.md").exists())
+
+
+class ArrivalsTest(AsyncTestCase):
+    """Event de-duplication, overflow and timer rescans, and polling without inotify"""
+
+    def test_rewrite_in_place_is_not_a_new_arrival(self):
+        async def scenario():
+            async with AsyncCheckpointMonitor("orchestrator") as monitor:
+                arrivals = monitor.arrivals(["demo"])
+                pending = asyncio.ensure_future(self.collect(arrivals))
+                await asyncio.sleep(0.1)
+                self.write(self.checkpoint_dir / "001-a.md")
+                await asyncio.sleep(0.2)
+                self.write(self.checkpoint_dir / "001-a.md", "rewritten")
+                # A replacement renamed into place is a different file
+                self.write(self.checkpoint_dir / ".001-a.md.tmp", "replaced")
+                await asyncio.sleep(0.2)
+                os.rename(self.checkpoint_dir / ".001-a.md.tmp", self.checkpoint_dir / "001-a.md")
+                return await pending
+
+        self.assertEqual(self.run_async(scenario()), ["001-a.md", "001-a.md"])
+
+    def test_overflow_triggers_rescan(self):
+        async def scenario():
+            async with AsyncCheckpointMonitor("orchestrator", rescan_interval=60) as monitor:
+                if monitor._watcher is None:
+                    self.skipTest("inotify unavailable")
+                arrivals = monitor.arrivals(["demo"])
+                pending = asyncio.ensure_future(self.collect(arrivals))
+                await asyncio.sleep(0.1)
+                # Lose the real events without giving the loop a chance to read them
+                self.write(self.checkpoint_dir / "001-a.md")
+                self.write(self.checkpoint_dir / "002-b.md")
+                monitor._watcher.read_events()
+                with mock.patch.object(monitor._watcher, "read_events", return_value=[(None, "", IN_Q_OVERFLOW)]):
+                    monitor._on_inotify()
+                return await pending
+
+        self.assertEqual(self.run_async(scenario()), ["001-a.md", "002-b.md"])
+
+    def test_rescan_follows_repointed_current_run(self):
+        second = self.runs / "second" / "checkpoints"
+        second.mkdir(parents=True)
+
+        async def scenario():
+            async with AsyncCheckpointMonitor("orchestrator", rescan_interval=0.2) as monitor:
+                waiter = asyncio.ensure_future(monitor.wait_for("demo", "003-*.md", timeout=10))
+                await asyncio.sleep(0.1)
+                # run_manager.sh new: re-point runs/current at a fresh run
+                os.symlink("second", self.runs / "current.new")
+                os.rename(self.runs / "current.new", self.runs / "current")
+                await asyncio.sleep(0.5)
+                self.write(self.checkpoint_dir / "003-stale.md")
+                self.write(second / "003-fresh.md")
+                arrival = await waiter
+                # The old run's watch is gone: nothing further arrives from it
+                arrivals = monitor.arrivals(["demo"])
+                pending = asyncio.ensure_future(self.collect(arrivals))
+                await asyncio.sleep(0.1)
+                self.write(self.checkpoint_dir / "004-stale.md")
+                return arrival.name, await pending
+
+        self.assertEqual(self.run_async(scenario()), ("003-fresh.md", []))
+
+    def test_polling_without_inotify(self):
+        async def scenario():
+            with mock.patch("async_monitor.InotifyWatcher.create", return_value=None):
+                monitor = AsyncCheckpointMonitor("orchestrator", poll_interval=0.1)
+            async with monitor:
+                waiter = asyncio.ensure_future(monitor.wait_for("demo", "002-*.md", timeout=10))
+                await asyncio.sleep(0.2)
+                self.write(self.checkpoint_dir / "001-a.md")
+                self.write(self.checkpoint_dir / "002-b.md")
+                self.write(self.checkpoint_dir / ".002-c.md.tmp")
+                return (await waiter).name
+
+        self.assertEqual(self.run_async(scenario()), "002-b.md")
+
+
+class WaitStatsTest(AsyncTestCase):
+    """Async waits are recorded in the role's cumulative wait stats like sync waits"""
+
+    def test_found_and_timeout_waits_are_recorded(self):
+        async def scenario():
+            async with AsyncCheckpointMonitor("orchestrator") as monitor:
+                asyncio.get_running_loop().call_later(0.2, self.write, self.checkpoint_dir / "001-a.md")
+                await monitor.wait_for("demo", "001-*.md", timeout=10)
+                with self.assertRaises(TimeoutError):
+                    await monitor.wait_all([("demo", "001-*.md"), ("demo", "009-*.md")], timeout=0.3)
+                return monitor.monitor("demo").stats.load()
+
+        stats = self.run_async(scenario())
+        self.assertEqual(stats["waits"], {"found": 2, "timeout": 1})
+        self.assertEqual(stats["histograms"]["wait_seconds"]["count"], 3)
+        self.assertEqual(stats["histograms"]["detect_latency_seconds"]["count"], 1)
+        self.assertEqual(stats["last_wait"]["pattern"], "009-*.md")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+# test_extract_metrics.py
+# Golden tests for tmops_tools/extract_metrics.py
+#
+# GOLDEN values were captured from the original per-field regex extractor;
+# any change to checkpoint parsing must keep producing exactly this output.
+# Run: python3 -m unittest test_extract_metrics  (from tmops_v6_portable/)
+
+import os
+import sys
+import json
+import unittest
+import subprocess
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tmops_tools"))
+
+import extract_metrics  # noqa: E402
+from tmops_test_support import TmopsTestCase  # noqa: E402
+from extract_metrics import MetricsExtractor  # noqa: E402
+
+VERIFY_CHECKPOINT = (
+    "# Checkpoint: 007-verify-complete.md\n"
+    "\n"
+    "**Timestamp:** 2025-01-19 11:30:00\n"
+    "\n"
+    "Issues found: 2\n"
+    "Edge cases: 5\n"
+    "Quality: Excellent overall\n"
+    "Quality poor in one module\n"
+    "No security issues detected\n"
+    "Recommend: add rate limiting\n"
+    "Suggestion: cache tokens\n"
+    "RECOMMEND: more docs\n"
+)
+
+FIXTURES = {
+    "current": {
+        "001-discovery-trigger.md": (
+            "# Checkpoint: 001-discovery-trigger.md\n"
+            "\n"
+            "**From:** orchestrator\n"
+            "**To:** working instances\n"
+            "**Timestamp:** 2025-01-19 10:00:00\n"
+            "**Feature:** gold\n"
+            "\n"
+            "Files discovered: 42\n"
+            "Directories: 7\n"
+        ),
+        "002-discovery-complete.md": (
+            "# Checkpoint: 002-discovery-complete.md\n"
+            "\n"
+            "**Timestamp:** 2025-01-19 10:05:00\n"
+            "files DISCOVERED: 50\n"
+        ),
+        # CRLF line endings on purpose
+        "003-tests-complete.md": (
+            "# Checkpoint: 003-tests-complete.md\r\n"
+            "\r\n"
+            "**From:** tester\r\n"
+            "**Timestamp:** 2025-01-19 10:20:00\r\n"
+            "\r\n"
+            "Tests written: 15\r\n"
+            "Created tests/test_auth.py and spec/login_spec.js\r\n"
+            "Also test_utils/helpers.ts plus test/api/v1/routes.go\r\n"
+            "Coverage: 87.5%\r\n"
+            "All tests failing as expected\r\n"
+            "Tests created: 99\r\n"
+        ),
+        "005-impl-complete.md": (
+            "# Checkpoint: 005-impl-complete.md\n"
+            "\n"
+            "**Timestamp:** 2025-01-19 11:00:00\n"
+            "**Timestamp:** second-should-be-ignored\n"
+            "\n"
+            "## Results\n"
+            "Passing: 14/15 tests\n"
+            "Tests 15/15\n"
+            "Created: src/auth/service.py\n"
+            "Created: src/auth/models.py\n"
+            "Modified: src/app.py\n"
+            "Modified: README.md and Created: lib/x.ts\n"
+            "Lines added: 320\n"
+            "Performance: 12.5ms\n"
+            "Performance: 3s\n"
+        ),
+        "007-verify-complete.md": VERIFY_CHECKPOINT,
+        "008-verify-complete-2.md": (
+            "# Checkpoint: 008-verify-complete-2.md\n"
+            "no timestamp here\n"
+            "Quality Needs improvement\n"
+        ),
+        "SUMMARY.md": "# Summary\n**Timestamp:** 2025-01-19 12:00:00\nx",
+    },
+    "alt": {
+        "005-impl-complete.md": "**Timestamp:** x\nTests 3/4 and Modified: a/b.c\n",
+        "007-verify-complete.md": VERIFY_CHECKPOINT,
+    },
+}
+
+GOLDEN = {
+    "current": {
+        "phases": {
+            "discovery": {"files_discovered": 50, "directories_found": 7},
+            "testing": {
+                "tests_written": 15,
+                "test_files": ["test_auth.py", "spec/login_spec.js", "test_utils/helpers.ts",
+                               "test/api/v1/routes.go"],
+                "test_file_count": 4,
+                "coverage_percent": 87.5,
+                "initial_state": "all_failing",
+            },
+            "implementation": {
+                "tests_passing": 14,
+                "tests_total": 15,
+                "pass_rate": 93.33333333333333,
+                "files_created": ["src/auth/service.py", "src/auth/models.py", "lib/x.ts"],
+                "files_modified": ["src/app.py", "README.md"],
+                "total_files_changed": 5,
+                "lines_of_code": 320,
+                "performance": "12.5",
+            },
+            "verification": {
+                "issues_found": 2,
+                "edge_cases_identified": 5,
+                "quality_assessment": "low",
+                "security_concerns": False,
+                "recommendations_count": 0,
+            },
+        },
+        "timeline": [
+            {"checkpoint": "001-discovery-trigger.md", "timestamp": "2025-01-19 10:00:00"},
+            {"checkpoint": "002-discovery-complete.md", "timestamp": "2025-01-19 10:05:00"},
+            {"checkpoint": "003-tests-complete.md", "timestamp": "2025-01-19 10:20:00"},
+            {"checkpoint": "005-impl-complete.md", "timestamp": "2025-01-19 11:00:00"},
+            {"checkpoint": "007-verify-complete.md", "timestamp": "2025-01-19 11:30:00"},
+            {"checkpoint": "008-verify-complete-2.md", "timestamp": "Unknown"},
+            {"checkpoint": "SUMMARY.md", "timestamp": "2025-01-19 12:00:00"},
+        ],
+        "summary": {
+            "total_tests": 15,
+            "test_coverage": 87.5,
+            "test_pass_rate": 93.33333333333333,
+            "files_changed": 5,
+            "issues_found": 2,
+            "quality": "low",
+            "checkpoints_completed": 7,
+            "first_checkpoint": "2025-01-19 10:00:00",
+            "last_checkpoint": "2025-01-19 12:00:00",
+            "success": False,
+        },
+    },
+    "alt": {
+        "phases": {
+            "discovery": {},
+            "testing": {},
+            "implementation": {
+                "tests_passing": 3,
+                "tests_total": 4,
+                "pass_rate": 75.0,
+                "files_modified": ["a/b.c"],
+                "total_files_changed": 1,
+            },
+            "verification": {
+                "issues_found": 2,
+                "edge_cases_identified": 5,
+                "quality_assessment": "high",
+                "security_concerns": True,
+                "recommendations_count": 3,
+            },
+        },
+        "timeline": [
+            {"checkpoint": "005-impl-complete.md", "timestamp": "x"},
+            {"checkpoint": "007-verify-complete.md", "timestamp": "2025-01-19 11:30:00"},
+        ],
+        "summary": {
+            "test_pass_rate": 75.0,
+            "files_changed": 1,
+            "issues_found": 2,
+            "quality": "high",
+            "checkpoints_completed": 2,
+            "first_checkpoint": "x",
+            "last_checkpoint": "2025-01-19 11:30:00",
+            "success": False,
+        },
+    },
+}
+
+
+class GoldenExtractionTest(TmopsTestCase):
+    """Extractor output must match the golden values byte for byte"""
+
+    def setUp(self):
+        super().setUp()
+        for run, files in FIXTURES.items():
+            checkpoint_dir = self.tmops / "gold" / "runs" / run / "checkpoints"
+            checkpoint_dir.mkdir(parents=True)
+            for name, content in files.items():
+                (checkpoint_dir / name).write_bytes(content.encode())
+
+    def extract(self, run, **kwargs):
+        metrics = MetricsExtractor("gold", None if run == "current" else run, **kwargs).extract_all_metrics()
+        self.assertEqual(metrics.pop("feature"), "gold")
+        self.assertEqual(metrics.pop("run_directory"), run)
+        metrics.pop("timestamp")
+        return metrics
+
+    def test_matches_golden(self):
+        for run in FIXTURES:
+            with self.subTest(run=run):
+                metrics = self.extract(run, use_cache=False)
+                self.assertEqual(json.dumps(metrics), json.dumps(GOLDEN[run]))
+
+    def test_cached_rerun_matches_golden(self):
+        for run in FIXTURES:
+            with self.subTest(run=run):
+                self.extract(run)
+                self.assertEqual(json.dumps(self.extract(run)), json.dumps(GOLDEN[run]))
+
+    def test_sidecars_match_golden(self):
+        for run, files in FIXTURES.items():
+            checkpoint_dir = self.root / ".tmops" / "gold" / "runs" / run / "checkpoints"
+            for name, content in files.items():
+                sidecar = extract_metrics.checkpoint_sidecar(name, content, {})
+                # Same size, unparseable text: only the sidecar can produce the golden values
+                (checkpoint_dir / name).write_bytes(b"x" * len(content.encode()))
+                sidecar["mtime_ns"] = (checkpoint_dir / name).stat().st_mtime_ns
+                (checkpoint_dir / (name + ".json")).write_text(json.dumps(sidecar))
+            with self.subTest(run=run):
+                self.assertEqual(json.dumps(self.extract(run, use_cache=False)), json.dumps(GOLDEN[run]))
+
+    def test_stale_and_truncated_sidecars_are_ignored(self):
+        checkpoint_dir = self.root / ".tmops" / "gold" / "runs" / "current" / "checkpoints"
+        # Every checkpoint is longer than this, so a bounded scan never reads one whole
+        limit = min(len(content.encode()) for content in FIXTURES["current"].values()) - 1
+        truncated = json.dumps(self.extract("current", use_cache=False, max_read_chars=limit))
+        for name, content in FIXTURES["current"].items():
+            sidecar = extract_metrics.checkpoint_sidecar(name, content, {})
+            sidecar.update(metrics={}, mtime_ns=(checkpoint_dir / name).stat().st_mtime_ns)
+            (checkpoint_dir / (name + ".json")).write_text(json.dumps(sidecar))
+
+        # Matching sidecars are trusted (their emptied metrics show through)
+        self.assertNotEqual(json.dumps(self.extract("current", use_cache=False)), json.dumps(GOLDEN["current"]))
+        self.assertEqual(json.dumps(self.extract("current", use_cache=False, max_read_chars=limit)), truncated)
+
+        # Same size, different mtime: the checkpoint was edited after its sidecar was written
+        for name in FIXTURES["current"]:
+            stat = (checkpoint_dir / name).stat()
+            os.utime(checkpoint_dir / name, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+        self.assertEqual(json.dumps(self.extract("current", use_cache=False)), json.dumps(GOLDEN["current"]))
+
+    def test_shell_checkpoints_take_the_sidecar_path(self):
+        checkpoint_dir = self.root / ".tmops" / "gold" / "runs" / "current" / "checkpoints"
+        checkpoint = checkpoint_dir / "004-tests-complete.md"
+        common = Path(extract_metrics.__file__).resolve().parent / "lib" / "common.sh"
+        subprocess.run(["bash", "-c", 'source "$1" && create_checkpoint "$2" complete "Tests written: 4" "Tests 3/4"',
+                        "bash", str(common), str(checkpoint)], check=True, stderr=subprocess.DEVNULL)
+        self.assertEqual(sorted(p.name for p in checkpoint_dir.iterdir() if p.name.startswith(".")), [])
+        sidecar = json.loads((checkpoint_dir / "004-tests-complete.md.json").read_text())
+        self.assertEqual((sidecar["status"], sidecar["mtime_ns"]), ("complete", checkpoint.stat().st_mtime_ns))
+
+        with mock.patch.object(MetricsExtractor, "_sidecar_checkpoint", return_value=None):
+            from_text = json.dumps(self.extract("current", use_cache=False))
+        parsed = []
+        parse = MetricsExtractor._parse_checkpoint_file
+
+        def parse_text(extractor, path, *args, **kwargs):
+            parsed.append(path.name)
+            return parse(extractor, path, *args, **kwargs)
+
+        with mock.patch.object(MetricsExtractor, "_parse_checkpoint_file", parse_text):
+            self.assertEqual(json.dumps(self.extract("current", use_cache=False)), from_text)
+        self.assertNotIn(checkpoint.name, parsed)
+        self.assertTrue(parsed)
+
+    def test_line_longer_than_a_read_piece(self):
+        # "Tests written: 12" straddles the MAX_LINE_CHARS boundary; a later line says 3
+        content = ("**Timestamp:** 2025-01-19 10:00:00\n"
+                   + "a" * (extract_metrics.MAX_LINE_CHARS - 8) + "Tests written: 12 test/x_long.py\n"
+                   + "Tests written: 3\n")
+        checkpoint_dir = self.root / ".tmops" / "gold" / "runs" / "long" / "checkpoints"
+        checkpoint_dir.mkdir(parents=True)
+        (checkpoint_dir / "003-tests-complete.md").write_text(content)
+
+        whole = extract_metrics._PHASE_SCANNERS["testing"].scan(content)
+        self.assertEqual(whole["tests_written"].group(1), "12")
+        testing = self.extract("long", use_cache=False)["phases"]["testing"]
+        self.assertEqual((testing["tests_written"], testing["test_files"]), (12, ["test/x_long.py"]))
+        self.assertEqual(extract_metrics.checkpoint_sidecar("003-tests-complete.md", content, {})["metrics"],
+                         testing)
+
+    def test_pipeline_analysis(self):
+        log_dir = self.root / ".tmops" / "gold" / "runs" / "current" / "logs"
+        log_dir.mkdir()
+        (log_dir / "tester.log").write_text(
+            "[2025-01-19 09:59:00.000] [INFO] Waiting for checkpoint matching: *discovery-trigger*\n"
+            "[2025-01-19 10:00:30.000] [INFO] Found checkpoint: 001-discovery-trigger.md\n"
+            "[2025-01-19 10:20:00.000] [INFO] Created checkpoint: 003-tests-complete.md\n")
+        (log_dir / "impl.log").write_text("\n".join(json.dumps(entry) for entry in [
+            {"timestamp": "2025-01-19T10:00:10.000", "event": "wait_start", "pattern": "*tests-complete*"},
+            {"timestamp": "2025-01-19T10:21:00.000", "event": "checkpoint_found",
+             "checkpoint": "003-tests-complete.md"},
+            {"timestamp": "2025-01-19T11:00:00.000", "event": "checkpoint_created",
+             "checkpoint": "005-impl-complete.md"},
+        ]) + "\n")
+        extractor = MetricsExtractor("gold", use_cache=False)
+        analysis = extractor.analyze(extractor.extract_all_metrics())
+
+        self.assertEqual(analysis["phases"]["testing"]["duration_seconds"], 900)
+        self.assertEqual(analysis["roles"]["tester"]["waiting_seconds"], 90)
+        self.assertEqual(analysis["roles"]["impl"]["busy_seconds"], 2340)
+        self.assertEqual([(h["checkpoint"], h["from"], h["to"], h["latency_seconds"]) for h in analysis["handoffs"]],
+                         [("001-discovery-trigger.md", None, "tester", 30),
+                          ("003-tests-complete.md", "tester", "impl", 60)])
+        path = analysis["critical_path"]
+        self.assertEqual((path["total_seconds"], path["bottleneck_phase"]), (7200, "implementation"))
+        self.assertEqual((path["segments"][2]["handoff_seconds"], path["segments"][2]["work_seconds"]), (60, 2340))
+
+    def test_scanner_finds_fields_after_long_logs(self):
+        scanner = extract_metrics._PHASE_SCANNERS["implementation"]
+        content = "noise line\n" * 10000 + "Tests 1/2\n"
+        fields = scanner.scan(content)
+        self.assertEqual(fields["tests_passing"].groups(), ("1", "2"))
+        self.assertEqual(fields["files_created"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
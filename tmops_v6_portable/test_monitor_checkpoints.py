@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# test_monitor_checkpoints.py
+# Behavior tests for tmops_tools/monitor_checkpoints.py
+#
+# Run: python3 -m unittest test_monitor_checkpoints  (from tmops_v6_portable/)
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tmops_tools"))
+
+from tmops_test_support import TmopsTestCase  # noqa: E402
+from checkpoint_index import sidecar_path  # noqa: E402
+from monitor_checkpoints import (CheckpointMonitor, InotifyWatcher, ShardTimeoutError,  # noqa: E402
+                                 IN_CLOSE_WRITE, IN_MOVED_TO)
+
+
+class MonitorTestCase(TmopsTestCase):
+    """A throwaway .tmops tree with feature "demo" (see TmopsTestCase)"""
+
+    @staticmethod
+    def later(delay, action):
+        """Run action on a thread after delay seconds"""
+        thread = threading.Timer(delay, action)
+        thread.start()
+        return thread
+
+    def write(self, name, text="x"):
+        """Drop a file into the checkpoint directory the way tools other than create do"""
+        (self.checkpoint_dir / name).write_text(text)
+
+
+class LoggingTest(MonitorTestCase):
+    """Role logs land in the monitor's own tree, wherever the process is when they are flushed"""
+
+    def test_chdir_before_flush(self):
+        monitor = CheckpointMonitor("demo", "tester")
+        monitor.log("before chdir")
+        elsewhere = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(elsewhere))
+        os.chdir(elsewhere)
+        monitor.log("after chdir")
+        monitor.logger.flush()
+        log = (self.checkpoint_dir.parent / "logs" / "tester.log").read_text()
+        self.assertIn("before chdir", log)
+        self.assertIn("after chdir", log)
+        self.assertEqual(os.listdir(elsewhere), [])
+
+
+class InotifyWatcherTest(MonitorTestCase):
+    """The ctypes inotify binding"""
+
+    def setUp(self):
+        super().setUp()
+        self.watcher = InotifyWatcher.create()
+        if self.watcher is None:
+            self.skipTest("inotify unavailable")
+        self.addCleanup(self.watcher.close)
+
+    def test_reports_finished_and_renamed_files(self):
+        self.watcher.add_watch(self.checkpoint_dir)
+        self.assertEqual(self.watcher.wait(0.05), [])
+        self.write("001-a.md")
+        (self.checkpoint_dir.parent / ".002-b.md.tmp").write_text("x")
+        os.rename(self.checkpoint_dir.parent / ".002-b.md.tmp", self.checkpoint_dir / "002-b.md")
+
+        events = self.watcher.wait(2) + self.watcher.read_events()
+        self.assertEqual([(directory, name) for directory, name, _ in events],
+                         [(self.checkpoint_dir, "001-a.md"), (self.checkpoint_dir, "002-b.md")])
+        self.assertTrue(events[0][2] & IN_CLOSE_WRITE)
+        self.assertTrue(events[1][2] & IN_MOVED_TO)
+
+    def test_removed_watch_goes_quiet(self):
+        wd = self.watcher.add_watch(self.checkpoint_dir)
+        self.watcher.remove_watch(wd)
+        self.write("001-a.md")
+        self.assertEqual(self.watcher.wait(0.2), [])
+
+    def test_missing_directory_raises(self):
+        with self.assertRaises(OSError):
+            self.watcher.add_watch(self.checkpoint_dir / "missing")
+
+
+class WaitTest(MonitorTestCase):
+    """wait_for_checkpoint_file with inotify wake-ups and with the polling fallback"""
+
+    def test_inotify_wakes_the_waiter(self):
+        if InotifyWatcher.create() is None:
+            self.skipTest("inotify unavailable")
+        monitor = CheckpointMonitor("demo", "impl", watch_mode="auto")
+        thread = self.later(0.3, lambda: self.write("003-tests-complete.md"))
+        started = time.monotonic()
+        found = monitor.wait_for_checkpoint_file("003-*.md", timeout=10)
+        thread.join()
+        # The backoff alone would not look again for 2s
+        self.assertLess(time.monotonic() - started, 1.5)
+        self.assertEqual(found.name, "003-tests-complete.md")
+        stats = monitor.stats.load()
+        self.assertEqual((stats["waits"]["found"], stats["wakeups_total"]), (1, 1))
+
+    def test_polls_without_inotify(self):
+        for watch_mode in ("poll", "auto"):
+            with self.subTest(watch_mode=watch_mode), \
+                    mock.patch("monitor_checkpoints.InotifyWatcher.create", return_value=None):
+                monitor = CheckpointMonitor("demo", f"impl-{watch_mode}", watch_mode=watch_mode, fast_poll=5)
+                name = f"005-{watch_mode}.md"
+                # Hidden files match a bare * in pathlib globs but are never checkpoints
+                self.write(f".{name}")
+                thread = self.later(0.3, lambda: self.write(name))
+                found = monitor.wait_for_checkpoint_file(f"005-{watch_mode}*", timeout=10)
+                thread.join()
+                self.assertEqual(found.name, name)
+                stats = monitor.stats.load()
+                self.assertEqual(stats["wakeups_total"], 0)
+                self.assertGreater(stats["polls_total"], 1)
+
+    def test_timeout_is_recorded(self):
+        monitor = CheckpointMonitor("demo", "impl", watch_mode="poll")
+        self.write(".009-hidden.md")
+        self.write("009-draft.md.tmp")
+        with self.assertRaises(TimeoutError):
+            monitor.wait_for_checkpoint_file("*9-*", timeout=1)
+        self.assertEqual(monitor.stats.load()["waits"], {"found": 0, "timeout": 1})
+
+
+class IndexTest(MonitorTestCase):
+    """The SQLite checkpoint index stays in step with the checkpoint directories"""
+
+    def test_sync_picks_up_files_from_other_tools(self):
+        monitor = CheckpointMonitor("demo", "tester")
+        monitor.create_checkpoint("003-tests-complete.md", "Tests written: 4")
+        self.assertEqual([(row["name"], row["role"]) for row in monitor.indexed_checkpoints()],
+                         [("003-tests-complete.md", "tester")])
+
+        # Written by a shell script: no index update until the next sync
+        self.write("005-impl-complete.md", "# Checkpoint\n**From:** impl\n**To:** orchestrator\n")
+        (self.checkpoint_dir / "003-tests-complete.md").unlink()
+        self.assertEqual([(row["name"], row["role"], row["phase"]) for row in monitor.indexed_checkpoints()],
+                         [("005-impl-complete.md", "impl", "implementation")])
+
+    def test_rewrite_in_place_and_same_tick_writes_are_seen(self):
+        monitor = CheckpointMonitor("demo", "orchestrator")
+        self.write("005-impl-complete.md", "**From:** impl\n")
+        # Long settled: the directory mtime is trusted from now on
+        settled = time.time_ns() - 10 * 10**9
+        os.utime(self.checkpoint_dir, ns=(settled, settled))
+        self.assertEqual([row["role"] for row in monitor.indexed_checkpoints()], ["impl"])
+
+        # Rewritten in place: the directory mtime does not change
+        self.write("005-impl-complete.md", "**From:** verify\n")
+        os.utime(self.checkpoint_dir, ns=(settled, settled))
+        self.assertEqual([row["role"] for row in monitor.indexed_checkpoints()], ["verify"])
+
+        # A second file landing within the same mtime tick as the listing that missed it
+        self.write("006-verify-complete.md", "**From:** verify\n")
+        fresh = self.checkpoint_dir.stat().st_mtime_ns
+        self.assertEqual(len(monitor.indexed_checkpoints()), 2)
+        self.write("007-extra.md", "**From:** verify\n")
+        os.utime(self.checkpoint_dir, ns=(fresh, fresh))
+        self.assertEqual([row["name"] for row in monitor.indexed_checkpoints()],
+                         ["005-impl-complete.md", "006-verify-complete.md", "007-extra.md"])
+
+    def test_hidden_files_are_not_indexed(self):
+        self.write("001-discovery-trigger.md", "**From:** orchestrator\n")
+        self.write(".002-discovery-complete.md", "**From:** tester\n")
+        monitor = CheckpointMonitor("demo", "orchestrator")
+        self.assertEqual([row["name"] for row in monitor.indexed_checkpoints()], ["001-discovery-trigger.md"])
+        self.assertEqual(monitor.reindex(), 1)
+
+    def test_reindex_covers_every_run(self):
+        previous = self.checkpoint_dir.parent.parent / "20250101-000000-old" / "checkpoints"
+        previous.mkdir(parents=True)
+        (previous / "001-discovery-trigger.md").write_text("**From:** orchestrator\n")
+        self.write("001-discovery-trigger.md", "**From:** orchestrator\n")
+        self.write("002-discovery-complete.md", "**From:** tester\n")
+
+        monitor = CheckpointMonitor("demo", "orchestrator")
+        # runs/current is a symlink to "initial" and must not be indexed twice
+        self.assertEqual(monitor.reindex(), 3)
+        self.assertEqual(monitor.index.runs(), {"20250101-000000-old": 1, "initial": 2})
+
+
+class ShardWaitTest(MonitorTestCase):
+    """N-of-M barrier waits over shard checkpoints"""
+
+    def test_returns_once_enough_shards_exist(self):
+        tester = CheckpointMonitor("demo", "tester")
+        tester.create_checkpoint("004-tests-complete.md", "shard 2", shard=2, shards=3)
+        thread = self.later(0.3, lambda: CheckpointMonitor("demo", "tester").create_checkpoint(
+            "004-tests-complete.md", "shard 1", shard=1, shards=3))
+        started = time.monotonic()
+        found = CheckpointMonitor("demo", "orchestrator").wait_for_shards("004-tests-complete.md", 3, required=2,
+                                                                          timeout=10)
+        thread.join()
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual([path.name for path in found],
+                         ["004-tests-complete.shard-1-of-3.md", "004-tests-complete.shard-2-of-3.md"])
+
+    def test_timeout_reports_missing_shards(self):
+        CheckpointMonitor("demo", "tester").create_checkpoint("004-tests-complete.md", "x", shard=2, shards=3)
+        # A shard of a different fan-out never counts
+        CheckpointMonitor("demo", "tester").create_checkpoint("004-tests-complete.md", "x", shard=1, shards=2)
+        with self.assertRaises(ShardTimeoutError) as caught:
+            CheckpointMonitor("demo", "orchestrator").wait_for_shards("004-tests-complete.md", 3, timeout=1)
+        self.assertEqual((caught.exception.present, caught.exception.missing), ([2], [1, 3]))
+
+    def test_rejects_impossible_barrier(self):
+        with self.assertRaises(ValueError):
+            CheckpointMonitor("demo", "orchestrator").wait_for_shards("004-tests-complete.md", 2, required=3)
+
+
+class CreateCheckpointTest(MonitorTestCase):
+    """Checkpoints land atomically with a sidecar describing exactly that file"""
+
+    def test_sidecar_pins_size_and_mtime(self):
+        path = CheckpointMonitor("demo", "tester").create_checkpoint("003-tests-complete.md", "Tests written: 4")
+        sidecar = json.loads(sidecar_path(path).read_text())
+        stat = path.stat()
+        self.assertEqual((sidecar["size"], sidecar["mtime_ns"]), (stat.st_size, stat.st_mtime_ns))
+        self.assertEqual(sidecar["metrics"], {"tests_written": 4})
+        self.assertEqual(sorted(p.name for p in self.checkpoint_dir.parent.iterdir()), ["checkpoints", "logs"])
+
+
+if __name__ == "__main__":
+    unittest.main()
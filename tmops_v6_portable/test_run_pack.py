@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# test_run_pack.py
+# Round-trip tests for tmops_tools/run_pack.py
+#
+# Run: python3 -m unittest test_run_pack  (from tmops_v6_portable/)
+
+import os
+import sys
+import shutil
+import sqlite3
+import hashlib
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tmops_tools"))
+
+import run_pack  # noqa: E402
+from run_pack import RunPack, pack_run, unpack_run, is_pack, run_name  # noqa: E402
+
+FILES = {
+    "checkpoints/001-discovery-trigger.md": b"# Checkpoint\r\n**From:** orchestrator\r\n",
+    "checkpoints/001-discovery-trigger.md.json": b'{"sidecar_version": 1}\n',
+    "logs/tester.log": bytes(range(256)) * 5,
+    "TASK_SPEC.md": b"",
+}
+
+
+class RunPackTest(unittest.TestCase):
+    """Packing must be lossless and readable without unpacking"""
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.run_dir = self.root / ".archive" / "20250119-100000-initial"
+        for member, data in FILES.items():
+            path = self.run_dir / member
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        (self.run_dir / "empty").mkdir()
+        os.chmod(self.run_dir / "TASK_SPEC.md", 0o640)
+        os.utime(self.run_dir / "logs" / "tester.log", ns=(1_000_000_000, 1_234_567_891_000))
+        # Small chunks so the log spans several chunk rows
+        self.old_chunk = run_pack.CHUNK_BYTES
+        run_pack.CHUNK_BYTES = 100
+
+    def tearDown(self):
+        run_pack.CHUNK_BYTES = self.old_chunk
+        shutil.rmtree(self.root)
+
+    def test_round_trip(self):
+        pack_path = pack_run(self.run_dir)
+        self.assertFalse(self.run_dir.exists())
+        self.assertTrue(is_pack(pack_path))
+        self.assertEqual(run_name(pack_path), self.run_dir.name)
+
+        restored = unpack_run(pack_path)
+        self.assertEqual(restored, self.run_dir)
+        for member, data in FILES.items():
+            self.assertEqual((restored / member).read_bytes(), data, member)
+        self.assertTrue((restored / "empty").is_dir())
+        self.assertEqual(os.stat(restored / "TASK_SPEC.md").st_mode & 0o777, 0o640)
+        self.assertEqual(os.stat(restored / "logs" / "tester.log").st_mtime_ns, 1_234_567_891_000)
+
+    def test_reads_members_in_place(self):
+        with RunPack(pack_run(self.run_dir, remove=False)) as pack:
+            self.assertEqual(pack.names("checkpoints", "*.md"), ["001-discovery-trigger.md"])
+            self.assertEqual(pack.names(), ["TASK_SPEC.md"])
+            self.assertEqual(pack.stat("logs/tester.log"), (1280, 1_234_567_891_000))
+            self.assertIsNone(pack.stat("empty"))
+            self.assertEqual(pack.read_bytes("logs/tester.log"), FILES["logs/tester.log"])
+            self.assertEqual(pack.read_bytes("logs/tester.log", 150), FILES["logs/tester.log"][:150])
+            self.assertEqual(pack.read_text("checkpoints/001-discovery-trigger.md"),
+                             "# Checkpoint\n**From:** orchestrator\n")
+            self.assertEqual(pack.digest("logs/tester.log"), hashlib.sha256(FILES["logs/tester.log"]).hexdigest())
+            self.assertIsNone(pack.read_text("checkpoints/missing.md"))
+            with self.assertRaises(FileNotFoundError):
+                pack.open("empty")
+        self.assertTrue(self.run_dir.is_dir())
+
+    def test_refuses_existing_pack_and_unknown_format(self):
+        pack_path = pack_run(self.run_dir, remove=False)
+        with self.assertRaises(ValueError):
+            pack_run(self.run_dir)
+        self.assertEqual(sorted(p.name for p in pack_path.parent.iterdir()), [self.run_dir.name, pack_path.name])
+
+        db = sqlite3.connect(str(pack_path))
+        db.execute("UPDATE meta SET value = '999' WHERE key = 'format_version'")
+        db.commit()
+        db.close()
+        with self.assertRaises(ValueError):
+            RunPack(pack_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
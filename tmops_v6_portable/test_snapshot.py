@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# test_snapshot.py
+# Copy and move method tests for tmops_tools/snapshot.py
+#
+# Run: python3 -m unittest test_snapshot  (from tmops_v6_portable/)
+
+import os
+import sys
+import stat
+import errno
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tmops_tools"))
+
+from snapshot import Snapshotter  # noqa: E402
+
+FILES = {
+    "TASK_SPEC.md": "# Task Specification: demo\n",
+    "checkpoints/001-discovery-trigger.md": "# Checkpoint\n",
+    "logs/tester.log": "tester output\n",
+    "logs/impl.log": "impl output\n",
+    "notes/spec-copy.md": "# Task Specification: demo\n",
+}
+
+
+class SnapshotTestCase(unittest.TestCase):
+    """A small run tree on a filesystem without reflinks (FICLONE is made to fail)"""
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.src = self.root / "run"
+        for member, text in FILES.items():
+            path = self.src / member
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text)
+        patcher = mock.patch("snapshot.fcntl.ioctl", side_effect=OSError(errno.EOPNOTSUPP, "not supported"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    @staticmethod
+    def writable(path):
+        return bool(os.stat(path).st_mode & stat.S_IWUSR)
+
+
+class CopyTest(SnapshotTestCase):
+    """copy_file and copy_tree pick reflink, hardlink, dedup or copy"""
+
+    def test_reflink_when_supported(self):
+        with mock.patch("snapshot.fcntl.ioctl", return_value=0):
+            method = Snapshotter().copy_file(self.src / "TASK_SPEC.md", self.root / "spec.md")
+        self.assertEqual(method, "reflink")
+        self.assertNotEqual(os.stat(self.root / "spec.md").st_ino, os.stat(self.src / "TASK_SPEC.md").st_ino)
+
+    def test_reflink_failure_falls_back_to_copy(self):
+        method = Snapshotter(dedup=False).copy_file(self.src / "TASK_SPEC.md", self.root / "spec.md")
+        self.assertEqual(method, "copy")
+        self.assertEqual((self.root / "spec.md").read_text(), FILES["TASK_SPEC.md"])
+        self.assertTrue(self.writable(self.root / "spec.md"))
+
+    def test_tree_hardlinks_checkpoints_and_dedups_identical_files(self):
+        snapshot = Snapshotter()
+        snapshot.copy_tree(self.src, self.root / "backup")
+        backup = self.root / "backup"
+        self.assertEqual(snapshot.counts, {"reflink": 0, "hardlink": 1, "dedup": 1, "copy": 3, "move": 0})
+        for member, text in FILES.items():
+            self.assertEqual((backup / member).read_text(), text, member)
+
+        checkpoint = "checkpoints/001-discovery-trigger.md"
+        self.assertEqual(os.stat(backup / checkpoint).st_ino, os.stat(self.src / checkpoint).st_ino)
+        self.assertTrue(self.writable(self.src / checkpoint))
+
+        # The two identical specs share one read-only inode; files nothing links to stay writable
+        self.assertEqual(os.stat(backup / "TASK_SPEC.md").st_ino, os.stat(backup / "notes/spec-copy.md").st_ino)
+        self.assertFalse(self.writable(backup / "TASK_SPEC.md"))
+        self.assertTrue(self.writable(backup / "logs/tester.log"))
+        self.assertTrue(self.writable(backup / "logs/impl.log"))
+
+    def test_refuses_existing_target(self):
+        (self.root / "backup").mkdir()
+        with self.assertRaises(ValueError):
+            Snapshotter().copy_tree(self.src, self.root / "backup")
+
+
+class MoveTest(SnapshotTestCase):
+    """move_tree renames files and keeps the source directories"""
+
+    def test_move_tree_keeps_directories_and_hidden_files(self):
+        (self.src / "checkpoints" / ".002-in-flight.md.tmp").write_text("partial")
+        snapshot = Snapshotter()
+        snapshot.move_tree(self.src / "checkpoints", self.root / "archive" / "checkpoints")
+        self.assertEqual(snapshot.counts["move"], 1)
+        self.assertEqual(os.listdir(self.src / "checkpoints"), [".002-in-flight.md.tmp"])
+        self.assertEqual(os.listdir(self.root / "archive" / "checkpoints"), ["001-discovery-trigger.md"])
+
+    def test_move_across_filesystems_copies_then_deletes(self):
+        real_replace = os.replace
+        calls = []
+
+        def replace(src, dst):
+            calls.append(src)
+            if len(calls) == 1:
+                raise OSError(errno.EXDEV, "Invalid cross-device link")
+            real_replace(src, dst)
+
+        target = self.root / "elsewhere.log"
+        with mock.patch("snapshot.os.replace", side_effect=replace):
+            method = Snapshotter().move_file(self.src / "logs/tester.log", target)
+        self.assertEqual(method, "copy")
+        self.assertFalse((self.src / "logs/tester.log").exists())
+        self.assertEqual(target.read_text(), FILES["logs/tester.log"])
+        self.assertEqual(sorted(os.listdir(self.root)), ["elsewhere.log", "run"])
+
+
+if __name__ == "__main__":
+    unittest.main()
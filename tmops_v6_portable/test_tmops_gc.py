@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# test_tmops_gc.py
+# Retention policy tests for tmops_tools/tmops_gc.py
+#
+# Run: python3 -m unittest test_tmops_gc  (from tmops_v6_portable/)
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tmops_tools"))
+
+from feature_lock import FeatureLock  # noqa: E402
+from tmops_gc import collect_garbage, disk_usage, plan_deletions, parse_size  # noqa: E402
+
+DAY = 86400
+NOW = 1_750_000_000.0
+
+
+def entry(name, age_days, size, kind="run"):
+    return {"path": Path(name), "kind": kind, "name": name, "mtime": NOW - age_days * DAY, "bytes": size}
+
+
+class PlanDeletionsTest(unittest.TestCase):
+    """plan_deletions on in-memory histories (newest first)"""
+
+    def plan(self, histories, **kwargs):
+        return {(item["feature"], item["name"]): item["reason"]
+                for item in plan_deletions(histories, now=NOW, **kwargs)}
+
+    def test_keep_runs_and_max_age(self):
+        histories = {"auth": [entry("r3", 1, 10), entry("r2", 2, 10), entry("a1", 40, 10, "archive")],
+                     "pay": [entry("r1", 50, 10)],
+                     ".backups": [entry("b1", 5, 10, "backup"), entry("b0", 60, 10, "backup")]}
+        self.assertEqual(self.plan(histories, keep_runs=2),
+                         {("auth", "a1"): "beyond the last 2"})
+        self.assertEqual(self.plan(histories, keep_runs=0),
+                         {("auth", "r3"): "beyond the last 0", ("auth", "r2"): "beyond the last 0",
+                          ("auth", "a1"): "beyond the last 0", ("pay", "r1"): "beyond the last 0"})
+        self.assertEqual(self.plan(histories, max_age=30 * DAY),
+                         {("auth", "a1"): "older than 30 days", ("pay", "r1"): "older than 30 days",
+                          (".backups", "b0"): "older than 30 days"})
+
+    def test_budget_deletes_oldest_collectable_first(self):
+        histories = {"auth": [entry("r3", 1, 100), entry("r2", 3, 100)],
+                     "pay": [entry("r1", 2, 100)],
+                     ".backups": [entry("b0", 4, 100, "backup")]}
+        # 400 collectable + 100 that can't be collected
+        self.assertEqual(set(self.plan(histories, max_bytes=300, total_bytes=500)),
+                         {(".backups", "b0"), ("auth", "r2")})
+        self.assertEqual(self.plan(histories, max_bytes=500, total_bytes=500), {})
+
+    def test_unreachable_budget_deletes_nothing(self):
+        histories = {"auth": [entry("r2", 1, 100), entry("r1", 2, 100)]}
+        self.assertEqual(self.plan(histories, max_bytes=100, total_bytes=5200), {})
+        self.assertEqual(self.plan(histories, keep_runs=1, max_bytes=100, total_bytes=5200),
+                         {("auth", "r1"): "beyond the last 1"})
+
+    def test_parse_size(self):
+        self.assertEqual([parse_size(s) for s in ("512", "2K", "1.5M", "2GiB", "3gb")],
+                         [512, 2048, 1572864, 2 * 1024 ** 3, 3 * 1024 ** 3])
+        with self.assertRaises(ValueError):
+            parse_size("lots")
+
+
+class CollectGarbageTest(unittest.TestCase):
+    """collect_garbage on a real .tmops tree"""
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.tmops = self.root / ".tmops"
+        now = time.time()
+        for feature in ("auth", "pay"):
+            runs = self.tmops / feature / "runs"
+            for age, run in enumerate(["r4", "r3", "r2", "r1"]):
+                self.make(runs / run / "checkpoints" / "001-discovery-trigger.md", 8192, now - (age + 1) * DAY)
+            os.symlink("r4", runs / "current")
+            (runs / "PREVIOUS_RUN.txt").write_text("r1\n")
+        backup = self.tmops / ".backups" / "20250101-000000-gone"
+        self.make(backup / "gone" / "TASK_SPEC.md", 8192, now - 90 * DAY)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    @staticmethod
+    def make(path, size, mtime):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(os.urandom(size))
+        for target in (path, path.parent, path.parent.parent):
+            os.utime(target, (mtime, mtime))
+
+    def runs(self, feature):
+        return sorted(p.name for p in (self.tmops / feature / "runs").iterdir() if not p.is_symlink() and p.is_dir())
+
+    def test_keeps_current_and_previous_runs(self):
+        report = collect_garbage(self.tmops, keep_runs=0, pack=False)
+        self.assertEqual(self.runs("auth"), ["r1", "r4"])
+        self.assertEqual(report["features"]["auth"]["deleted"][0]["reason"], "beyond the last 0")
+        self.assertTrue((self.tmops / ".backups" / "20250101-000000-gone").is_dir())
+
+        collect_garbage(self.tmops, keep_runs=None, max_age_days=30, pack=False)
+        self.assertFalse((self.tmops / ".backups" / "20250101-000000-gone").exists())
+
+    def test_dry_run_changes_nothing(self):
+        report = collect_garbage(self.tmops, keep_runs=0, dry_run=True)
+        self.assertEqual(len(report["features"]["pay"]["deleted"]), 2)
+        self.assertEqual(self.runs("pay"), ["r1", "r2", "r3", "r4"])
+        self.assertGreater(report["reclaimed"], 0)
+
+    def test_unreachable_budget_warns(self):
+        report = collect_garbage(self.tmops, ["auth"], keep_runs=None, max_bytes=1024, pack=False)
+        self.assertEqual(self.runs("auth"), ["r1", "r2", "r3", "r4"])
+        self.assertEqual(len(report["warnings"]), 1)
+        self.assertNotIn(".backups", report["features"])
+
+    def test_budget_counts_backups(self):
+        report = collect_garbage(self.tmops, keep_runs=None, max_bytes=disk_usage(self.tmops) - 1, pack=False)
+        self.assertEqual(report["warnings"], [])
+        self.assertEqual([item["name"] for item in report["features"][".backups"]["deleted"]],
+                         ["20250101-000000-gone"])
+        self.assertEqual(self.runs("auth"), ["r1", "r2", "r3", "r4"])
+
+    def test_skips_locked_feature(self):
+        with FeatureLock("auth", "preflight", timeout=0, tmops_dir=self.tmops):
+            report = collect_garbage(self.tmops, keep_runs=0, pack=False)
+        self.assertEqual(report["skipped"], {"auth": "preflight lock held"})
+        self.assertEqual(self.runs("auth"), ["r1", "r2", "r3", "r4"])
+        self.assertEqual(self.runs("pay"), ["r1", "r4"])
+
+
+if __name__ == "__main__":
+    unittest.main()
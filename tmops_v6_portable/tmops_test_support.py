@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# tmops_test_support.py
+# Shared fixture for the tool tests: a throwaway .tmops tree and a working directory next to it
+#
+# Not a test module itself; test_*.py files import TmopsTestCase from here.
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Dict
+
+PORTABLE_DIR = Path(__file__).resolve().parent
+
+
+def _stray_writes_state(cwd: str) -> Dict[str, int]:
+    """mtime_ns of every file in the real .tmops trees a relative path could have reached"""
+    cwd_path = Path(cwd)
+    places = {cwd_path.parent / ".tmops", cwd_path / ".tmops", PORTABLE_DIR.parent / ".tmops"}
+    state = {}
+    for place in places:
+        for dirpath, _, filenames in os.walk(place):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                state[path] = os.lstat(path).st_mtime_ns
+    return state
+
+
+def _flush_role_logs():
+    """Wait for role log lines monitor_checkpoints still has queued, wherever they are headed"""
+    monitor_checkpoints = sys.modules.get("monitor_checkpoints")
+    if monitor_checkpoints is not None and monitor_checkpoints._log_writer is not None:
+        monitor_checkpoints._log_writer.flush()
+
+
+class TmopsTestCase(unittest.TestCase):
+    """Each test runs in <tmp>/tmops_v6_portable, so the tools' ../.tmops is <tmp>/.tmops
+
+    Feature "demo" has one run, "initial", with runs/current pointing at it. Cleanup
+    restores the working directory, flushes queued role logs, fails the test if
+    anything was written to a real .tmops instead, and removes the tree.
+    """
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.cwd = self.root / "tmops_v6_portable"
+        self.cwd.mkdir()
+        self.tmops = self.root / ".tmops"
+        self.runs = self.tmops / "demo" / "runs"
+        self.checkpoint_dir = self.runs / "initial" / "checkpoints"
+        self.checkpoint_dir.mkdir(parents=True)
+        os.symlink("initial", self.runs / "current")
+
+        old_cwd = os.getcwd()
+        self.addCleanup(self._leave_tree, old_cwd, _stray_writes_state(old_cwd))
+        os.chdir(self.cwd)
+
+    def _leave_tree(self, old_cwd: str, stray_writes_before: Dict[str, int]):
+        # Flushed only after leaving, so a log path still relative would land outside and be caught
+        os.chdir(old_cwd)
+        try:
+            _flush_role_logs()
+            self.assertEqual(_stray_writes_state(old_cwd), stray_writes_before,
+                             "a tool wrote to a .tmops outside the test tree")
+        finally:
+            shutil.rmtree(self.root)
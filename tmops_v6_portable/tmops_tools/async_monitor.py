@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+# tmops_tools/async_monitor.py
+# asyncio layer over CheckpointMonitor: many features, many waits, one watcher
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple, Iterable, AsyncIterator, NamedTuple
+
+from checkpoint_index import is_sidecar, is_hidden
+from monitor_checkpoints import CheckpointMonitor, InotifyWatcher, IN_Q_OVERFLOW
+from wait_stats import WaitRecord
+
+
+class CheckpointArrival(NamedTuple):
+    """A checkpoint file that satisfied a wait or was seen by the watcher"""
+    feature: str
+    name: str
+    path: Path
+
+
+class AsyncCheckpointMonitor:
+    """Await checkpoints across many features from a single asyncio event loop"""
+
+    def __init__(self, instance_role: str, poll_interval: float = 1.0, rescan_interval: float = 10.0):
+        """
+        Initialize the async monitor
+
+        Args:
+            instance_role: The role of this instance (usually orchestrator)
+            poll_interval: Seconds between directory scans when inotify is unavailable
+            rescan_interval: Seconds between safety-net scans while inotify is in use; they
+                catch events lost to a queue overflow and follow re-pointed runs/current links
+        """
+        self.role = instance_role
+        self.poll_interval = poll_interval
+        self.rescan_interval = rescan_interval
+        self._monitors: Dict[str, CheckpointMonitor] = {}
+        self._features_by_dir: Dict[Path, str] = {}
+        self._waiters: Dict[str, List[Tuple[str, asyncio.Future, WaitRecord]]] = {}
+        self._subscribers: List[Tuple[Optional[set], asyncio.Queue]] = []
+        # Per feature, name -> inode of every checkpoint already dispatched (or present at start)
+        self._seen: Dict[str, Dict[str, int]] = {}
+        # Per feature, the watch descriptor and the (st_dev, st_ino) of the directory it watches
+        self._watches: Dict[str, Tuple[int, Tuple[int, int]]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._poll_task: Optional[asyncio.Task] = None
+        self._watcher = InotifyWatcher.create()
+
+    async def __aenter__(self) -> "AsyncCheckpointMonitor":
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def monitor(self, feature: str) -> CheckpointMonitor:
+        """
+        Get (and start watching) the CheckpointMonitor for a feature
+
+        Args:
+            feature: The feature name
+
+        Returns:
+            The feature's CheckpointMonitor
+        """
+        if feature in self._monitors:
+            return self._monitors[feature]
+
+        monitor = CheckpointMonitor(feature, self.role)
+        self._monitors[feature] = monitor
+        self._features_by_dir[monitor.checkpoint_dir] = feature
+        self._waiters[feature] = []
+        self._start()
+
+        if self._watcher:
+            self._watch(feature)
+        self._seen[feature] = self._scan(monitor.checkpoint_dir)
+        self._ensure_poller()
+
+        return monitor
+
+    async def wait_for(self, feature: str, pattern: str, timeout: Optional[float] = 300) -> CheckpointArrival:
+        """
+        Wait for one checkpoint pattern in one feature
+
+        Args:
+            feature: The feature name
+            pattern: Glob pattern to match checkpoint files (e.g., "003-*.md")
+            timeout: Maximum time to wait in seconds (None waits forever)
+
+        Returns:
+            The matching checkpoint
+
+        Raises:
+            TimeoutError: If no matching checkpoint arrives within timeout
+        """
+        return await self.wait_any([(feature, pattern)], timeout)
+
+    async def wait_any(self, waits: Iterable[Tuple[str, str]], timeout: Optional[float] = 300) -> CheckpointArrival:
+        """
+        Wait until any of several (feature, pattern) pairs is satisfied
+
+        Args:
+            waits: (feature, pattern) pairs
+            timeout: Maximum time to wait in seconds (None waits forever)
+
+        Returns:
+            The first matching checkpoint
+
+        Raises:
+            TimeoutError: If nothing matches within timeout
+        """
+        waits = list(waits)
+        future = asyncio.get_running_loop().create_future()
+        start_time = time.time()
+        records: List[Tuple[str, WaitRecord]] = []
+        registered = []
+
+        try:
+            for feature, pattern in waits:
+                monitor = self.monitor(feature)
+                monitor.log(f"Waiting for checkpoint matching: {pattern}", event="wait_start", pattern=pattern)
+                record = WaitRecord(pattern)
+                records.append((feature, record))
+                glob_start = time.perf_counter()
+                existing = sorted(path for path in monitor.checkpoint_dir.glob(pattern)
+                                  if not is_sidecar(path.name) and not is_hidden(path.name))
+                record.glob_seconds.append(time.perf_counter() - glob_start)
+                record.polls = record.listings = 1
+                if existing:
+                    record.outcome = "found"
+                    future.set_result(CheckpointArrival(feature, existing[0].name, existing[0]))
+                    break
+                entry = (Path(pattern).name, future, record)
+                self._waiters[feature].append(entry)
+                registered.append((feature, entry))
+
+            try:
+                arrival = await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                described = ", ".join(f"{f}:{p}" for f, p in waits)
+                error_msg = f"Timeout: No checkpoint matching {described} after {timeout}s"
+                for feature, record in records:
+                    record.outcome = "timeout"
+                    self._monitors[feature].finish_wait(record, start_time)
+                for feature in {f for f, _ in waits}:
+                    self._monitors[feature].log(error_msg, level="ERROR", event="wait_timeout")
+                raise TimeoutError(error_msg) from None
+
+            # Pairs that lost the race to another match did not finish, so only the winner is recorded
+            for feature, record in records:
+                if record.outcome == "found":
+                    self._monitors[feature].finish_wait(record, start_time)
+            self._monitors[arrival.feature].log(f"Found checkpoint: {arrival.name}", event="checkpoint_found",
+                                                checkpoint=arrival.name)
+            return arrival
+        finally:
+            for feature, entry in registered:
+                try:
+                    self._waiters[feature].remove(entry)
+                except ValueError:
+                    pass
+
+    async def wait_all(self, waits: Iterable[Tuple[str, str]], timeout: Optional[float] = 300) -> List[CheckpointArrival]:
+        """
+        Wait until every (feature, pattern) pair is satisfied
+
+        Args:
+            waits: (feature, pattern) pairs
+            timeout: Maximum time to wait for all of them in seconds (None waits forever)
+
+        Returns:
+            Matching checkpoints, in the order of waits
+
+        Raises:
+            TimeoutError: If any pair is still unmatched at timeout
+        """
+        waits = list(waits)
+        # Each pair times out on its own (at the same deadline) so its wait is recorded as a timeout
+        results = await asyncio.gather(*(self.wait_for(f, p, timeout) for f, p in waits), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, TimeoutError):
+                raise result
+        missing = ", ".join(f"{f}:{p}" for (f, p), r in zip(waits, results) if isinstance(r, TimeoutError))
+        if missing:
+            raise TimeoutError(f"Timeout: No checkpoint matching {missing} after {timeout}s")
+
+        return results
+
+    async def arrivals(self, features: Optional[Iterable[str]] = None) -> AsyncIterator[CheckpointArrival]:
+        """
+        Iterate over checkpoints as they land
+
+        Args:
+            features: Features to follow (default: every feature watched by this monitor)
+
+        Yields:
+            Each new checkpoint, in arrival order
+        """
+        wanted = set(features) if features is not None else None
+        for feature in wanted or ():
+            self.monitor(feature)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        subscriber = (wanted, queue)
+        self._subscribers.append(subscriber)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.remove(subscriber)
+
+    def close(self):
+        """Stop watching and release the inotify descriptor"""
+        self._stop_watcher()
+        if self._poll_task:
+            self._poll_task.cancel()
+            self._poll_task = None
+
+    def _start(self):
+        """Attach the inotify reader to the running loop on first use"""
+        if self._loop is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        if self._watcher:
+            self._loop.add_reader(self._watcher.fd, self._on_inotify)
+
+    def _stop_watcher(self):
+        """Detach and close the inotify watcher; the poller then covers every feature"""
+        if not self._watcher:
+            return
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.remove_reader(self._watcher.fd)
+        self._watcher.close()
+        self._watcher = None
+        self._watches.clear()
+
+    def _watch(self, feature: str):
+        """Point the feature's watch at the directory runs/current resolves to now, if it moved"""
+        directory = self._monitors[feature].checkpoint_dir
+        try:
+            stat = os.stat(directory)
+        except FileNotFoundError:
+            return  # Mid re-point; the next rescan tries again
+        current = self._watches.get(feature)
+        if current is not None and current[1] == (stat.st_dev, stat.st_ino):
+            return
+
+        try:
+            wd = self._watcher.add_watch(directory)
+        except OSError as e:
+            self._monitors[feature].log(f"inotify unavailable ({e}), falling back to polling", level="WARNING",
+                                        event="inotify_unavailable")
+            self._stop_watcher()
+            return
+        if current is not None and current[0] != wd:
+            self._watcher.remove_watch(current[0])
+        self._watches[feature] = (wd, (stat.st_dev, stat.st_ino))
+
+    def _ensure_poller(self):
+        """Start the shared polling task if it is not running"""
+        if self._poll_task is None or self._poll_task.done():
+            self._poll_task = asyncio.ensure_future(self._poll())
+
+    async def _poll(self):
+        """Rescan periodically: the only detection without inotify, a safety net with it"""
+        while True:
+            await asyncio.sleep(self.rescan_interval if self._watcher else self.poll_interval)
+            self._rescan()
+
+    def _rescan(self):
+        """Re-aim the watches and dispatch every checkpoint the events did not deliver"""
+        for feature, monitor in list(self._monitors.items()):
+            if self._watcher:
+                self._watch(feature)
+            scan_start = time.perf_counter()
+            current = self._scan(monitor.checkpoint_dir)
+            scan_seconds = time.perf_counter() - scan_start
+            for _pattern, _future, record in self._waiters.get(feature, ()):
+                record.polls += 1
+                record.listings += 1
+                record.glob_seconds.append(scan_seconds)
+
+            seen = self._seen.setdefault(feature, {})
+            for name in sorted(current):
+                if seen.get(name) != current[name]:
+                    self._dispatch(feature, name)
+            # Forget removed files so a checkpoint written again under the same name is new
+            for name in set(seen) - set(current):
+                del seen[name]
+
+    def _on_inotify(self):
+        """Loop reader callback: fan inotify events out to waiters and subscribers"""
+        overflowed = False
+        for directory, name, mask in self._watcher.read_events():
+            if mask & IN_Q_OVERFLOW:
+                overflowed = True
+                continue
+            feature = self._features_by_dir.get(directory)
+            if feature is not None and name:
+                self._dispatch(feature, name, woken=True)
+        if overflowed:
+            for monitor in self._monitors.values():
+                monitor.log("inotify queue overflowed, rescanning", level="WARNING", event="inotify_overflow")
+            self._rescan()
+
+    def _dispatch(self, feature: str, name: str, woken: bool = False):
+        """Resolve waiters and notify subscribers for a newly landed file, once per name and inode"""
+        if is_sidecar(name) or is_hidden(name):
+            return
+        path = self._monitors[feature].checkpoint_dir / name
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return  # Already gone again; nothing to hand out
+        seen = self._seen.setdefault(feature, {})
+        # An in-place rewrite fires IN_CLOSE_WRITE again, and a rescan may find what an event
+        # already delivered; neither is a new checkpoint. A replacement renamed in has a new inode
+        if seen.get(name) == stat.st_ino:
+            return
+        seen[name] = stat.st_ino
+
+        arrival = CheckpointArrival(feature, name, path)
+        for pattern, future, record in self._waiters.get(feature, ()):
+            if not future.done() and fnmatch(name, pattern):
+                record.outcome = "found"
+                record.wakeups += woken
+                record.detect_latency = max(time.time() - stat.st_mtime, 0.0)
+                future.set_result(arrival)
+        for wanted, queue in self._subscribers:
+            if wanted is None or feature in wanted:
+                queue.put_nowait(arrival)
+
+    @staticmethod
+    def _scan(directory: Path) -> Dict[str, int]:
+        """Map each checkpoint in a directory to its inode, tolerating the directory disappearing"""
+        inodes = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if is_sidecar(entry.name) or is_hidden(entry.name):
+                        continue
+                    try:
+                        # Not entry.inode(): overlayfs may report a d_ino that differs from st_ino
+                        inodes[entry.name] = entry.stat().st_ino
+                    except FileNotFoundError:
+                        pass
+        except FileNotFoundError:
+            pass
+        return inodes
+
+
+def _parse_waits(specs: List[str]) -> List[Tuple[str, str]]:
+    """Parse feature:pattern command-line arguments"""
+    waits = []
+    for spec in specs:
+        feature, sep, pattern = spec.partition(":")
+        if not sep or not feature or not pattern:
+            raise ValueError(f"Expected feature:pattern, got: {spec}")
+        waits.append((feature, pattern))
+    return waits
+
+
+def main():
+    """Command-line interface for multi-feature checkpoint waits"""
+    parser = argparse.ArgumentParser(description="Wait for checkpoints across several features in one process")
+    parser.add_argument("role", help="Instance role (usually orchestrator)")
+
+    subparsers = parser.add_subparsers(dest="command", help="Command to execute")
+
+    for command, help_text in (("wait-any", "Wait until any pattern matches"),
+                               ("wait-all", "Wait until every pattern matches")):
+        wait_parser = subparsers.add_parser(command, help=help_text)
+        wait_parser.add_argument("waits", nargs="+", help="feature:pattern pairs (e.g., auth-api:003-*.md)")
+        wait_parser.add_argument("--timeout", type=int, default=300, help="Timeout in seconds")
+
+    args = parser.parse_args()
+
+    if args.command not in ("wait-any", "wait-all"):
+        parser.print_help()
+        return
+
+    async def run():
+        async with AsyncCheckpointMonitor(args.role) as monitor:
+            waits = _parse_waits(args.waits)
+            if args.command == "wait-any":
+                return [await monitor.wait_any(waits, args.timeout)]
+            return await monitor.wait_all(waits, args.timeout)
+
+    try:
+        arrivals = asyncio.run(run())
+    except (TimeoutError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    for arrival in arrivals:
+        print(f"{arrival.feature}: {arrival.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# tmops_tools/broker_client.py
+# Blocking client for checkpoint_broker.py; standard library only, so it is cheap to import
+
+import os
+import json
+import socket
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterator
+
+DEFAULT_SOCKET = Path("../.tmops/broker.sock")
+
+
+class BrokerClient:
+    """Small blocking client for CheckpointBroker"""
+
+    def __init__(self, socket_path: Path = DEFAULT_SOCKET, timeout: Optional[float] = None):
+        """
+        Connect to a running broker
+
+        Args:
+            socket_path: The broker's Unix domain socket
+            timeout: Socket timeout in seconds (None blocks)
+
+        Raises:
+            OSError: If no broker is listening
+        """
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.settimeout(timeout)
+            self.sock.connect(str(socket_path))
+        except OSError:
+            self.sock.close()
+            raise
+        self._lines = self.sock.makefile("r", encoding="utf-8")
+
+    def __enter__(self) -> "BrokerClient":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Close the connection"""
+        self._lines.close()
+        self.sock.close()
+
+    def request(self, op: str, **fields) -> Dict[str, Any]:
+        """
+        Send one request and return its reply
+
+        Args:
+            op: Operation (ping, create, list, get, wait)
+            **fields: Operation arguments (feature, role, name, content, pattern, timeout...)
+
+        Returns:
+            The broker's reply
+
+        Raises:
+            RuntimeError: If the broker reports an error
+        """
+        self.sock.sendall(json.dumps(dict(fields, op=op)).encode() + b"\n")
+        reply = self._read()
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error", "broker error"))
+        return reply
+
+    def subscribe(self, features, pattern: str = "*") -> Iterator[Dict[str, Any]]:
+        """
+        Stream checkpoint arrivals pushed by the broker
+
+        Args:
+            features: Feature names to follow
+            pattern: Only push checkpoints whose name matches this glob
+
+        Yields:
+            Event dicts with feature, name and path
+        """
+        self.request("subscribe", features=list(features), pattern=pattern)
+        while True:
+            yield self._read()
+
+    def _read(self) -> Dict[str, Any]:
+        """Read one JSON line from the broker"""
+        line = self._lines.readline()
+        if not line:
+            raise ConnectionError("Broker closed the connection")
+        return json.loads(line)
+
+
+def connect(socket_path: Optional[Path] = None) -> Optional[BrokerClient]:
+    """
+    Connect to the broker if one is listening
+
+    Args:
+        socket_path: The broker's socket (default: TMOPS_BROKER_SOCKET or ../.tmops/broker.sock)
+
+    Returns:
+        A connected client, or None when TMOPS_BROKER=off or no broker is listening
+    """
+    if os.environ.get("TMOPS_BROKER", "auto") == "off":
+        return None
+    if socket_path is None:
+        socket_path = Path(os.environ.get("TMOPS_BROKER_SOCKET", DEFAULT_SOCKET))
+    if not socket_path.exists():
+        return None
+    try:
+        return BrokerClient(socket_path)
+    except OSError:
+        return None
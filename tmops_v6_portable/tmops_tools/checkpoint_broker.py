@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# tmops_tools/checkpoint_broker.py
+# Optional long-lived checkpoint broker serving create/list/get/wait/subscribe over a Unix socket
+
+import os
+import sys
+import json
+import socket
+import signal
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable, Set, Tuple
+
+from monitor_checkpoints import CheckpointMonitor
+from async_monitor import AsyncCheckpointMonitor, CheckpointArrival
+from broker_client import BrokerClient, DEFAULT_SOCKET  # noqa: F401 (re-exported for Python callers)
+
+BROKER_ROLE = "broker"
+
+
+class CheckpointBroker:
+    """Owns the .tmops tree for one project and serves checkpoint requests to many clients
+
+    Protocol: one JSON object per line in each direction. Every request carries an
+    "op"; replies carry "ok" plus results or an "error". Checkpoints are still
+    written to disk, so tools running without the broker keep working.
+
+    create, list and get take feature locks and touch SQLite, so they run on one
+    worker thread per feature instead of the event loop. Each feature's monitors
+    are created and used only on its thread (SQLite connections are per thread),
+    and requests for one feature keep their order.
+    """
+
+    def __init__(self, socket_path: Path = DEFAULT_SOCKET):
+        """
+        Initialize the broker
+
+        Args:
+            socket_path: Unix domain socket to listen on
+        """
+        self.socket_path = Path(socket_path)
+        self.watcher = AsyncCheckpointMonitor(BROKER_ROLE)
+        # Waits are logged and counted under the waiting role, as if it had waited itself
+        self._watchers: Dict[str, AsyncCheckpointMonitor] = {BROKER_ROLE: self.watcher}
+        self._monitors: Dict[Tuple[str, str], CheckpointMonitor] = {}
+        self._workers: Dict[str, ThreadPoolExecutor] = {}
+        self._clients: Set[asyncio.Task] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def serve(self):
+        """Listen until cancelled (SIGINT/SIGTERM)"""
+        self._claim_socket()
+        self._server = await asyncio.start_unix_server(self._handle_client, path=str(self.socket_path))
+        os.chmod(self.socket_path, 0o600)
+        print(f"Checkpoint broker listening on {self.socket_path}")
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        try:
+            async with self._server:
+                try:
+                    await stop.wait()
+                finally:
+                    await self._drop_clients()
+        finally:
+            for watcher in self._watchers.values():
+                watcher.close()
+            for worker in self._workers.values():
+                worker.shutdown()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+
+    def _claim_socket(self):
+        """Remove a stale socket file, or refuse to start if a broker is live"""
+        if not self.socket_path.exists():
+            self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(self.socket_path))
+        except OSError:
+            self.socket_path.unlink()
+            return
+        finally:
+            probe.close()
+        raise RuntimeError(f"A broker is already listening on {self.socket_path}")
+
+    async def _drop_clients(self):
+        """End every open connection (subscribers never hang up by themselves)"""
+        clients = list(self._clients)
+        for task in clients:
+            task.cancel()
+        await asyncio.gather(*clients, return_exceptions=True)
+
+    def _monitor(self, feature: str, role: str) -> CheckpointMonitor:
+        """Reuse one CheckpointMonitor per (feature, role); call only on the feature's worker thread"""
+        key = (feature, role)
+        if key not in self._monitors:
+            self._monitors[key] = CheckpointMonitor(feature, role)
+        return self._monitors[key]
+
+    def _watcher(self, role: str) -> AsyncCheckpointMonitor:
+        """Reuse one AsyncCheckpointMonitor per waiting role"""
+        if role not in self._watchers:
+            self._watchers[role] = AsyncCheckpointMonitor(role)
+        return self._watchers[role]
+
+    async def _in_worker(self, feature: str, role: str, call: Callable[[CheckpointMonitor], Any]) -> Any:
+        """Run call(monitor) on the feature's worker thread and await its result"""
+        worker = self._workers.get(feature)
+        if worker is None:
+            worker = self._workers[feature] = ThreadPoolExecutor(max_workers=1,
+                                                                 thread_name_prefix=f"broker-{feature}")
+        return await asyncio.get_running_loop().run_in_executor(
+            worker, lambda: call(self._monitor(feature, role)))
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one connection until the client disconnects or the broker stops"""
+        task = asyncio.current_task()
+        self._clients.add(task)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    op = request.get("op")
+                    if op == "subscribe":
+                        await self._subscribe(request, reader, writer)
+                        break
+                    reply = await self._dispatch(op, request)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                await self._send(writer, reply)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Stopped by _drop_clients; returning normally keeps asyncio's stream
+            # callback from logging the cancellation as an unhandled exception
+            pass
+        finally:
+            self._clients.discard(task)
+            writer.close()
+
+    async def _dispatch(self, op: Optional[str], request: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one request/reply operation"""
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid()}
+
+        feature = request["feature"]
+        role = request.get("role", BROKER_ROLE)
+
+        if op == "create":
+            path = await self._in_worker(feature, role, lambda monitor: monitor.create_checkpoint(
+                request["name"], request["content"], request.get("metadata"), request.get("shard"),
+                request.get("shards")))
+            return {"ok": True, "path": os.path.abspath(path)}
+
+        if op == "list":
+            checkpoints = await self._in_worker(feature, role, lambda monitor: monitor.list_checkpoints())
+            return {"ok": True, "checkpoints": checkpoints}
+
+        if op == "get":
+            content = await self._in_worker(feature, role, lambda monitor: monitor.get_checkpoint_content(
+                request["name"], request.get("max_bytes"), request.get("run")))
+            if content is None:
+                return {"ok": False, "error": f"Checkpoint not found: {request['name']}"}
+            return {"ok": True, "name": request["name"], "content": content}
+
+        if op == "wait":
+            arrival = await self._watcher(role).wait_for(feature, request["pattern"], request.get("timeout", 300))
+            return dict(self._event(arrival), ok=True)
+
+        raise ValueError(f"Unknown op: {op}")
+
+    async def _subscribe(self, request: Dict[str, Any], reader: asyncio.StreamReader,
+                         writer: asyncio.StreamWriter):
+        """Push every new checkpoint of the requested features until the client goes away"""
+        features = request.get("features") or [request["feature"]]
+        pattern = request.get("pattern", "*")
+        arrivals = self.watcher.arrivals(features)
+
+        async def push():
+            async for arrival in arrivals:
+                if fnmatch(arrival.name, pattern):
+                    await self._send(writer, self._event(arrival))
+
+        try:
+            await self._send(writer, {"ok": True, "subscribed": features})
+            # A subscriber sends nothing more; EOF on its side ends the subscription
+            tasks = [asyncio.ensure_future(push()), asyncio.ensure_future(reader.read())]
+            try:
+                await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            # Here rather than in push(): a cancelled task must not await the generator's cleanup
+            await arrivals.aclose()
+
+    @staticmethod
+    def _event(arrival: CheckpointArrival) -> Dict[str, Any]:
+        """Serialize an arrival for the wire (absolute path: clients need not share our working directory)"""
+        return {"event": "checkpoint", "feature": arrival.feature, "name": arrival.name,
+                "path": os.path.abspath(arrival.path)}
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, message: Dict[str, Any]):
+        """Write one JSON line and wait for the transport to drain"""
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+
+
+def main():
+    """Command-line interface for the checkpoint broker"""
+    parser = argparse.ArgumentParser(description="Serve TeamOps checkpoints over a Unix domain socket")
+    parser.add_argument("--socket", default=str(DEFAULT_SOCKET), help="Socket path (default: %(default)s)")
+
+    subparsers = parser.add_subparsers(dest="command", help="Command to execute")
+
+    subparsers.add_parser("serve", help="Run the broker in the foreground")
+    subparsers.add_parser("ping", help="Check whether a broker is running")
+
+    create_parser = subparsers.add_parser("create", help="Create a checkpoint via the broker")
+    create_parser.add_argument("feature", help="Feature name")
+    create_parser.add_argument("role", help="Instance role writing the checkpoint")
+    create_parser.add_argument("name", help="Checkpoint name")
+    create_parser.add_argument("content", help="Checkpoint content")
+    create_parser.add_argument("--shard", metavar="K/M",
+                               help="Write shard K of M (name becomes <name>.shard-K-of-M.md)")
+
+    list_parser = subparsers.add_parser("list", help="List a feature's checkpoints via the broker")
+    list_parser.add_argument("feature", help="Feature name")
+
+    get_parser = subparsers.add_parser("get", help="Print a checkpoint's content via the broker")
+    get_parser.add_argument("feature", help="Feature name")
+    get_parser.add_argument("name", help="Checkpoint name")
+    get_parser.add_argument("--max-bytes", type=int, help="Read at most this many bytes")
+    get_parser.add_argument("--run", help="Read from this run (or archived run) instead of the current one")
+
+    wait_parser = subparsers.add_parser("wait", help="Wait for a checkpoint via the broker")
+    wait_parser.add_argument("feature", help="Feature name")
+    wait_parser.add_argument("pattern", help="Checkpoint pattern to wait for")
+    wait_parser.add_argument("--timeout", type=int, default=300, help="Timeout in seconds")
+    wait_parser.add_argument("--role", default=BROKER_ROLE, help="Role to log the wait under (default: %(default)s)")
+
+    subscribe_parser = subparsers.add_parser("subscribe", help="Print checkpoint arrivals as JSON lines")
+    subscribe_parser.add_argument("features", nargs="+", help="Feature names")
+    subscribe_parser.add_argument("--pattern", default="*", help="Checkpoint name filter")
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        try:
+            asyncio.run(CheckpointBroker(Path(args.socket)).serve())
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    if args.command not in ("ping", "create", "list", "get", "wait", "subscribe"):
+        parser.print_help()
+        return
+
+    try:
+        client = BrokerClient(Path(args.socket))
+    except OSError as e:
+        print(f"Error: No broker listening on {args.socket} ({e})", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        if args.command == "ping":
+            print(f"Broker running (pid {client.request('ping')['pid']})")
+        elif args.command == "create":
+            shard = shards = None
+            if args.shard:
+                try:
+                    shard, shards = (int(part) for part in args.shard.split("/"))
+                except ValueError as e:
+                    print(f"Error: Invalid --shard {args.shard} ({e})", file=sys.stderr)
+                    sys.exit(1)
+            reply = client.request("create", feature=args.feature, role=args.role, name=args.name,
+                                   content=args.content, shard=shard, shards=shards)
+            print(f"Created checkpoint: {Path(reply['path']).name}")
+        elif args.command == "list":
+            for name in client.request("list", feature=args.feature)["checkpoints"]:
+                print(name)
+        elif args.command == "get":
+            print(client.request("get", feature=args.feature, name=args.name, max_bytes=args.max_bytes,
+                                 run=args.run)["content"])
+        elif args.command == "wait":
+            reply = client.request("wait", feature=args.feature, role=args.role, pattern=args.pattern,
+                                   timeout=args.timeout)
+            print(reply["path"])
+        elif args.command == "subscribe":
+            for event in client.subscribe(args.features, args.pattern):
+                print(json.dumps(event), flush=True)
+    except (RuntimeError, ConnectionError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
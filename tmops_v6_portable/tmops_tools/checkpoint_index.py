@@ -0,0 +1,369 @@
+# tmops_tools/checkpoint_index.py
+# Persistent per-feature checkpoint index (SQLite) for listing and run info without globbing
+
+import os
+import re
+import time
+import sqlite3
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+INDEX_FILENAME = "checkpoints.sqlite"
+INDEX_SCHEMA_VERSION = 1
+
+# Only the header of a checkpoint is read when (re)indexing
+HEADER_BYTES = 4096
+_HEADER_FIELD = re.compile(r'^\*\*(From|To|Timestamp|Feature):\*\* (.+)$', re.MULTILINE)
+_SHARD_NAME = re.compile(r'^(.+)\.shard-(\d+)-of-(\d+)\.md$')
+
+# Machine-readable metadata written next to each checkpoint as "<name>.json"
+SIDECAR_SUFFIX = ".json"
+
+# A directory mtime read this soon after it was set can still be shared by a later
+# write in the same timestamp tick, so it is not recorded as "in sync" until it settles
+RACY_MTIME_WINDOW_NS = 2_000_000_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run TEXT PRIMARY KEY,
+    dir_mtime_ns INTEGER
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    run TEXT NOT NULL,
+    name TEXT NOT NULL,
+    role TEXT,
+    timestamp TEXT,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    phase TEXT,
+    PRIMARY KEY (run, name)
+);
+"""
+
+
+def checkpoint_phase(name: str) -> Optional[str]:
+    """
+    Map a checkpoint filename to its workflow phase
+
+    Args:
+        name: The checkpoint filename
+
+    Returns:
+        discovery, testing, implementation, verification, or None
+    """
+    if "discovery" in name:
+        return "discovery"
+    elif "tests-complete" in name:
+        return "testing"
+    elif "impl-complete" in name:
+        return "implementation"
+    elif "verify-complete" in name:
+        return "verification"
+    return None
+
+
+def shard_checkpoint_name(name: str, shard: int, shards: int) -> str:
+    """
+    Name of one shard's checkpoint when a phase is fanned out across instances
+
+    Args:
+        name: The unsharded checkpoint name (e.g. "004-tests-complete.md")
+        shard: This instance's shard number, 1-based
+        shards: Total number of shards
+
+    Returns:
+        e.g. "004-tests-complete.shard-2-of-3.md"
+
+    Raises:
+        ValueError: If the shard numbers are out of range
+    """
+    if not 1 <= shard <= shards:
+        raise ValueError(f"Shard {shard} is outside 1..{shards}")
+    base = name[:-3] if name.endswith(".md") else name
+    return f"{base}.shard-{shard}-of-{shards}.md"
+
+
+def shard_pattern(name: str, shards: int) -> str:
+    """Glob matching every shard checkpoint of name for a fan-out of shards"""
+    base = name[:-3] if name.endswith(".md") else name
+    return f"{base}.shard-*-of-{shards}.md"
+
+
+def parse_shard_name(name: str) -> Optional[Tuple[str, int, int]]:
+    """
+    Split a shard checkpoint name
+
+    Args:
+        name: A checkpoint filename
+
+    Returns:
+        (unsharded name, shard, shards), or None for an ordinary checkpoint
+    """
+    match = _SHARD_NAME.match(name)
+    if not match:
+        return None
+    return f"{match.group(1)}.md", int(match.group(2)), int(match.group(3))
+
+
+def sidecar_path(checkpoint_path: Path) -> Path:
+    """Path of a checkpoint's JSON sidecar (e.g. "003-tests-complete.md.json")"""
+    checkpoint_path = Path(checkpoint_path)
+    return checkpoint_path.with_name(checkpoint_path.name + SIDECAR_SUFFIX)
+
+
+def is_sidecar(name: str) -> bool:
+    """Whether a filename is a checkpoint sidecar rather than a checkpoint"""
+    return name.endswith(SIDECAR_SUFFIX)
+
+
+def is_hidden(name: str) -> bool:
+    """Whether a filename is hidden or an in-flight temp file (editors, rsync, older writers), never a checkpoint"""
+    return name.startswith(".") or name.endswith(".tmp")
+
+
+def read_checkpoint_header(path: Path) -> Dict[str, str]:
+    """
+    Parse the **From:** / **To:** / **Timestamp:** / **Feature:** header of a checkpoint
+
+    Args:
+        path: Path to the checkpoint file
+
+    Returns:
+        Header fields keyed by lowercase name (missing fields are omitted)
+    """
+    with open(path, "rb") as f:
+        head = f.read(HEADER_BYTES).decode(errors="replace")
+    header: Dict[str, str] = {}
+    for key, value in _HEADER_FIELD.findall(head):
+        header.setdefault(key.lower(), value.strip())
+    return header
+
+
+class CheckpointIndex:
+    """SQLite index of every checkpoint in every run of one feature"""
+
+    def __init__(self, feature_dir: Path):
+        """
+        Open (creating if needed) the index of a feature
+
+        Args:
+            feature_dir: The .tmops/<feature> directory
+        """
+        self.feature_dir = Path(feature_dir)
+        self.runs_dir = self.feature_dir / "runs"
+        self.index_file = self.feature_dir / INDEX_FILENAME
+
+        self.feature_dir.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.index_file), timeout=10, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(_SCHEMA)
+
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is None or int(row["value"]) != INDEX_SCHEMA_VERSION:
+            with self.db:
+                self.db.execute("BEGIN IMMEDIATE")
+                self.db.execute("DELETE FROM checkpoints")
+                self.db.execute("DELETE FROM runs")
+                self.db.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)",
+                                (str(INDEX_SCHEMA_VERSION),))
+
+    def close(self):
+        """Close the database connection"""
+        self.db.close()
+
+    @staticmethod
+    def run_name(checkpoint_dir: Path) -> str:
+        """
+        Resolve the run a checkpoint directory belongs to (follows runs/current)
+
+        Args:
+            checkpoint_dir: A runs/<run>/checkpoints directory
+
+        Returns:
+            The run directory name
+        """
+        return Path(checkpoint_dir).parent.resolve().name
+
+    def record(self, checkpoint_path: Path, dir_mtime_before: Optional[int] = None,
+               role: Optional[str] = None, timestamp: Optional[str] = None):
+        """
+        Add or update one checkpoint right after it was written
+
+        If the directory was in sync before the write (its mtime then matches the
+        indexed one), the index is marked in sync again once the new directory
+        mtime has settled (see RACY_MTIME_WINDOW_NS); until then sync re-lists.
+
+        Args:
+            checkpoint_path: Path to the written checkpoint
+            dir_mtime_before: Checkpoint directory mtime_ns captured before the write
+            role: Writing role (parsed from the header if omitted)
+            timestamp: Checkpoint timestamp (parsed from the header if omitted)
+        """
+        checkpoint_path = Path(checkpoint_path)
+        checkpoint_dir = checkpoint_path.parent
+        run = self.run_name(checkpoint_dir)
+        stat = checkpoint_path.stat()
+
+        if role is None or timestamp is None:
+            header = read_checkpoint_header(checkpoint_path)
+            role = role or header.get("from")
+            timestamp = timestamp or header.get("timestamp")
+
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            self._upsert(run, checkpoint_path.name, role, timestamp, stat.st_size, stat.st_mtime_ns)
+            indexed = self.db.execute("SELECT dir_mtime_ns FROM runs WHERE run = ?", (run,)).fetchone()
+            if indexed is not None and dir_mtime_before is not None and indexed["dir_mtime_ns"] == dir_mtime_before:
+                self.db.execute("UPDATE runs SET dir_mtime_ns = ? WHERE run = ?",
+                                (self._settled(checkpoint_dir.stat().st_mtime_ns), run))
+
+    def sync(self, checkpoint_dir: Path) -> str:
+        """
+        Bring one run up to date with files written by other tools
+
+        While the directory mtime matches the indexed one, costs a stat of the
+        directory and of each indexed checkpoint (catching rewrites in place);
+        otherwise re-lists the directory. Headers are read only for new or
+        changed checkpoints. Hidden and temp files are never indexed.
+
+        Args:
+            checkpoint_dir: A runs/<run>/checkpoints directory
+
+        Returns:
+            The run name
+        """
+        checkpoint_dir = Path(checkpoint_dir)
+        run = self.run_name(checkpoint_dir)
+        try:
+            dir_mtime = checkpoint_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            return run
+
+        indexed = self.db.execute("SELECT dir_mtime_ns FROM runs WHERE run = ?", (run,)).fetchone()
+        listed = indexed is not None and indexed["dir_mtime_ns"] == dir_mtime
+        known = {row["name"]: row for row in
+                 self.db.execute("SELECT name, size, mtime_ns FROM checkpoints WHERE run = ?", (run,))}
+
+        if listed:
+            # Same set of names as last time; only a rewrite in place can have changed a checkpoint
+            names = list(known)
+        else:
+            with os.scandir(checkpoint_dir) as entries:
+                names = [entry.name for entry in entries
+                         if entry.name.endswith(".md") and not is_hidden(entry.name) and entry.is_file()]
+
+        present = {}
+        for name in names:
+            try:
+                present[name] = os.stat(checkpoint_dir / name)
+            except FileNotFoundError:
+                continue
+        changed = [name for name, stat in present.items()
+                   if name not in known or (known[name]["size"], known[name]["mtime_ns"]) != (stat.st_size,
+                                                                                             stat.st_mtime_ns)]
+        if listed and not changed and len(present) == len(known):
+            return run
+
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            for name in changed:
+                header = read_checkpoint_header(checkpoint_dir / name)
+                self._upsert(run, name, header.get("from"), header.get("timestamp"),
+                             present[name].st_size, present[name].st_mtime_ns)
+            for name in set(known) - set(present):
+                self.db.execute("DELETE FROM checkpoints WHERE run = ? AND name = ?", (run, name))
+            self.db.execute("INSERT OR REPLACE INTO runs VALUES (?, ?)", (run, self._settled(dir_mtime)))
+
+        return run
+
+    @staticmethod
+    def _settled(dir_mtime: int) -> Optional[int]:
+        """dir_mtime if it is old enough to mark the run in sync, else None (forces a re-list next time)"""
+        if time.time() * 1e9 - dir_mtime < RACY_MTIME_WINDOW_NS:
+            return None
+        return dir_mtime
+
+    def reindex(self) -> int:
+        """
+        Rebuild the whole index from disk
+
+        Returns:
+            Number of checkpoints indexed
+        """
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            self.db.execute("DELETE FROM checkpoints")
+            self.db.execute("DELETE FROM runs")
+
+        if self.runs_dir.is_dir():
+            for run_dir in sorted(self.runs_dir.iterdir()):
+                # runs/current is usually a symlink to a real run
+                if run_dir.is_symlink() or not (run_dir / "checkpoints").is_dir():
+                    continue
+                self.sync(run_dir / "checkpoints")
+
+        return self.db.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+
+    def forget(self, run: str):
+        """
+        Drop a deleted run from the index
+
+        Args:
+            run: The run name
+        """
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            self.db.execute("DELETE FROM checkpoints WHERE run = ?", (run,))
+            self.db.execute("DELETE FROM runs WHERE run = ?", (run,))
+
+    def checkpoints(self, run: str) -> List[Dict[str, Any]]:
+        """
+        List indexed checkpoints of a run
+
+        Args:
+            run: The run name
+
+        Returns:
+            Rows with name, role, timestamp, size, mtime_ns and phase, sorted by name
+        """
+        rows = self.db.execute(
+            "SELECT name, role, timestamp, size, mtime_ns, phase FROM checkpoints WHERE run = ? ORDER BY name",
+            (run,))
+        return [dict(row) for row in rows]
+
+    def lookup(self, run: str, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up one checkpoint
+
+        Args:
+            run: The run name
+            name: The checkpoint filename
+
+        Returns:
+            The indexed row, or None
+        """
+        row = self.db.execute(
+            "SELECT name, role, timestamp, size, mtime_ns, phase FROM checkpoints WHERE run = ? AND name = ?",
+            (run, name)).fetchone()
+        return dict(row) if row else None
+
+    def runs(self) -> Dict[str, int]:
+        """
+        Count indexed checkpoints per run
+
+        Returns:
+            Checkpoint count keyed by run name
+        """
+        rows = self.db.execute("SELECT run, COUNT(name) AS n FROM runs LEFT JOIN checkpoints USING (run) GROUP BY run")
+        return {row["run"]: row["n"] for row in rows}
+
+    def _upsert(self, run: str, name: str, role: Optional[str], timestamp: Optional[str],
+                size: int, mtime_ns: int):
+        """Insert or replace one checkpoint row"""
+        self.db.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (run, name, role, timestamp, size, mtime_ns, checkpoint_phase(name)))
+
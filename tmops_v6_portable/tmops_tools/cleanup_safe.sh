@@ -65,7 +65,12 @@ echo "💾 Creating backup..."
 mkdir -p "$BACKUP_DIR"
 
 if [[ -d "$PROJECT_ROOT/.tmops/$FEATURE" ]]; then
-    cp -r "$PROJECT_ROOT/.tmops/$FEATURE" "$BACKUP_DIR/"
+    # Reflinks, hardlinked checkpoints and deduplicated copies, so large runs back up cheaply
+    if ! command -v python3 >/dev/null 2>&1 || \
+       ! python3 "$SCRIPT_DIR/snapshot.py" copy "$PROJECT_ROOT/.tmops/$FEATURE" "$BACKUP_DIR/$FEATURE" >/dev/null; then
+        rm -rf "${BACKUP_DIR:?}/$FEATURE"
+        cp -r "$PROJECT_ROOT/.tmops/$FEATURE" "$BACKUP_DIR/"
+    fi
     echo -e "${GREEN}  ✓ Backed up .tmops/$FEATURE${NC}"
 fi
 
@@ -179,6 +184,17 @@ if [[ -d "$PROJECT_ROOT/.tmops/$FEATURE" ]]; then
     mkdir -p "$(dirname "$ARCHIVE_DIR")"
     mv "$PROJECT_ROOT/.tmops/$FEATURE" "$ARCHIVE_DIR"
     echo -e "${GREEN}  ✓ Archived to: $ARCHIVE_DIR${NC}"
+
+    # Pack each archived run into one indexed file (TMOPS_PACK_ARCHIVES=0 keeps them loose)
+    if [[ "${TMOPS_PACK_ARCHIVES:-1}" != "0" ]] && command -v python3 >/dev/null 2>&1; then
+        for run_dir in "$ARCHIVE_DIR"/runs/* "$ARCHIVE_DIR"/.archive/*; do
+            [[ -d "$run_dir" && ! -L "$run_dir" ]] || continue
+            if ! python3 "$SCRIPT_DIR/run_pack.py" pack "$run_dir" >/dev/null; then
+                echo -e "${YELLOW}  ⚠️  Could not pack $run_dir (left unpacked)${NC}"
+            fi
+        done
+        echo -e "${GREEN}  ✓ Packed archived runs${NC}"
+    fi
 else
     echo "  No $PROJECT_ROOT/.tmops/$FEATURE directory found"
 fi
@@ -2,49 +2,401 @@
 # tmops_tools/extract_metrics.py
 # Extract metrics from checkpoints and generate reports
 
+import io
 import os
 import sys
 import json
 import re
+import math
+import time
+import hashlib
+import sqlite3
 import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Tuple, Union
+
+from checkpoint_index import CheckpointIndex, INDEX_FILENAME, checkpoint_phase, parse_shard_name, sidecar_path
+from metrics_export import (EXPORT_FORMATS, checkpoint_row, run_row, export_format_for, open_row_writer,
+                            read_export_rows)
+from tracing import span, instrumented
+from run_analysis import analyze_run, format_analysis
+from metrics_query import (QUERY_METRICS, STATUSES, DEFAULT_PERCENTILES, RunTable, parse_timestamp,
+                           phase_durations, runs_from_export_rows, format_results)
+
+# Bump whenever checkpoint parsing changes so stale parse caches and sidecar metrics are discarded
+EXTRACTOR_VERSION = 1
+CACHE_FILENAME = ".metrics_cache.json"
+REPORT_FILENAME = "metrics_report.md"
+SIDECAR_VERSION = 1
+
+# Field patterns for the single-pass checkpoint scanner, compiled once at import.
+# Every pattern is line-local (nothing can match across a newline), so the first
+# match found line by line is the same one re.search would find in the whole text
+# and per-line findall results concatenate to the whole-text findall.
+# Kinds: "first" keeps the first match, "all" collects findall results.
+_FIELD_PATTERNS = {
+    "timestamp": ("first", re.compile(r'\*\*Timestamp:\*\* (.+)')),
+    "files_discovered": ("first", re.compile(r'Files discovered: (\d+)', re.IGNORECASE)),
+    "directories_found": ("first", re.compile(r'Directories: (\d+)', re.IGNORECASE)),
+    "tests_written": ("first", re.compile(r'Tests (?:written|created): (\d+)', re.IGNORECASE)),
+    "test_files": ("all", re.compile(r'(?:test|spec)[/_][\w/]+\.(?:py|js|ts|go|rs)')),
+    "coverage_percent": ("first", re.compile(r'Coverage: (\d+(?:\.\d+)?)%', re.IGNORECASE)),
+    "all_failing": ("first", re.compile(r'all tests (?:fail|failing)', re.IGNORECASE)),
+    "tests_passing": ("first", re.compile(r'(?:Tests |Passing:? )(\d+)/(\d+)', re.IGNORECASE)),
+    "files_created": ("all", re.compile(r'Created: ([\w/]+\.[\w]+)')),
+    "files_modified": ("all", re.compile(r'Modified: ([\w/]+\.[\w]+)')),
+    "lines_of_code": ("first", re.compile(r'Lines (?:of code|added): (\d+)', re.IGNORECASE)),
+    "performance": ("first", re.compile(r'Performance: ([\d.]+)(?:ms|s)', re.IGNORECASE)),
+    "issues_found": ("first", re.compile(r'Issues found: (\d+)', re.IGNORECASE)),
+    "edge_cases": ("first", re.compile(r'Edge cases: (\d+)', re.IGNORECASE)),
+    "quality_high": ("first", re.compile(r'Quality:? (?:Good|High|Excellent)', re.IGNORECASE)),
+    "quality_low": ("first", re.compile(r'Quality:? (?:Poor|Low|Needs improvement)', re.IGNORECASE)),
+    "security_concerns": ("first", re.compile(r'Security (?:issues|concerns)', re.IGNORECASE)),
+    "recommendations": ("all", re.compile(r'(?:Recommend|Suggestion):', re.IGNORECASE)),
+}
+
+# Fields scanned for each phase (timestamp is scanned for every checkpoint)
+_PHASE_FIELDS = {
+    None: [],
+    "discovery": ["files_discovered", "directories_found"],
+    "testing": ["tests_written", "test_files", "coverage_percent", "all_failing"],
+    "implementation": ["tests_passing", "files_created", "files_modified", "lines_of_code", "performance"],
+    "verification": ["issues_found", "edge_cases", "quality_high", "quality_low",
+                     "security_concerns", "recommendations"],
+}
+
+# Case-insensitive literal each field needs on a line; lines matching none are skipped
+_FIELD_TRIGGERS = {
+    "timestamp": ["timestamp:"],
+    "files_discovered": ["files discovered: "],
+    "directories_found": ["directories: "],
+    "tests_written": ["tests "],
+    "test_files": ["test", "spec"],
+    "coverage_percent": ["coverage: "],
+    "all_failing": ["all tests "],
+    "tests_passing": ["tests ", "passing"],
+    "files_created": ["created: "],
+    "files_modified": ["modified: "],
+    "lines_of_code": ["lines "],
+    "performance": ["performance: "],
+    "issues_found": ["issues found: "],
+    "edge_cases": ["edge cases: "],
+    "quality_high": ["quality"],
+    "quality_low": ["quality"],
+    "security_concerns": ["security "],
+    "recommendations": ["recommend:", "suggestion:"],
+}
+
+
+class _CheckpointScanner:
+    """Pull a fixed set of fields out of checkpoint text in one line-oriented pass"""
+    
+    def __init__(self, fields: List[str]):
+        """
+        Compile the scanner
+        
+        Args:
+            fields: Keys of _FIELD_PATTERNS to extract
+        """
+        self.fields = [(name,) + _FIELD_PATTERNS[name] for name in fields]
+        triggers = sorted({t for name in fields for t in _FIELD_TRIGGERS[name]})
+        self.trigger = re.compile("|".join(re.escape(t) for t in triggers), re.IGNORECASE)
+    
+    def scan(self, content: Union[str, Iterable[str]]) -> Dict[str, Any]:
+        """
+        Scan checkpoint text
+        
+        Args:
+            content: The checkpoint text, or an iterable of its lines (without newlines)
+        
+        Returns:
+            Match objects for "first" fields (None if absent) and lists for "all" fields
+        """
+        results: Dict[str, Any] = {}
+        pending = []
+        for name, kind, pattern in self.fields:
+            results[name] = [] if kind == "all" else None
+            pending.append((name, kind, pattern))
+        
+        trigger = self.trigger.search
+        lines = content.split("\n") if isinstance(content, str) else content
+        for line in lines:
+            if not trigger(line):
+                continue
+            
+            still_pending = []
+            for field in pending:
+                name, kind, pattern = field
+                if kind == "all":
+                    results[name].extend(pattern.findall(line))
+                    still_pending.append(field)
+                else:
+                    match = pattern.search(line)
+                    if match:
+                        results[name] = match
+                    else:
+                        still_pending.append(field)
+            pending = still_pending
+            
+            if not pending:
+                break
+        
+        return results
+
+
+_PHASE_SCANNERS = {
+    phase: _CheckpointScanner(["timestamp"] + fields) for phase, fields in _PHASE_FIELDS.items()
+}
+
+# Key order of the run summary, as _calculate_summary fills it
+_SUMMARY_ORDER = ("total_tests", "test_coverage", "test_pass_rate", "files_changed", "issues_found", "quality",
+                  "checkpoints_completed", "first_checkpoint", "last_checkpoint", "success")
+
+# How the metrics of parallel shards of one checkpoint combine
+_SHARD_SUM_KEYS = ("files_discovered", "directories_found", "tests_written", "tests_passing", "tests_total",
+                   "lines_of_code", "issues_found", "edge_cases_identified", "recommendations_count")
+_SHARD_LIST_KEYS = ("test_files", "files_created", "files_modified")
+_QUALITY_ORDER = ("low", "medium", "high")
+
+
+def merge_shard_entries(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Combine the parsed shards of each sharded checkpoint into one entry
+    
+    Shards of "<base>.md" (named "<base>.shard-K-of-M.md") become a single entry
+    named "<base>.md" at the position of the first shard, timestamped by the last
+    shard to finish. Counts are summed, file lists concatenated, the pass rate is
+    recomputed and coverage is averaged weighted by tests written.
+    
+    Args:
+        entries: Results of _parse_checkpoint, in checkpoint name order
+    
+    Returns:
+        Entries with every shard group replaced by its merged entry
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in entries:
+        shard = parse_shard_name(entry["checkpoint"])
+        if shard:
+            groups.setdefault(shard[0], []).append(entry)
+    if not groups:
+        return entries
+    
+    merged = []
+    for entry in entries:
+        shard = parse_shard_name(entry["checkpoint"])
+        if not shard:
+            merged.append(entry)
+        elif shard[0] in groups:
+            merged.append(_merge_shard_group(shard[0], groups.pop(shard[0])))
+    return merged
+
+
+def _merge_shard_group(name: str, shards: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge the parsed shards of one checkpoint (see merge_shard_entries)"""
+    parts = [shard["metrics"] for shard in shards]
+    combined: Dict[str, Any] = {}
+    
+    for key in _SHARD_SUM_KEYS:
+        values = [part[key] for part in parts if key in part]
+        if values:
+            combined[key] = sum(values)
+    
+    for key in _SHARD_LIST_KEYS:
+        values = [item for part in parts for item in part.get(key, [])]
+        if values:
+            combined[key] = list(dict.fromkeys(values))
+    
+    if "test_files" in combined:
+        combined["test_file_count"] = len(combined["test_files"])
+    if any("total_files_changed" in part for part in parts):
+        combined["total_files_changed"] = len(combined.get("files_created", [])) + \
+                                          len(combined.get("files_modified", []))
+    if combined.get("tests_total"):
+        combined["pass_rate"] = combined["tests_passing"] / combined["tests_total"] * 100
+    
+    coverage = [(part["coverage_percent"], part.get("tests_written", 0)) for part in parts
+                if "coverage_percent" in part]
+    if coverage:
+        weight = sum(w for _, w in coverage)
+        combined["coverage_percent"] = (sum(c * w for c, w in coverage) / weight if weight
+                                        else sum(c for c, _ in coverage) / len(coverage))
+    
+    if all(part.get("initial_state") == "all_failing" for part in parts):
+        combined["initial_state"] = "all_failing"
+    
+    qualities = [part["quality_assessment"] for part in parts if "quality_assessment" in part]
+    if qualities:
+        combined["quality_assessment"] = min(qualities, key=_QUALITY_ORDER.index)
+    if any("security_concerns" in part for part in parts):
+        combined["security_concerns"] = any(part.get("security_concerns") for part in parts)
+    
+    performance = [part["performance"] for part in parts if "performance" in part]
+    if performance:
+        combined["performance"] = performance[-1]
+    
+    timestamps = [shard["timestamp"] for shard in shards if shard["timestamp"] != "Unknown"]
+    return {
+        "checkpoint": name,
+        "timestamp": max(timestamps) if timestamps else "Unknown",
+        "phase": shards[0]["phase"],
+        "metrics": combined,
+        "shards": len(shards),
+    }
+
+
+# Files modified this close to the last cache write are re-hashed even when
+# size and mtime match, since a same-second rewrite can keep both unchanged
+RACY_MTIME_WINDOW_NS = 2_000_000_000
+
+# Checkpoints are streamed line by line so memory stays flat for huge files
+# (bounded by the longest line); lines are read in pieces of this size, so a
+# max_read_chars cap can stop inside one, and joined again before scanning
+MAX_LINE_CHARS = 1024 * 1024
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def write_atomic(path: Path, text: str):
+    """Write a file via a temporary sibling and rename, so readers never see it half-written"""
+    tmp_file = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_file.write_text(text)
+        os.replace(tmp_file, path)
+    except BaseException:
+        if tmp_file.exists():
+            tmp_file.unlink()
+        raise
+
+
+def _file_digest(path: Path) -> str:
+    """sha256 of a file, read in fixed-size chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _iter_lines(f, max_read_chars: Optional[int] = None) -> Iterator[str]:
+    """
+    Yield the lines of a text-mode file without their newline, like read_text().split("\n")
+    
+    Lines longer than MAX_LINE_CHARS are yielded whole, never split, so the scanner
+    matches exactly what it would in the whole text; only max_read_chars cuts a line.
+    
+    Args:
+        f: File opened in text mode with universal newlines
+        max_read_chars: Stop after roughly this many characters (None reads everything)
+    """
+    remaining = max_read_chars
+    while remaining is None or remaining > 0:
+        pieces = []
+        while remaining is None or remaining > 0:
+            piece = f.readline(MAX_LINE_CHARS)
+            if not piece:
+                break
+            if remaining is not None:
+                remaining -= len(piece)
+            pieces.append(piece)
+            if piece.endswith("\n"):
+                break
+        if not pieces:
+            return
+        line = "".join(pieces)
+        yield line[:-1] if line.endswith("\n") else line
+
+
+# Root of all features, relative to tmops_v6_portable like the rest of the tools
+TMOPS_DIR = Path("../.tmops")
+FLEET_METRICS_FILENAME = "metrics_all.json"
+# Trace/profile output not tied to one run; dotted so feature scans never take it for a feature
+FLEET_LOG_DIR = TMOPS_DIR / ".logs"
 
 class MetricsExtractor:
     """Extract and analyze metrics from TeamOps checkpoint files"""
     
-    def __init__(self, feature: str, run_dir: Optional[str] = None):
+    def __init__(self, feature: str, run_dir: Optional[str] = None, use_cache: bool = True,
+                 checkpoint_dir: Optional[Path] = None, max_read_chars: Optional[int] = None):
         """
         Initialize the metrics extractor
         
         Args:
             feature: The feature name
             run_dir: Specific run directory (default: current)
+            use_cache: Reuse per-checkpoint parse results from the run's cache file
+            checkpoint_dir: Explicit checkpoint directory (e.g. an archived run); overrides run_dir.
+                For a packed run this is <run>.tmpack/checkpoints and files are read from the pack.
+            max_read_chars: Scan at most this many characters of each checkpoint (None scans all)
         """
         self.feature = feature
+        self.use_cache = use_cache
+        self.max_read_chars = max_read_chars
         
-        if run_dir:
+        if checkpoint_dir is not None:
+            self.checkpoint_dir = Path(checkpoint_dir)
+        elif run_dir:
             self.checkpoint_dir = Path(f"../.tmops/{feature}/runs/{run_dir}/checkpoints")
         else:
             self.checkpoint_dir = Path(f"../.tmops/{feature}/runs/current/checkpoints")
         
         self.metrics_file = self.checkpoint_dir.parent / "metrics.json"
+        self.cache_file = self.checkpoint_dir.parent / CACHE_FILENAME
+        # Imported here so extraction of live runs never loads the pack reader
+        from run_pack import RunPack, is_pack, run_name
+        self.run = run_name(self.checkpoint_dir.parent)
+        self.pack = RunPack(self.checkpoint_dir.parent) if is_pack(self.checkpoint_dir.parent) else None
         
-        if not self.checkpoint_dir.exists():
+        if self.pack is None and not self.checkpoint_dir.exists():
             raise ValueError(f"Checkpoint directory not found: {self.checkpoint_dir}")
     
     def extract_all_metrics(self) -> Dict[str, Any]:
         """
         Extract metrics from all checkpoints in the run
         
+        Returns:
+            Dictionary containing all extracted metrics
+        """
+        with span("extract_all_metrics", feature=self.feature, run=self.run):
+            return self.build_metrics(self.parse_checkpoints())
+    
+    def parse_checkpoints(self) -> List[Dict[str, Any]]:
+        """
+        Parse every checkpoint of the run, reusing cached parses of unchanged files
+        
+        Returns:
+            Results of _parse_checkpoint, in checkpoint name order
+        """
+        with span("list_checkpoints", "io"):
+            checkpoints = self._list_checkpoints()
+        with span("load_cache", "io"):
+            cache = self._load_cache() if self.use_cache else {}
+        fresh_cache = {}
+        
+        entries = [self._cached_checkpoint(checkpoint_file, cache, fresh_cache) for checkpoint_file in checkpoints]
+        
+        if self.use_cache:
+            with span("save_cache", "io"):
+                self._save_cache(fresh_cache)
+        
+        return entries
+    
+    def build_metrics(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Fold parsed checkpoints into the run metrics document
+        
+        Args:
+            entries: Results of parse_checkpoints
+        
         Returns:
             Dictionary containing all extracted metrics
         """
         metrics = {
             "feature": self.feature,
             "timestamp": datetime.now().isoformat(),
-            "run_directory": str(self.checkpoint_dir.parent.name),
+            "run_directory": self.run,
             "phases": {
                 "discovery": {},
                 "testing": {},
@@ -55,97 +407,462 @@ class MetricsExtractor:
             "summary": {}
         }
         
-        # Process each checkpoint file
-        checkpoints = sorted(self.checkpoint_dir.glob("*.md"))
+        with span("build_metrics"):
+            for entry in merge_shard_entries(entries):
+                self._merge_checkpoint(entry, metrics)
+            
+            # Calculate summary metrics
+            self._calculate_summary(metrics)
         
-        for checkpoint_file in checkpoints:
-            self._process_checkpoint(checkpoint_file, metrics)
+        return metrics
+    
+    def follow(self, poll_interval: float = 0.5, rescan_interval: float = 10.0) -> Iterator[Dict[str, Any]]:
+        """
+        Keep the run's metrics current while checkpoints arrive
         
-        # Calculate summary metrics
-        self._calculate_summary(metrics)
+        Yields the full metrics first and again after every change. New checkpoints
+        that sort after all known ones are folded in through _process_checkpoint and
+        only their phases' summary fields are recomputed; anything else (edits,
+        removals, out-of-order names, shards) rebuilds from the parse cache. Each
+        poll is a single stat of the checkpoint directory unless it changed.
         
-        return metrics
+        Args:
+            poll_interval: Seconds between directory checks
+            rescan_interval: Compare file sizes and mtimes at least this often, to catch in-place edits
+        
+        Yields:
+            The current metrics document (the same dict is updated in place between
+            incremental updates)
+        
+        Raises:
+            ValueError: For a packed run, which can no longer change
+        """
+        if self.pack is not None:
+            raise ValueError(f"Cannot follow a packed run: {self.checkpoint_dir.parent}")
+        
+        metrics = self.extract_all_metrics()
+        known = self._snapshot()
+        yield metrics
+        
+        dir_key = None
+        last_scan = time.monotonic()
+        while True:
+            time.sleep(poll_interval)
+            try:
+                stat = self.checkpoint_dir.stat()
+            except FileNotFoundError:
+                continue
+            # Coarse directory mtimes can hide a second write in the same tick
+            racy = time.time() - stat.st_mtime < RACY_MTIME_WINDOW_NS / 1e9
+            if (stat.st_ino, stat.st_mtime_ns) == dir_key and not racy \
+                    and time.monotonic() - last_scan < rescan_interval:
+                continue
+            dir_key = (stat.st_ino, stat.st_mtime_ns)
+            last_scan = time.monotonic()
+            
+            current = self._snapshot()
+            if current == known:
+                continue
+            
+            added = sorted(set(current) - set(known))
+            appended = added and all(current.get(name) == info for name, info in known.items()) \
+                and (not known or added[0] > max(known)) and not any(parse_shard_name(name) for name in added)
+            if appended:
+                with span("follow_update", checkpoints=len(added)):
+                    phases = set()
+                    for name in added:
+                        entry = self._process_checkpoint(self.checkpoint_dir / name, metrics)
+                        if entry["phase"]:
+                            phases.add(entry["phase"])
+                    self._calculate_summary(metrics, phases)
+            else:
+                with span("follow_rebuild"):
+                    metrics = self.extract_all_metrics()
+            
+            metrics["timestamp"] = datetime.now().isoformat()
+            known = current
+            yield metrics
+    
+    def analyze(self, metrics: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Analyze where the run's time went, from its timeline and role logs
+        
+        Args:
+            metrics: Result of extract_all_metrics
+        
+        Returns:
+            Phase durations, per-role busy/waiting time, handoff latencies and the
+            critical path (see run_analysis.analyze_run)
+        """
+        with span("analyze_run"):
+            with span("read_role_logs", "io"):
+                role_logs = self._role_logs()
+            return analyze_run(metrics["timeline"], role_logs)
+    
+    def _role_logs(self) -> Dict[str, List[str]]:
+        """Lines of each role's log (logs/<role>.log), rotated files oldest first"""
+        if self.pack is not None:
+            names = self.pack.names("logs", "*.log*")
+        else:
+            log_dir = self.checkpoint_dir.parent / "logs"
+            names = sorted(path.name for path in log_dir.glob("*.log*")) if log_dir.is_dir() else []
+        
+        files: Dict[str, List[Tuple[int, str]]] = {}
+        for name in names:
+            role, _, suffix = name.partition(".log")
+            if suffix and not suffix[1:].isdigit():
+                continue
+            # <role>.log.N is older the larger N is; the live <role>.log is newest
+            files.setdefault(role, []).append((-int(suffix[1:]) if suffix else 0, name))
+        
+        role_logs = {}
+        for role, rotated in files.items():
+            lines: List[str] = []
+            for _, name in sorted(rotated):
+                if self.pack is not None:
+                    text = self.pack.read_text(f"logs/{name}") or ""
+                else:
+                    text = (self.checkpoint_dir.parent / "logs" / name).read_text(errors="replace")
+                lines.extend(text.splitlines())
+            role_logs[role] = lines
+        return role_logs
     
-    def _process_checkpoint(self, checkpoint_file: Path, metrics: Dict[str, Any]):
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """Map each checkpoint name to (size, mtime_ns)"""
+        snapshot = {}
+        try:
+            with os.scandir(self.checkpoint_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".md") and entry.is_file():
+                        stat = entry.stat()
+                        snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            pass
+        return snapshot
+    
+    def _list_checkpoints(self) -> List[Path]:
+        """
+        List the run's checkpoint files, from the feature's checkpoint index when present
+        
+        Returns:
+            Checkpoint paths sorted by name
+        """
+        if self.pack is not None:
+            return [self.checkpoint_dir / name for name in self.pack.names(self.checkpoint_dir.name, "*.md")]
+        
+        run_dir = self.checkpoint_dir.parent
+        feature_dir = run_dir.parent.parent
+        if run_dir.parent.name == "runs" and (feature_dir / INDEX_FILENAME).exists():
+            try:
+                index = CheckpointIndex(feature_dir)
+                try:
+                    run = index.sync(self.checkpoint_dir)
+                    return [self.checkpoint_dir / row["name"] for row in index.checkpoints(run)]
+                finally:
+                    index.close()
+            except (sqlite3.Error, OSError):
+                # A locked or damaged index must never block extraction
+                pass
+        return sorted(self.checkpoint_dir.glob("*.md"))
+    
+    def _process_checkpoint(self, checkpoint_file: Path, metrics: Dict[str, Any]) -> Dict[str, Any]:
         """
         Process a single checkpoint file and extract metrics
         
         Args:
             checkpoint_file: Path to the checkpoint file
             metrics: Dictionary to update with extracted metrics
+        
+        Returns:
+            The merged entry (result of _parse_checkpoint)
+        """
+        entry = None
+        if self.pack is None:
+            stat = checkpoint_file.stat()
+            entry = self._sidecar_checkpoint(checkpoint_file, stat.st_size, stat.st_mtime_ns)
+        if entry is None:
+            entry = self._parse_checkpoint_file(checkpoint_file)
+        self._merge_checkpoint(entry, metrics)
+        return entry
+    
+    def _parse_checkpoint_file(self, checkpoint_file: Path) -> Dict[str, Any]:
         """
-        content = checkpoint_file.read_text()
-        filename = checkpoint_file.name
+        Parse a checkpoint by streaming its lines instead of loading the whole file
         
-        # Extract timestamp
-        timestamp_match = re.search(r'\*\*Timestamp:\*\* (.+)', content)
+        Args:
+            checkpoint_file: Path to the checkpoint file
+        
+        Returns:
+            Result of _parse_checkpoint
+        """
+        if self.pack is not None:
+            f = io.TextIOWrapper(self.pack.open(self._pack_member(checkpoint_file)))
+        else:
+            f = open(checkpoint_file)
+        with f:
+            return self._parse_checkpoint(checkpoint_file.name, _iter_lines(f, self.max_read_chars))
+    
+    def _pack_member(self, path: Path) -> str:
+        """Relative path of a run file inside the pack"""
+        return path.relative_to(self.checkpoint_dir.parent).as_posix()
+    
+    @staticmethod
+    def _parse_checkpoint(filename: str, content: Union[str, Iterable[str]]) -> Dict[str, Any]:
+        """
+        Parse one checkpoint into a self-contained, cacheable result
+        
+        Args:
+            filename: The checkpoint filename
+            content: The checkpoint text, or an iterable of its lines
+        
+        Returns:
+            Dictionary with checkpoint, timestamp, phase and the phase metrics it contributes
+        """
+        # Identify the phase from the filename
+        phase = checkpoint_phase(filename)
+        
+        # Pull the timestamp and every phase field in one pass over the text
+        fields = _PHASE_SCANNERS[phase].scan(content)
+        timestamp_match = fields["timestamp"]
         timestamp = timestamp_match.group(1) if timestamp_match else "Unknown"
         
+        # Extract phase-specific metrics
+        phase_metrics: Dict[str, Any] = {}
+        
+        if phase == "discovery":
+            MetricsExtractor._extract_discovery_metrics(fields, phase_metrics)
+        
+        elif phase == "testing":
+            MetricsExtractor._extract_test_metrics(fields, phase_metrics)
+        
+        elif phase == "implementation":
+            MetricsExtractor._extract_implementation_metrics(fields, phase_metrics)
+        
+        elif phase == "verification":
+            MetricsExtractor._extract_verification_metrics(fields, phase_metrics)
+        
+        return {
+            "checkpoint": filename,
+            "timestamp": timestamp,
+            "phase": phase,
+            "metrics": phase_metrics
+        }
+    
+    def _merge_checkpoint(self, entry: Dict[str, Any], metrics: Dict[str, Any]):
+        """
+        Fold a parsed checkpoint into the run metrics
+        
+        Args:
+            entry: Result of _parse_checkpoint
+            metrics: Dictionary to update with extracted metrics
+        """
         # Add to timeline
         metrics["timeline"].append({
-            "checkpoint": filename,
-            "timestamp": timestamp
+            "checkpoint": entry["checkpoint"],
+            "timestamp": entry["timestamp"]
         })
+        if "shards" in entry:
+            metrics["timeline"][-1]["shards"] = entry["shards"]
         
-        # Extract phase-specific metrics
-        if "discovery" in filename:
-            self._extract_discovery_metrics(content, metrics["phases"]["discovery"])
+        # Later checkpoints of the same phase override earlier values
+        if entry["phase"]:
+            metrics["phases"][entry["phase"]].update(entry["metrics"])
+    
+    def _cached_checkpoint(self, checkpoint_file: Path, cache: Dict[str, Any],
+                           fresh_cache: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Return the parse result for a checkpoint, parsing only if it changed
+        
+        Args:
+            checkpoint_file: Path to the checkpoint file
+            cache: Entries loaded from the cache file
+            fresh_cache: Entries to write back (updated in place)
         
-        elif "tests-complete" in filename:
-            self._extract_test_metrics(content, metrics["phases"]["testing"])
+        Returns:
+            Result of _parse_checkpoint
+        """
+        key = checkpoint_file.name
+        if self.pack is not None:
+            # Packed files never change, so they are never racy
+            size, mtime_ns = self.pack.stat(self._pack_member(checkpoint_file))
+            racy = False
+        else:
+            stat = checkpoint_file.stat()
+            size, mtime_ns = stat.st_size, stat.st_mtime_ns
+            racy = time.time() * 1e9 - mtime_ns < RACY_MTIME_WINDOW_NS
+        cached = cache.get(key)
         
-        elif "impl-complete" in filename:
-            self._extract_implementation_metrics(content, metrics["phases"]["implementation"])
+        # Unchanged size and mtime: trust the cache without reading the file
+        if cached and cached["size"] == size and cached["mtime_ns"] == mtime_ns \
+                and not cached.get("racy") and cached.get("max_read_chars") == self.max_read_chars:
+            fresh_cache[key] = cached
+            return cached["result"]
         
-        elif "verify-complete" in filename:
-            self._extract_verification_metrics(content, metrics["phases"]["verification"])
+        # A sidecar written with the checkpoint already holds the parse; no need to read the text
+        with span("read_sidecar", "io", checkpoint=key):
+            result = self._sidecar_checkpoint(checkpoint_file, size, mtime_ns)
+        if result is not None:
+            fresh_cache[key] = {
+                "size": size,
+                "mtime_ns": mtime_ns,
+                "sha256": None,
+                "racy": racy,
+                "max_read_chars": self.max_read_chars,
+                "result": result
+            }
+            return result
+        
+        with span("digest", "io", checkpoint=key, size=size):
+            if self.pack is not None:
+                digest = self.pack.digest(self._pack_member(checkpoint_file))
+            else:
+                digest = _file_digest(checkpoint_file)
+        
+        # Touched but identical content: keep the parse, refresh the stat key
+        if cached and cached["sha256"] == digest and cached.get("max_read_chars") == self.max_read_chars:
+            result = cached["result"]
+        else:
+            with span("parse_checkpoint", checkpoint=key, size=size):
+                result = self._parse_checkpoint_file(checkpoint_file)
+        
+        fresh_cache[key] = {
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "sha256": digest,
+            "racy": racy,
+            "max_read_chars": self.max_read_chars,
+            "result": result
+        }
+        return result
     
-    def _extract_discovery_metrics(self, content: str, phase_metrics: Dict[str, Any]):
+    def _sidecar_checkpoint(self, checkpoint_file: Path, size: int, mtime_ns: int) -> Optional[Dict[str, Any]]:
+        """
+        Take a checkpoint's parse from its JSON sidecar
+        
+        Args:
+            checkpoint_file: Path to the checkpoint file
+            size: Current size of the checkpoint file
+            mtime_ns: Current mtime of the checkpoint file
+        
+        Returns:
+            Result of _parse_checkpoint, or None if there is no usable sidecar (missing,
+            written by another extractor version, the checkpoint changed since, or
+            max_read_chars would have cut the text parse short)
+        """
+        # The sidecar holds a parse of the whole text; a truncated scan could see less
+        if self.max_read_chars is not None and size > self.max_read_chars:
+            return None
+        sidecar = sidecar_path(checkpoint_file)
+        try:
+            if self.pack is not None:
+                data = self.pack.read_bytes(self._pack_member(sidecar))
+                if data is None:
+                    return None
+            else:
+                data = sidecar.read_bytes()
+            doc = json.loads(data)
+        except (OSError, ValueError):
+            return None
+        
+        # Size alone misses same-length edits; renames, packs and snapshots all keep the mtime
+        if not isinstance(doc, dict) or doc.get("extractor_version") != EXTRACTOR_VERSION \
+                or doc.get("size") != size or doc.get("mtime_ns") != mtime_ns \
+                or not isinstance(doc.get("metrics"), dict):
+            return None
+        return {
+            "checkpoint": checkpoint_file.name,
+            "timestamp": doc.get("timestamp") or "Unknown",
+            "phase": checkpoint_phase(checkpoint_file.name),
+            "metrics": doc["metrics"]
+        }
+    
+    def _load_cache(self) -> Dict[str, Any]:
+        """
+        Load the per-checkpoint parse cache
+        
+        Returns:
+            Cache entries keyed by checkpoint filename (empty if missing, corrupt or stale)
+        """
+        try:
+            if self.pack is not None:
+                # The cache was packed with the run; it is read but never rewritten
+                data = json.loads(self.pack.read_text(CACHE_FILENAME) or "null")
+            else:
+                data = json.loads(self.cache_file.read_text())
+        except (OSError, ValueError):
+            return {}
+        
+        if not isinstance(data, dict) or data.get("version") != EXTRACTOR_VERSION:
+            return {}
+        return data.get("entries", {})
+    
+    def _save_cache(self, entries: Dict[str, Any]):
+        """
+        Atomically write the per-checkpoint parse cache
+        
+        Args:
+            entries: Cache entries keyed by checkpoint filename
+        """
+        if self.pack is not None:
+            return
+        tmp_file = self.cache_file.with_name(f"{self.cache_file.name}.{os.getpid()}.tmp")
+        try:
+            tmp_file.write_text(json.dumps({"version": EXTRACTOR_VERSION, "entries": entries}))
+            os.replace(tmp_file, self.cache_file)
+        except OSError:
+            # A read-only run directory just means no caching
+            if tmp_file.exists():
+                tmp_file.unlink()
+    
+    @staticmethod
+    def _extract_discovery_metrics(fields: Dict[str, Any], phase_metrics: Dict[str, Any]):
         """Extract metrics from discovery phase checkpoints"""
         # Extract file counts
-        files_match = re.search(r'Files discovered: (\d+)', content, re.IGNORECASE)
+        files_match = fields["files_discovered"]
         if files_match:
             phase_metrics["files_discovered"] = int(files_match.group(1))
         
         # Extract directory structure depth
-        dirs_match = re.search(r'Directories: (\d+)', content, re.IGNORECASE)
+        dirs_match = fields["directories_found"]
         if dirs_match:
             phase_metrics["directories_found"] = int(dirs_match.group(1))
     
-    def _extract_test_metrics(self, content: str, phase_metrics: Dict[str, Any]):
+    @staticmethod
+    def _extract_test_metrics(fields: Dict[str, Any], phase_metrics: Dict[str, Any]):
         """Extract metrics from test phase checkpoints"""
         # Extract test count
-        tests_match = re.search(r'Tests (?:written|created): (\d+)', content, re.IGNORECASE)
+        tests_match = fields["tests_written"]
         if tests_match:
             phase_metrics["tests_written"] = int(tests_match.group(1))
         
         # Extract test files
-        test_files = re.findall(r'(?:test|spec)[/_][\w/]+\.(?:py|js|ts|go|rs)', content)
+        test_files = fields["test_files"]
         if test_files:
             phase_metrics["test_files"] = test_files
             phase_metrics["test_file_count"] = len(test_files)
         
         # Extract coverage if mentioned
-        coverage_match = re.search(r'Coverage: (\d+(?:\.\d+)?)%', content, re.IGNORECASE)
+        coverage_match = fields["coverage_percent"]
         if coverage_match:
             phase_metrics["coverage_percent"] = float(coverage_match.group(1))
         
         # Check if all tests are failing (as they should initially)
-        if re.search(r'all tests (?:fail|failing)', content, re.IGNORECASE):
+        if fields["all_failing"]:
             phase_metrics["initial_state"] = "all_failing"
     
-    def _extract_implementation_metrics(self, content: str, phase_metrics: Dict[str, Any]):
+    @staticmethod
+    def _extract_implementation_metrics(fields: Dict[str, Any], phase_metrics: Dict[str, Any]):
         """Extract metrics from implementation phase checkpoints"""
         # Extract test results
-        passing_match = re.search(r'(?:Tests |Passing:? )(\d+)/(\d+)', content, re.IGNORECASE)
+        passing_match = fields["tests_passing"]
         if passing_match:
             phase_metrics["tests_passing"] = int(passing_match.group(1))
             phase_metrics["tests_total"] = int(passing_match.group(2))
             phase_metrics["pass_rate"] = (phase_metrics["tests_passing"] / phase_metrics["tests_total"] * 100)
         
         # Extract files modified/created
-        files_created = re.findall(r'Created: ([\w/]+\.[\w]+)', content)
-        files_modified = re.findall(r'Modified: ([\w/]+\.[\w]+)', content)
+        files_created = fields["files_created"]
+        files_modified = fields["files_modified"]
         
         if files_created:
             phase_metrics["files_created"] = files_created
@@ -155,68 +872,71 @@ class MetricsExtractor:
         phase_metrics["total_files_changed"] = len(files_created) + len(files_modified)
         
         # Extract lines of code if mentioned
-        loc_match = re.search(r'Lines (?:of code|added): (\d+)', content, re.IGNORECASE)
+        loc_match = fields["lines_of_code"]
         if loc_match:
             phase_metrics["lines_of_code"] = int(loc_match.group(1))
         
         # Check for performance metrics
-        perf_match = re.search(r'Performance: ([\d.]+)(?:ms|s)', content, re.IGNORECASE)
+        perf_match = fields["performance"]
         if perf_match:
             phase_metrics["performance"] = perf_match.group(1)
     
-    def _extract_verification_metrics(self, content: str, phase_metrics: Dict[str, Any]):
+    @staticmethod
+    def _extract_verification_metrics(fields: Dict[str, Any], phase_metrics: Dict[str, Any]):
         """Extract metrics from verification phase checkpoints"""
         # Extract issue counts
-        issues_match = re.search(r'Issues found: (\d+)', content, re.IGNORECASE)
+        issues_match = fields["issues_found"]
         if issues_match:
             phase_metrics["issues_found"] = int(issues_match.group(1))
         
         # Extract edge cases
-        edge_cases_match = re.search(r'Edge cases: (\d+)', content, re.IGNORECASE)
+        edge_cases_match = fields["edge_cases"]
         if edge_cases_match:
             phase_metrics["edge_cases_identified"] = int(edge_cases_match.group(1))
         
         # Extract quality assessment
-        if re.search(r'Quality:? (?:Good|High|Excellent)', content, re.IGNORECASE):
+        if fields["quality_high"]:
             phase_metrics["quality_assessment"] = "high"
-        elif re.search(r'Quality:? (?:Poor|Low|Needs improvement)', content, re.IGNORECASE):
+        elif fields["quality_low"]:
             phase_metrics["quality_assessment"] = "low"
         else:
             phase_metrics["quality_assessment"] = "medium"
         
         # Check for security concerns
-        if re.search(r'Security (?:issues|concerns)', content, re.IGNORECASE):
+        if fields["security_concerns"]:
             phase_metrics["security_concerns"] = True
         else:
             phase_metrics["security_concerns"] = False
         
         # Extract recommendations count
-        recommendations = re.findall(r'(?:Recommend|Suggestion):', content, re.IGNORECASE)
-        phase_metrics["recommendations_count"] = len(recommendations)
+        phase_metrics["recommendations_count"] = len(fields["recommendations"])
     
-    def _calculate_summary(self, metrics: Dict[str, Any]):
+    def _calculate_summary(self, metrics: Dict[str, Any], phases: Optional[Iterable[str]] = None):
         """
         Calculate summary statistics from phase metrics
         
         Args:
             metrics: The metrics dictionary to update
+            phases: Only recompute the fields of these phases (plus timeline and success),
+                keeping the rest; default recomputes everything
         """
         summary = metrics["summary"]
+        phases = None if phases is None else set(phases)
         
         # Testing phase summary
-        if metrics["phases"]["testing"]:
+        if metrics["phases"]["testing"] and (phases is None or "testing" in phases):
             test_phase = metrics["phases"]["testing"]
             summary["total_tests"] = test_phase.get("tests_written", 0)
             summary["test_coverage"] = test_phase.get("coverage_percent", 0)
         
         # Implementation phase summary
-        if metrics["phases"]["implementation"]:
+        if metrics["phases"]["implementation"] and (phases is None or "implementation" in phases):
             impl_phase = metrics["phases"]["implementation"]
             summary["test_pass_rate"] = impl_phase.get("pass_rate", 0)
             summary["files_changed"] = impl_phase.get("total_files_changed", 0)
         
         # Verification phase summary
-        if metrics["phases"]["verification"]:
+        if metrics["phases"]["verification"] and (phases is None or "verification" in phases):
             verify_phase = metrics["phases"]["verification"]
             summary["issues_found"] = verify_phase.get("issues_found", 0)
             summary["quality"] = verify_phase.get("quality_assessment", "unknown")
@@ -233,6 +953,11 @@ class MetricsExtractor:
         no_critical_issues = metrics["phases"]["verification"].get("issues_found", 0) == 0
         
         summary["success"] = impl_success and no_critical_issues
+        
+        if phases is not None:
+            # Fields added late keep the position a full computation gives them
+            order = {key: i for i, key in enumerate(_SUMMARY_ORDER)}
+            metrics["summary"] = dict(sorted(summary.items(), key=lambda item: order.get(item[0], len(order))))
     
     def save_metrics(self, metrics: Optional[Dict[str, Any]] = None) -> Path:
         """
@@ -248,7 +973,10 @@ class MetricsExtractor:
             metrics = self.extract_all_metrics()
         
         # Save to JSON file
-        self.metrics_file.write_text(json.dumps(metrics, indent=2))
+        with span("serialize_json"):
+            text = json.dumps(metrics, indent=2)
+        with span("write_metrics", "io"):
+            write_atomic(self.metrics_file, text)
         
         return self.metrics_file
     
@@ -306,26 +1034,432 @@ class MetricsExtractor:
             for entry in metrics["timeline"]:
                 report.append(f"- **{entry['checkpoint']}** - {entry['timestamp']}")
         
+        if metrics.get("analysis"):
+            report.extend(format_analysis(metrics["analysis"]))
+        
         return "\n".join(report)
 
 
+def checkpoint_sidecar(name: str, text: str, header: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the JSON sidecar for a checkpoint that is about to be written
+    
+    The checkpoint text is parsed once here, so extraction can later take its
+    metrics from the sidecar instead of scanning the Markdown. The writer adds
+    the checkpoint file's mtime_ns, which extraction checks along with the size.
+    
+    Args:
+        name: The checkpoint filename
+        text: The complete checkpoint text as it will be written
+        header: Structured fields to carry along (from, to, feature, metadata, ...)
+    
+    Returns:
+        The sidecar document
+    """
+    # Parse what a text-mode read of the file will see (universal newlines), split into lines
+    # exactly as _parse_checkpoint_file splits them
+    normalized = text.replace("\r\n", "\n").replace("\r", "\n")
+    entry = MetricsExtractor._parse_checkpoint(name, _iter_lines(io.StringIO(normalized)))
+    return dict(header, sidecar_version=SIDECAR_VERSION, extractor_version=EXTRACTOR_VERSION, checkpoint=name,
+                size=len(text.encode()), timestamp=entry["timestamp"], phase=entry["phase"],
+                metrics=entry["metrics"])
+
+
+def complete_sidecar(checkpoint_file: Path, sidecar_file: Path):
+    """
+    Turn a sidecar written without a parse (lib/common.sh) into one extraction can use
+    
+    Its fields are kept as the header; the parse, size and mtime_ns of checkpoint_file
+    are added. The checkpoint must then be renamed into place, which keeps its mtime.
+    
+    Args:
+        checkpoint_file: The checkpoint as it will be published (usually a temp file)
+        sidecar_file: Its JSON sidecar, rewritten in place
+    """
+    header = json.loads(sidecar_file.read_text())
+    text = checkpoint_file.read_bytes().decode()
+    sidecar = checkpoint_sidecar(header.get("checkpoint") or checkpoint_file.name, text, header)
+    sidecar["mtime_ns"] = checkpoint_file.stat().st_mtime_ns
+    write_atomic(sidecar_file, json.dumps(sidecar))
+
+
+def discover_runs(tmops_dir: Path = TMOPS_DIR) -> List[Dict[str, str]]:
+    """
+    Find every run checkpoint directory under .tmops, live and archived
+    
+    Covers .tmops/<feature>/runs/*/checkpoints, run_manager.sh archives in
+    .tmops/<feature>/.archive/*/checkpoints and cleanup_safe.sh archives in
+    .tmops/.archive/<date>-<feature>/runs/*/checkpoints. Archived runs may be
+    packed (<run>.tmpack); their checkpoint_dir is <run>.tmpack/checkpoints.
+    
+    Args:
+        tmops_dir: The .tmops directory
+    
+    Returns:
+        List of dicts with feature, run, source ("runs" or "archive") and checkpoint_dir
+    """
+    from run_pack import is_pack, run_name
+    runs = []
+    seen = set()
+    
+    def add(feature: str, run: str, source: str, checkpoint_dirs):
+        # Real run directories first so symlinks like runs/current are deduplicated away,
+        # and a pack before a leftover directory of the same run (interrupted packing)
+        for checkpoint_dir in sorted(checkpoint_dirs, key=lambda p: (p.parent.is_symlink(), run_name(p.parent),
+                                                                     not is_pack(p.parent))):
+            packed = is_pack(checkpoint_dir.parent)
+            name = run_name(checkpoint_dir.parent)
+            key = checkpoint_dir.parent.with_name(name).resolve() / checkpoint_dir.name
+            if key in seen or not (packed or checkpoint_dir.is_dir()):
+                continue
+            seen.add(key)
+            runs.append({
+                "feature": feature,
+                "run": f"{run}{name}",
+                "source": source,
+                "checkpoint_dir": str(checkpoint_dir)
+            })
+    
+    if not tmops_dir.is_dir():
+        return runs
+    
+    for feature_dir in sorted(tmops_dir.iterdir()):
+        if feature_dir.name.startswith(".") or not feature_dir.is_dir():
+            continue
+        add(feature_dir.name, "", "runs", feature_dir.glob("runs/*/checkpoints"))
+        add(feature_dir.name, "", "archive", _archived_checkpoint_dirs(feature_dir / ".archive"))
+    
+    for archived_feature in sorted(tmops_dir.glob(".archive/*")):
+        feature = re.sub(r'^\d{8}(?:-\d{6})?-', '', archived_feature.name)
+        add(feature, f"{archived_feature.name}/", "archive", _archived_checkpoint_dirs(archived_feature / "runs"))
+    
+    return runs
+
+
+def _archived_checkpoint_dirs(parent: Path) -> List[Path]:
+    """Checkpoint directories of the loose and packed runs in an archive directory"""
+    from run_pack import PACK_SUFFIX
+    return list(parent.glob("*/checkpoints")) + [p / "checkpoints" for p in parent.glob(f"*{PACK_SUFFIX}")]
+
+
+def _extract_run(run: Dict[str, str], use_cache: bool = True,
+                 max_read_chars: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Extract one discovered run (process pool worker)
+    
+    Args:
+        run: Entry from discover_runs
+        use_cache: Reuse per-checkpoint parse results
+        max_read_chars: Scan at most this many characters of each checkpoint
+    
+    Returns:
+        The run entry with its summary, phases and phase durations, or with an error message
+    """
+    try:
+        extractor = MetricsExtractor(run["feature"], use_cache=use_cache,
+                                     checkpoint_dir=Path(run["checkpoint_dir"]), max_read_chars=max_read_chars)
+        metrics = extractor.extract_all_metrics()
+        return dict(run, summary=metrics["summary"], phases=metrics["phases"],
+                    phase_durations=phase_durations(metrics["timeline"]))
+    except Exception as e:
+        return dict(run, error=f"{type(e).__name__}: {e}")
+
+
+def _rollup_feature(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Roll up successfully extracted runs of one feature
+    
+    Args:
+        runs: Extracted run entries for the feature
+    
+    Returns:
+        Feature-level totals and averages
+    """
+    summaries = [r["summary"] for r in runs]
+    pass_rates = [s["test_pass_rate"] for s in summaries if "test_pass_rate" in s]
+    successful = sum(1 for s in summaries if s.get("success"))
+    
+    return {
+        "runs": len(runs),
+        "successful_runs": successful,
+        "success_rate": successful / len(runs) * 100 if runs else 0,
+        "total_tests": sum(s.get("total_tests", 0) for s in summaries),
+        "average_test_pass_rate": sum(pass_rates) / len(pass_rates) if pass_rates else 0,
+        "issues_found": sum(s.get("issues_found", 0) for s in summaries),
+        "files_changed": sum(s.get("files_changed", 0) for s in summaries),
+        "checkpoints_completed": sum(s.get("checkpoints_completed", 0) for s in summaries)
+    }
+
+
+def extract_fleet_metrics(tmops_dir: Path = TMOPS_DIR, jobs: Optional[int] = None,
+                          use_cache: bool = True, max_read_chars: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Extract every run of every feature in parallel and aggregate the results
+    
+    A run that fails to extract is recorded under "errors" and does not abort the batch.
+    
+    Args:
+        tmops_dir: The .tmops directory
+        jobs: Maximum worker processes (default: CPU count)
+        use_cache: Reuse per-checkpoint parse results
+        max_read_chars: Scan at most this many characters of each checkpoint
+    
+    Returns:
+        Aggregate document with per-run summaries and per-feature rollups
+    """
+    with span("discover_runs", "io"):
+        runs = discover_runs(tmops_dir)
+    results = []
+    
+    if runs:
+        workers = max(1, min(jobs or os.cpu_count() or 1, len(runs)))
+        # Workers are separate processes; the trace shows the pool as one span
+        with span("extract_runs", runs=len(runs), workers=workers), ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_extract_run, run, use_cache, max_read_chars): run for run in runs}
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    # Worker died (e.g. killed); keep the rest of the batch
+                    results.append(dict(futures[future], error=f"{type(e).__name__}: {e}"))
+    
+    results.sort(key=lambda r: (r["feature"], r["source"], r["run"]))
+    extracted = [r for r in results if "error" not in r]
+    errors = [r for r in results if "error" in r]
+    
+    features: Dict[str, List[Dict[str, Any]]] = {}
+    for run in extracted:
+        features.setdefault(run["feature"], []).append(run)
+    
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "tmops_directory": str(tmops_dir),
+        "runs_discovered": len(runs),
+        "runs_extracted": len(extracted),
+        "features": {name: _rollup_feature(feature_runs) for name, feature_runs in features.items()},
+        "runs": extracted,
+        "errors": errors
+    }
+
+
+def _export_run_rows(run: Dict[str, str], use_cache: bool = True,
+                     max_read_chars: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Build the export rows of one run (process pool worker)
+    
+    Args:
+        run: Entry from discover_runs
+        use_cache: Reuse per-checkpoint parse results
+        max_read_chars: Scan at most this many characters of each checkpoint
+    
+    Returns:
+        Dict with "rows" (checkpoint rows, then the run row) or "error"
+    """
+    try:
+        extractor = MetricsExtractor(run["feature"], use_cache=use_cache,
+                                     checkpoint_dir=Path(run["checkpoint_dir"]), max_read_chars=max_read_chars)
+        entries = extractor.parse_checkpoints()
+        rows = [checkpoint_row(run, entry) for entry in entries]
+        rows.append(run_row(run, extractor.build_metrics(entries)))
+        return {"rows": rows}
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def export_metrics(runs: List[Dict[str, str]], output: Path, fmt: str, jobs: Optional[int] = None,
+                   use_cache: bool = True, max_read_chars: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Stream flat checkpoint and run rows of many runs into one export file
+    
+    Runs are extracted in a process pool but written in order as they finish, with
+    at most a few runs in flight, so memory does not grow with the number of runs.
+    
+    Args:
+        runs: Entries from discover_runs
+        output: Export file path
+        fmt: One of EXPORT_FORMATS
+        jobs: Maximum worker processes (default: CPU count)
+        use_cache: Reuse per-checkpoint parse results
+        max_read_chars: Scan at most this many characters of each checkpoint
+    
+    Returns:
+        Counts of runs and rows written, plus per-run errors
+    """
+    stats: Dict[str, Any] = {"runs_exported": 0, "rows": 0, "errors": []}
+    
+    with open_row_writer(output, fmt) as writer:
+        def write(run: Dict[str, str], result: Dict[str, Any]):
+            if "error" in result:
+                stats["errors"].append(dict(run, error=result["error"]))
+                return
+            for row in result["rows"]:
+                writer.write(row)
+            stats["runs_exported"] += 1
+        
+        workers = max(1, min(jobs or os.cpu_count() or 1, len(runs)))
+        if workers == 1:
+            for run in runs:
+                write(run, _export_run_rows(run, use_cache, max_read_chars))
+        else:
+            in_flight: deque = deque()
+            
+            def write_oldest():
+                done_run, future = in_flight.popleft()
+                try:
+                    write(done_run, future.result())
+                except Exception as e:
+                    # Worker died (e.g. killed); keep the rest of the export
+                    write(done_run, {"error": f"{type(e).__name__}: {e}"})
+            
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for run in runs:
+                    in_flight.append((run, pool.submit(_export_run_rows, run, use_cache, max_read_chars)))
+                    if len(in_flight) >= workers * 2:
+                        write_oldest()
+                while in_flight:
+                    write_oldest()
+        
+        stats["rows"] = writer.rows
+    return stats
+
+
+def load_query_runs(source: Optional[Path] = None, refresh: bool = False, jobs: Optional[int] = None,
+                    use_cache: bool = True, max_read_chars: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Load per-run summaries for a metrics query
+    
+    Args:
+        source: A fleet aggregate (.json) or flat export file; default is the saved
+            .tmops/metrics_all.json, or a fresh extraction if there is none
+        refresh: Extract every run now instead of reading the saved aggregate
+        jobs: Maximum worker processes for a fresh extraction
+        use_cache: Reuse per-checkpoint parse results
+        max_read_chars: Scan at most this many characters of each checkpoint
+    
+    Returns:
+        Run entries with feature, run, source, summary and phase_durations
+    """
+    if source is None and not refresh and (TMOPS_DIR / FLEET_METRICS_FILENAME).exists():
+        source = TMOPS_DIR / FLEET_METRICS_FILENAME
+    if source is None:
+        return extract_fleet_metrics(TMOPS_DIR, jobs, use_cache, max_read_chars)["runs"]
+    if source.suffix.lower() == ".json":
+        return json.loads(source.read_text())["runs"]
+    return runs_from_export_rows(read_export_rows(source, export_format_for(source)))
+
+
+def generate_fleet_report(fleet: Dict[str, Any]) -> str:
+    """
+    Generate a human-readable report from aggregated fleet metrics
+    
+    Args:
+        fleet: Result of extract_fleet_metrics
+    
+    Returns:
+        Formatted report string
+    """
+    report = []
+    report.append("# TeamOps Fleet Metrics Report")
+    report.append(f"\n**Generated:** {fleet['timestamp']}")
+    report.append(f"**Runs:** {fleet['runs_extracted']} extracted of {fleet['runs_discovered']} discovered")
+    
+    if fleet["features"]:
+        report.append("\n## Features")
+        report.append("\n| Feature | Runs | Success Rate | Tests | Avg Pass Rate | Issues | Files Changed |")
+        report.append("|---------|------|--------------|-------|---------------|--------|---------------|")
+        for name, rollup in fleet["features"].items():
+            report.append(f"| {name} | {rollup['runs']} | {rollup['success_rate']:.1f}% | "
+                          f"{rollup['total_tests']} | {rollup['average_test_pass_rate']:.1f}% | "
+                          f"{rollup['issues_found']} | {rollup['files_changed']} |")
+    
+    if fleet["errors"]:
+        report.append("\n## Errors")
+        for run in fleet["errors"]:
+            report.append(f"- **{run['feature']}/{run['run']}** - {run['error']}")
+    
+    return "\n".join(report)
+
+
 def main():
     """Command-line interface for metrics extraction"""
-    parser = argparse.ArgumentParser(description="Extract metrics from TeamOps checkpoints in parent .tmops directory")
-    parser.add_argument("feature", help="Feature name")
+    if sys.argv[1:2] == ["query"]:
+        _main_query(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["sidecar"]:
+        _main_sidecar(sys.argv[2:])
+        return
+    
+    parser = argparse.ArgumentParser(description="Extract metrics from TeamOps checkpoints in parent .tmops directory",
+                                     epilog="Run '%(prog)s query --help' to aggregate metrics over many runs")
+    parser.add_argument("feature", nargs="?", help="Feature name")
     parser.add_argument("--run", help="Specific run directory (default: current)")
+    parser.add_argument("--all", action="store_true",
+                       help="Extract every run and archive of every feature into one aggregate")
+    parser.add_argument("--jobs", type=int, help="Worker processes for --all (default: CPU count)")
     parser.add_argument("--format", choices=["json", "report", "both"], default="both",
                        help="Output format")
     parser.add_argument("--output", help="Output file (default: print to console)")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Re-parse every checkpoint instead of using the run's parse cache")
+    parser.add_argument("--export", metavar="PATH",
+                       help="Write flat checkpoint and run rows (NDJSON, CSV or Parquet) instead of metrics.json")
+    parser.add_argument("--export-format", choices=EXPORT_FORMATS,
+                       help="Export format (default: from the --export file extension)")
+    parser.add_argument("--max-read-mb", type=float,
+                       help="Stop scanning each checkpoint after about this many MB (default: no cap)")
+    parser.add_argument("--follow", action="store_true",
+                       help="Keep running and rewrite metrics.json (and the report, with --format report/both, "
+                            f"to runs/<run>/{REPORT_FILENAME}) whenever checkpoints change")
+    parser.add_argument("--no-analysis", action="store_true",
+                       help="Skip the critical-path and idle-time analysis of the run's role logs")
+    parser.add_argument("--trace", action="store_true",
+                       help="Write timed spans as Chrome trace JSON to runs/<run>/logs (.tmops/.logs with --all); "
+                            "or set TMOPS_TRACE=1")
+    parser.add_argument("--profile", action="store_true", help="Write cProfile stats next to the trace")
     
     args = parser.parse_args()
     
+    if not args.feature and not args.all:
+        parser.error("a feature name is required unless --all is given")
+    
+    if args.follow and (args.all or args.export):
+        parser.error("--follow works on a single run, not with --all or --export")
+    
+    if args.max_read_mb is not None and args.max_read_mb <= 0:
+        parser.error("--max-read-mb must be positive")
+    max_read_chars = int(args.max_read_mb * 1024 * 1024) if args.max_read_mb else None
+    
+    with instrumented("extract_metrics", _log_dir(args), args.trace, args.profile):
+        if args.export:
+            _main_export(args, max_read_chars)
+        elif args.all:
+            _main_fleet(args, max_read_chars)
+        elif args.follow:
+            _main_follow(args, max_read_chars)
+        else:
+            _main_run(args, max_read_chars)
+
+
+def _log_dir(args) -> Path:
+    """Where --trace and --profile output goes: runs/<run>/logs, or .tmops/.logs for --all"""
+    if args.feature and not args.all:
+        run_dir = TMOPS_DIR / args.feature / "runs" / (args.run or "current")
+        if run_dir.is_dir():
+            return run_dir / "logs"
+    return FLEET_LOG_DIR
+
+
+def _main_run(args, max_read_chars: Optional[int] = None):
+    """Handle a single run: metrics.json and/or the report"""
     try:
         # Create extractor
-        extractor = MetricsExtractor(args.feature, args.run)
+        extractor = MetricsExtractor(args.feature, args.run, use_cache=not args.no_cache,
+                                     max_read_chars=max_read_chars)
         
         # Extract metrics
         metrics = extractor.extract_all_metrics()
+        if not args.no_analysis:
+            metrics["analysis"] = extractor.analyze(metrics)
         
         # Generate output based on format
         if args.format in ["json", "both"]:
@@ -343,7 +1477,87 @@ def main():
                     print(json.dumps(metrics, indent=2))
         
         if args.format in ["report", "both"]:
-            report = extractor.generate_report(metrics)
+            with span("generate_report"):
+                report = extractor.generate_report(metrics)
+            
+            if args.output and args.format == "report":
+                output_file = Path(args.output)
+                output_file.write_text(report)
+                print(f"Report saved to: {output_file}")
+            else:
+                print("\n" + report)
+    
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _main_follow(args, max_read_chars: Optional[int] = None):
+    """Handle --follow: rewrite the run's outputs after every checkpoint change until interrupted"""
+    try:
+        extractor = MetricsExtractor(args.feature, args.run, use_cache=not args.no_cache,
+                                     max_read_chars=max_read_chars)
+        run_dir = extractor.checkpoint_dir.parent
+        json_file = Path(args.output) if args.output and args.format == "json" else extractor.metrics_file
+        report_file = Path(args.output) if args.output and args.format == "report" else run_dir / REPORT_FILENAME
+        print(f"Following {extractor.checkpoint_dir} (Ctrl-C to stop)", flush=True)
+        
+        for metrics in extractor.follow():
+            if not args.no_analysis:
+                metrics = dict(metrics, analysis=extractor.analyze(metrics))
+            written = []
+            if args.format in ["json", "both"]:
+                write_atomic(json_file, json.dumps(metrics, indent=2))
+                written.append(str(json_file))
+            if args.format in ["report", "both"]:
+                write_atomic(report_file, extractor.generate_report(metrics))
+                written.append(str(report_file))
+            print(f"[{datetime.now():%H:%M:%S}] {metrics['summary'].get('checkpoints_completed', 0)} checkpoints "
+                  f"-> {', '.join(written)}", flush=True)
+    
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _main_export(args, max_read_chars: Optional[int] = None):
+    """Handle --export: stream flat rows of one run, or of every run with --all"""
+    try:
+        fmt = export_format_for(Path(args.export), args.export_format)
+        if args.all:
+            runs = discover_runs(TMOPS_DIR)
+        else:
+            checkpoint_dir = MetricsExtractor(args.feature, args.run).checkpoint_dir
+            runs = [{"feature": args.feature, "run": checkpoint_dir.parent.resolve().name,
+                     "source": "runs", "checkpoint_dir": str(checkpoint_dir)}]
+        
+        stats = export_metrics(runs, Path(args.export), fmt, args.jobs, use_cache=not args.no_cache,
+                               max_read_chars=max_read_chars)
+        print(f"Exported {stats['rows']} rows from {stats['runs_exported']} runs to: {args.export}")
+        for error in stats["errors"]:
+            print(f"Warning: skipped {error['feature']}/{error['run']}: {error['error']}", file=sys.stderr)
+    
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _main_fleet(args, max_read_chars: Optional[int] = None):
+    """Handle --all: aggregate every feature and run"""
+    try:
+        fleet = extract_fleet_metrics(TMOPS_DIR, args.jobs, use_cache=not args.no_cache,
+                                      max_read_chars=max_read_chars)
+        
+        if args.format in ["json", "both"]:
+            output_file = Path(args.output) if args.output and args.format == "json" \
+                else TMOPS_DIR / FLEET_METRICS_FILENAME
+            output_file.write_text(json.dumps(fleet, indent=2))
+            print(f"Fleet metrics saved to: {output_file}")
+        
+        if args.format in ["report", "both"]:
+            report = generate_fleet_report(fleet)
             
             if args.output and args.format == "report":
                 output_file = Path(args.output)
@@ -357,5 +1571,92 @@ def main():
         sys.exit(1)
 
 
+def _main_sidecar(argv: List[str]):
+    """Handle the sidecar subcommand: add the parse to a sidecar written by a shell script"""
+    parser = argparse.ArgumentParser(prog="extract_metrics.py sidecar",
+                                     description="Add the parse and pinned size/mtime of a checkpoint to its "
+                                                 "JSON sidecar, so extraction can skip the text")
+    parser.add_argument("checkpoint", help="Checkpoint file, before it is renamed into place")
+    parser.add_argument("sidecar_file", help="The checkpoint's sidecar, rewritten in place")
+    args = parser.parse_args(argv)
+    
+    try:
+        complete_sidecar(Path(args.checkpoint), Path(args.sidecar_file))
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _main_query(argv: List[str]):
+    """Handle the query subcommand: filter runs and aggregate their metrics"""
+    parser = argparse.ArgumentParser(prog="extract_metrics.py query",
+                                     description="Aggregate run metrics over many runs of many features")
+    parser.add_argument("--from", dest="source", metavar="PATH",
+                       help="Fleet aggregate (.json) or --export file to query "
+                            "(default: .tmops/metrics_all.json, extracting if missing)")
+    parser.add_argument("--refresh", action="store_true",
+                       help="Extract every run now instead of reading the saved aggregate")
+    parser.add_argument("--feature", action="append", help="Only this feature (repeatable)")
+    parser.add_argument("--since", help="Only runs whose last checkpoint is at or after this date/time")
+    parser.add_argument("--until", help="Only runs whose last checkpoint is before this date/time")
+    parser.add_argument("--status", choices=STATUSES, help="Only successful or failed runs")
+    parser.add_argument("--last", type=int, metavar="N", help="Only the N most recent matching runs")
+    parser.add_argument("--metric", action="append", choices=QUERY_METRICS,
+                       help="Metric to aggregate (repeatable; default: all)")
+    parser.add_argument("--percentiles", default=",".join(str(p) for p in DEFAULT_PERCENTILES),
+                       help="Comma-separated percentiles (default: %(default)s)")
+    parser.add_argument("--group-by", choices=["feature"], help="Aggregate per feature")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    parser.add_argument("--jobs", type=int, help="Worker processes when extracting")
+    parser.add_argument("--no-cache", action="store_true", help="Re-parse every checkpoint when extracting")
+    parser.add_argument("--trace", action="store_true",
+                       help="Write timed spans as Chrome trace JSON to .tmops/.logs (or set TMOPS_TRACE=1)")
+    parser.add_argument("--profile", action="store_true", help="Write cProfile stats next to the trace")
+    
+    args = parser.parse_args(argv)
+    
+    bounds = {}
+    for name in ("since", "until"):
+        value = getattr(args, name)
+        if value is not None:
+            bounds[name] = parse_timestamp(value)
+            if math.isnan(bounds[name]):
+                parser.error(f"--{name}: invalid date/time {value!r} (use YYYY-MM-DD or ISO 8601)")
+    try:
+        percentiles = [float(p) for p in args.percentiles.split(",") if p.strip()]
+    except ValueError:
+        parser.error(f"--percentiles: expected comma-separated numbers, got {args.percentiles!r}")
+    if not percentiles or not all(0 <= p <= 100 for p in percentiles):
+        parser.error("--percentiles must be between 0 and 100")
+    if args.last is not None and args.last < 0:
+        parser.error("--last must not be negative")
+    
+    with instrumented("extract_metrics-query", FLEET_LOG_DIR, args.trace, args.profile):
+        _run_query(args, bounds, percentiles)
+
+
+def _run_query(args, bounds: Dict[str, float], percentiles: List[float]):
+    """Load, filter and aggregate runs for the query subcommand, and print the results"""
+    try:
+        with span("load_runs", "io"):
+            runs = load_query_runs(Path(args.source) if args.source else None, args.refresh, args.jobs,
+                                   use_cache=not args.no_cache)
+        with span("aggregate", runs=len(runs)):
+            table = RunTable(runs)
+            selected = table.filter(args.feature, bounds.get("since"), bounds.get("until"), args.status, args.last)
+            results = selected.aggregate(args.metric, percentiles, group_by_feature=args.group_by == "feature")
+        
+        if args.json:
+            print(json.dumps({"runs_total": len(table), "runs_matched": len(selected), "results": results},
+                             indent=2))
+        else:
+            print(f"Runs: {len(selected)} matched of {len(table)}\n")
+            print(format_results(results))
+    
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
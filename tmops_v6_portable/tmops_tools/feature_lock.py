@@ -0,0 +1,81 @@
+# tmops_tools/feature_lock.py
+# Python counterpart of acquire_lock in lib/common.sh (flock on .tmops/<feature>.<type>.lock)
+
+import time
+import fcntl
+from pathlib import Path
+from typing import Optional
+
+TMOPS_DIR = Path("../.tmops")
+
+
+class FeatureLock:
+    """Exclusive flock shared with the shell tools' acquire_lock
+
+    The shell and Python sides lock the same file, so a Python writer and
+    run_manager.sh serialize against each other. Unlike the shell trap, the
+    lock file is left in place on release: removing it could let a second
+    process lock a fresh inode while a third still holds the old one.
+    """
+
+    def __init__(self, feature: str, lock_type: str = "general", timeout: Optional[float] = None,
+                 tmops_dir: Path = TMOPS_DIR):
+        """
+        Prepare the lock (nothing is locked until acquire or with)
+
+        Args:
+            feature: The feature name
+            lock_type: Lock name, as in acquire_lock (e.g. "run-manager", "checkpoint")
+            timeout: Seconds to wait for the lock; 0 fails at once like flock -n,
+                None waits indefinitely
+            tmops_dir: The .tmops directory
+        """
+        self.feature = feature
+        self.lock_type = lock_type
+        self.timeout = timeout
+        self.lock_file = Path(tmops_dir) / f"{feature}.{lock_type}.lock"
+        self._file = None
+
+    def acquire(self) -> "FeatureLock":
+        """
+        Take the lock
+
+        Returns:
+            self
+
+        Raises:
+            TimeoutError: If another process still holds it when timeout expires
+        """
+        self.lock_file.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.lock_file, "a")
+        if self.timeout is None:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+            return self
+
+        deadline = time.monotonic() + self.timeout
+        delay = 0.01
+        while True:
+            try:
+                fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return self
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    self._file.close()
+                    self._file = None
+                    raise TimeoutError(f"Another {self.lock_type} process is already running "
+                                       f"for feature '{self.feature}'") from None
+                time.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+                delay = min(delay * 2, 0.5)
+
+    def release(self):
+        """Drop the lock"""
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "FeatureLock":
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
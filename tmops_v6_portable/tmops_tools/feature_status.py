@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# tmops_tools/feature_status.py
+# Feature status overview from one .tmops walk and one git call (replaces the list_features.sh loop)
+
+import os
+import json
+import subprocess
+import argparse
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+from checkpoint_index import is_sidecar
+from run_pack import PACK_SUFFIX
+
+TMOPS_DIR = Path("../.tmops")
+FEATURES_FILENAME = "FEATURES.txt"
+
+QUICK_COMMANDS = """💡 Quick Commands:
+─────────────────
+  From tmops_v6_portable directory:
+  Start new:    ./tmops_tools/init_feature_multi.sh <name>
+  View info:    ./tmops_tools/switch_feature.sh <name>
+  Clean up:     ./tmops_tools/cleanup_safe.sh <name>
+  Get metrics:  ./tmops_tools/extract_metrics.py <name>
+
+  From root directory:
+  Switch to:    git checkout feature/<name>"""
+
+
+def read_features(features_file: Path) -> List[Dict[str, str]]:
+    """
+    Parse FEATURES.txt (feature:status:timestamp:branch per line)
+
+    The timestamp itself contains colons (date -Iseconds), so the branch is taken
+    from the last field and the timestamp is whatever lies in between.
+
+    Args:
+        features_file: Path to FEATURES.txt
+
+    Returns:
+        Entries with feature, status, timestamp and branch, in file order
+    """
+    try:
+        lines = features_file.read_text().splitlines()
+    except FileNotFoundError:
+        return []
+
+    features = []
+    for line in lines:
+        if not line.strip():
+            continue
+        parts = line.split(":")
+        feature = parts[0]
+        status = parts[1] if len(parts) > 1 else ""
+        branch = parts[-1] if len(parts) > 3 else f"feature/{feature}"
+        timestamp = ":".join(parts[2:-1]) if len(parts) > 3 else ":".join(parts[2:])
+        features.append({"feature": feature, "status": status, "timestamp": timestamp, "branch": branch})
+    return features
+
+
+def git_branches(project_root: Path) -> Tuple[Optional[str], set]:
+    """
+    Local branches and the checked-out one, from a single git call
+
+    Args:
+        project_root: Repository root
+
+    Returns:
+        (current branch or None, set of local branch names); empty outside a repository
+    """
+    try:
+        out = subprocess.run(["git", "for-each-ref", "--format=%(HEAD) %(refname:short)", "refs/heads"],
+                             cwd=project_root, capture_output=True, text=True)
+    except OSError:
+        return None, set()
+
+    current = None
+    branches = set()
+    for line in out.stdout.splitlines():
+        # "%(HEAD)" is "*" for the checked-out branch and a space otherwise
+        marker, name = line[:1], line[2:]
+        branches.add(name)
+        if marker == "*":
+            current = name
+    return current, branches
+
+
+def _count_entries(path: Path) -> int:
+    """Non-hidden entries of a directory other than sidecars, like ls | wc -l (0 if missing)"""
+    try:
+        with os.scandir(path) as entries:
+            return sum(1 for entry in entries if not entry.name.startswith(".") and not is_sidecar(entry.name))
+    except OSError:
+        return 0
+
+
+def _count_markdown(path: Path) -> Optional[int]:
+    """*.md files below a directory (None if the directory does not exist)"""
+    try:
+        stack = [os.scandir(path)]
+    except OSError:
+        return None
+    count = 0
+    while stack:
+        with stack.pop() as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    try:
+                        stack.append(os.scandir(entry.path))
+                    except OSError:
+                        pass
+                elif entry.name.endswith(".md") and entry.is_file():
+                    count += 1
+    return count
+
+
+def scan_feature_dir(feature_dir: Path) -> Dict[str, Any]:
+    """
+    Collect what the status view shows about one feature directory
+
+    Args:
+        feature_dir: .tmops/<feature>
+
+    Returns:
+        Checkpoint and doc counts, current run, runs and archived runs
+    """
+    current = feature_dir / "runs" / "current"
+    try:
+        current_run = os.readlink(current) if current.is_symlink() else None
+    except OSError:
+        current_run = None
+
+    runs = 0
+    try:
+        with os.scandir(feature_dir / "runs") as entries:
+            runs = sum(1 for e in entries if e.is_dir(follow_symlinks=False))
+    except OSError:
+        pass
+
+    archives = 0
+    try:
+        with os.scandir(feature_dir / ".archive") as entries:
+            archives = sum(1 for e in entries if e.is_dir(follow_symlinks=False) or e.name.endswith(PACK_SUFFIX))
+    except OSError:
+        pass
+
+    return {
+        "checkpoints": _count_entries(current / "checkpoints"),
+        "docs": _count_markdown(feature_dir / "docs"),
+        "current_run": Path(current_run).name if current_run else None,
+        "runs": runs,
+        "archives": archives,
+    }
+
+
+def collect_status(tmops_dir: Path = TMOPS_DIR) -> Dict[str, Any]:
+    """
+    Build the status of every tracked feature and every feature directory
+
+    Args:
+        tmops_dir: The .tmops directory
+
+    Returns:
+        Document with current_branch, features (from FEATURES.txt) and directories
+    """
+    tmops_dir = Path(tmops_dir)
+    current_branch, branches = git_branches(tmops_dir.resolve().parent)
+    tracked = read_features(tmops_dir / FEATURES_FILENAME)
+    tracked_names = {entry["feature"] for entry in tracked}
+
+    scanned: Dict[str, Dict[str, Any]] = {}
+    try:
+        with os.scandir(tmops_dir) as entries:
+            for entry in entries:
+                if entry.is_dir() and not entry.name.startswith("."):
+                    scanned[entry.name] = scan_feature_dir(Path(entry.path))
+    except OSError:
+        pass
+
+    features = []
+    for entry in tracked:
+        if entry["branch"] == current_branch:
+            branch_state = "current"
+        elif entry["branch"] in branches:
+            branch_state = "exists"
+        else:
+            branch_state = "missing"
+        details = scanned.get(entry["feature"]) or {"checkpoints": 0, "docs": None, "current_run": None,
+                                                     "runs": 0, "archives": 0}
+        features.append(dict(entry, branch_state=branch_state, created=entry["timestamp"].split("T")[0],
+                             on_disk=entry["feature"] in scanned, **details))
+
+    directories = [{"feature": name, "tracked": name in tracked_names} for name in sorted(scanned)]
+
+    return {
+        "tmops_directory": str(tmops_dir),
+        "tmops_exists": tmops_dir.is_dir(),
+        "features_file": (tmops_dir / FEATURES_FILENAME).is_file(),
+        "current_branch": current_branch,
+        "features": features,
+        "directories": directories,
+    }
+
+
+def format_status(status: Dict[str, Any]) -> str:
+    """
+    Render the status document as the list_features.sh view
+
+    Args:
+        status: Result of collect_status
+
+    Returns:
+        The human-readable view
+    """
+    lines = ["╔═══════════════════════════════════════════════╗",
+             "║         TeamOps Features Status              ║",
+             "╚═══════════════════════════════════════════════╝",
+             "",
+             "📂 Active Features:",
+             "────────────────────────────────────"]
+
+    if not status["features_file"]:
+        lines += ["  (none - no features initialized)", "",
+                  "💡 Quick Commands:", "─────────────────",
+                  "  Start new:    ./tmops_tools/init_feature_multi.sh <name>"]
+        return "\n".join(lines)
+
+    labels = {"current": "[CURRENT]", "exists": "[exists]", "missing": "[missing]"}
+    for feature in status["features"]:
+        lines.append(f"  • {feature['feature']}")
+        lines.append(f"    └─ Branch: {feature['branch']} {labels[feature['branch_state']]}")
+        lines.append(f"    └─ Checkpoints: {feature['checkpoints']}")
+        if feature["docs"] is not None:
+            lines.append(f"    └─ Documentation: {feature['docs']} files")
+        lines.append(f"    └─ Created: {feature['created']}")
+
+    lines += ["", "📁 .tmops Directory Status:", "──────────────────────────────────"]
+    if status["tmops_exists"]:
+        for directory in status["directories"]:
+            state = "✓ Tracked" if directory["tracked"] else "⚠️  Orphaned"
+            lines.append(f"  • {directory['feature']} [{state}]")
+    else:
+        lines.append("  (no .tmops directory)")
+
+    lines += ["", QUICK_COMMANDS]
+    return "\n".join(lines)
+
+
+def main():
+    """Command-line interface for the feature status view"""
+    parser = argparse.ArgumentParser(description="Show TeamOps features, branches and artifact counts")
+    parser.add_argument("--tmops-dir", default=str(TMOPS_DIR), help="The .tmops directory (default: %(default)s)")
+    parser.add_argument("--json", action="store_true", help="Print the status as JSON")
+
+    args = parser.parse_args()
+
+    status = collect_status(Path(args.tmops_dir))
+    if args.json:
+        print(json.dumps(status, indent=2))
+    else:
+        print(format_status(status))
+
+
+if __name__ == "__main__":
+    main()
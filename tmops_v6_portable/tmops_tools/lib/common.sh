@@ -77,6 +77,17 @@ get_project_paths() {
     fi
 }
 
+# Escape a string for use inside a JSON string literal
+json_escape() {
+    local s="$1"
+    s="${s//\\/\\\\}"
+    s="${s//\"/\\\"}"
+    s="${s//$'\n'/\\n}"
+    s="${s//$'\r'/\\r}"
+    s="${s//$'\t'/\\t}"
+    printf '%s' "$s"
+}
+
 # Atomic checkpoint creation with proper error handling
 create_checkpoint() {
     local checkpoint_path="$1"
@@ -93,11 +104,13 @@ create_checkpoint() {
     checkpoint_dir="$(dirname "$checkpoint_path")"
     mkdir -p "$checkpoint_dir"
     
-    # Use temporary file for atomic operation
-    local tmp_file
-    tmp_file=$(mktemp)
+    # Use hidden temporary files next to the checkpoint, so each mv is a rename that keeps the mtime
+    local timestamp tmp_file tmp_sidecar
+    timestamp=$(date -u +"%Y-%m-%dT%H:%M:%SZ")
+    tmp_file=$(mktemp "$checkpoint_dir/.$(basename "$checkpoint_path").XXXXXX")
+    tmp_sidecar=$(mktemp "$checkpoint_dir/.$(basename "$checkpoint_path").json.XXXXXX")
     {
-        echo "TIMESTAMP=$(date -u +"%Y-%m-%dT%H:%M:%SZ")"
+        echo "TIMESTAMP=$timestamp"
         echo "STATUS=$status"
         echo "MESSAGE=$message"
         if [[ -n "$details" ]]; then
@@ -105,9 +118,23 @@ create_checkpoint() {
         fi
     } > "$tmp_file"
     
+    # Machine-readable sidecar (<checkpoint>.json), moved into place before the checkpoint
+    printf '{"sidecar_version": 1, "checkpoint": "%s", "size": %d, "timestamp": "%s", "status": "%s", "message": "%s", "details": "%s"}\n' \
+        "$(json_escape "$(basename "$checkpoint_path")")" "$(wc -c < "$tmp_file")" "$timestamp" \
+        "$(json_escape "$status")" "$(json_escape "$message")" "$(json_escape "$details")" > "$tmp_sidecar"
+    
+    # With python3, add the parse and the checkpoint's mtime so extract_metrics.py can skip the text;
+    # without it the sidecar is still valid JSON and extraction simply reads the checkpoint
+    if command -v python3 >/dev/null 2>&1; then
+        local metrics_tool
+        metrics_tool="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)/extract_metrics.py"
+        python3 "$metrics_tool" sidecar "$tmp_file" "$tmp_sidecar" >/dev/null 2>&1 || \
+            log_warn "Could not add metrics to sidecar of $(basename "$checkpoint_path")"
+    fi
+    
     # Atomic move
-    if ! mv "$tmp_file" "$checkpoint_path"; then
-        rm -f "$tmp_file"
+    if ! mv "$tmp_sidecar" "$checkpoint_path.json" || ! mv "$tmp_file" "$checkpoint_path"; then
+        rm -f "$tmp_file" "$tmp_sidecar"
         error_exit "Failed to create checkpoint: $checkpoint_path"
     fi
     
@@ -190,6 +217,53 @@ acquire_lock() {
     log_info "Acquired lock for $lock_type process on feature: $feature"
 }
 
+# Pack archived run directories into single <dir>.tmpack files (TMOPS_PACK_ARCHIVES=0 keeps them loose)
+pack_archived_runs() {
+    if [[ "${TMOPS_PACK_ARCHIVES:-1}" == "0" ]]; then
+        return 0
+    fi
+    if ! command -v python3 >/dev/null 2>&1; then
+        log_warn "python3 not found; archive left unpacked"
+        return 0
+    fi
+
+    local pack_tool
+    pack_tool="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)/run_pack.py"
+    local run_dir
+    for run_dir in "$@"; do
+        if ! python3 "$pack_tool" pack "$run_dir" >/dev/null; then
+            log_warn "Packing failed; archive left unpacked: $run_dir"
+        fi
+    done
+}
+
+# Snapshot files without copying bytes where possible (see snapshot.py):
+#   snapshot_tree copy <src> <dst>  reflinks, hardlinks for checkpoints, dedup; <dst> must not exist
+#   snapshot_tree move <src> <dst>  renames the files of <src> into <dst>, keeping <src>'s directories
+snapshot_tree() {
+    local mode="$1"
+    local src="$2"
+    local dst="$3"
+
+    if command -v python3 >/dev/null 2>&1; then
+        local snapshot_tool
+        snapshot_tool="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)/snapshot.py"
+        if python3 "$snapshot_tool" "$mode" "$src" "$dst" >/dev/null; then
+            return 0
+        fi
+        # A failed copy may have left a partial <dst>; only a move can safely carry on
+        [[ "$mode" == "move" ]] || return 1
+        log_warn "Snapshot failed; moving the remaining files with mv: $src"
+    fi
+
+    if [[ "$mode" == "move" ]]; then
+        mkdir -p "$dst"
+        mv "$src/"* "$dst/" 2>/dev/null || true
+    else
+        cp -r "$src" "$dst"
+    fi
+}
+
 # Track feature in FEATURES.txt
 track_feature() {
     local feature="$1"
@@ -6,6 +6,13 @@
 # 📝 CONTEXT: Overview for multi-feature/multi-run setups
 # List all TeamOps features and their status
 
+# The Python engine does one .tmops walk and one git call instead of several
+# processes per feature; this shell loop remains as the fallback without python3
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+if command -v python3 >/dev/null 2>&1 && [[ -f "$SCRIPT_DIR/feature_status.py" ]]; then
+    exec python3 "$SCRIPT_DIR/feature_status.py" --tmops-dir .tmops "$@"
+fi
+
 echo "╔═══════════════════════════════════════════════╗"
 echo "║         TeamOps Features Status              ║"
 echo "╚═══════════════════════════════════════════════╝"
@@ -42,7 +49,7 @@ while IFS=: read -r feature status timestamp branch_info; do
     # Check for checkpoints
     CHECKPOINT_COUNT=0
     if [[ -d ".tmops/$feature/runs/current/checkpoints" ]]; then
-        CHECKPOINT_COUNT=$(ls ".tmops/$feature/runs/current/checkpoints" 2>/dev/null | wc -l)
+        CHECKPOINT_COUNT=$(ls ".tmops/$feature/runs/current/checkpoints" 2>/dev/null | grep -v '\.json$' | wc -l)
     fi
     echo "    └─ Checkpoints: $CHECKPOINT_COUNT"
     
@@ -0,0 +1,296 @@
+# tmops_tools/metrics_export.py
+# Flat, versioned export schema for checkpoint metrics and streaming NDJSON/CSV/Parquet writers
+
+import csv
+import json
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple, Iterator
+
+# Bump when columns are renamed, removed or change meaning (appending is compatible)
+EXPORT_SCHEMA_VERSION = 1
+EXPORT_FORMATS = ("ndjson", "csv", "parquet")
+
+# One schema for both row types: "checkpoint" rows carry what a single checkpoint
+# contributed, "run" rows carry the run summary. Unused columns are null.
+EXPORT_COLUMNS: List[Tuple[str, str]] = [
+    ("schema_version", "int"),
+    ("row_type", "str"),
+    ("feature", "str"),
+    ("source", "str"),
+    ("run", "str"),
+    ("checkpoint", "str"),
+    ("phase", "str"),
+    ("timestamp", "str"),
+    ("files_discovered", "int"),
+    ("directories_found", "int"),
+    ("tests_written", "int"),
+    ("test_file_count", "int"),
+    ("coverage_percent", "float"),
+    ("initial_state", "str"),
+    ("tests_passing", "int"),
+    ("tests_total", "int"),
+    ("pass_rate", "float"),
+    ("files_created_count", "int"),
+    ("files_modified_count", "int"),
+    ("total_files_changed", "int"),
+    ("lines_of_code", "int"),
+    ("performance", "str"),
+    ("issues_found", "int"),
+    ("edge_cases_identified", "int"),
+    ("quality", "str"),
+    ("security_concerns", "bool"),
+    ("recommendations_count", "int"),
+    ("checkpoints_completed", "int"),
+    ("first_checkpoint", "str"),
+    ("last_checkpoint", "str"),
+    ("success", "bool"),
+]
+COLUMN_NAMES = [name for name, _ in EXPORT_COLUMNS]
+
+# Phase metric keys that map onto a differently named column
+_CHECKPOINT_RENAMES = {"quality_assessment": "quality"}
+_CHECKPOINT_COUNTS = {"files_created": "files_created_count", "files_modified": "files_modified_count"}
+
+# Run summary keys mapped onto columns
+SUMMARY_COLUMNS = {
+    "total_tests": "tests_total",
+    "test_coverage": "coverage_percent",
+    "test_pass_rate": "pass_rate",
+    "files_changed": "total_files_changed",
+    "issues_found": "issues_found",
+    "quality": "quality",
+    "checkpoints_completed": "checkpoints_completed",
+    "first_checkpoint": "first_checkpoint",
+    "last_checkpoint": "last_checkpoint",
+    "success": "success",
+}
+
+
+def _empty_row(row_type: str, run: Dict[str, str]) -> Dict[str, Any]:
+    """A row with identity columns filled and everything else null"""
+    row: Dict[str, Any] = dict.fromkeys(COLUMN_NAMES)
+    row.update(schema_version=EXPORT_SCHEMA_VERSION, row_type=row_type, feature=run["feature"],
+               source=run["source"], run=run["run"])
+    return row
+
+
+def checkpoint_row(run: Dict[str, str], entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flatten one parsed checkpoint
+
+    Args:
+        run: Run identity with feature, source and run
+        entry: Result of MetricsExtractor._parse_checkpoint
+
+    Returns:
+        Row keyed by COLUMN_NAMES
+    """
+    row = _empty_row("checkpoint", run)
+    row.update(checkpoint=entry["checkpoint"], phase=entry["phase"], timestamp=entry["timestamp"])
+    for key, value in entry["metrics"].items():
+        if key in _CHECKPOINT_COUNTS:
+            row[_CHECKPOINT_COUNTS[key]] = len(value)
+        elif key != "test_files":
+            row[_CHECKPOINT_RENAMES.get(key, key)] = value
+    return row
+
+
+def run_row(run: Dict[str, str], metrics: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flatten one run summary
+
+    Args:
+        run: Run identity with feature, source and run
+        metrics: Result of MetricsExtractor.extract_all_metrics
+
+    Returns:
+        Row keyed by COLUMN_NAMES
+    """
+    row = _empty_row("run", run)
+    for key, column in SUMMARY_COLUMNS.items():
+        if key in metrics["summary"]:
+            row[column] = metrics["summary"][key]
+    row["timestamp"] = row["last_checkpoint"]
+    return row
+
+
+def export_format_for(path: Path, explicit: Optional[str] = None) -> str:
+    """
+    Pick the export format from an explicit choice or the file extension
+
+    Args:
+        path: Output path
+        explicit: Format given on the command line, if any
+
+    Returns:
+        One of EXPORT_FORMATS
+
+    Raises:
+        ValueError: If the format cannot be determined
+    """
+    if explicit:
+        return explicit
+    suffix = Path(path).suffix.lower()
+    if suffix in (".ndjson", ".jsonl"):
+        return "ndjson"
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".parquet", ".pq"):
+        return "parquet"
+    raise ValueError(f"Cannot infer export format from {path}; use --export-format")
+
+
+class RowWriter:
+    """Append rows to an export file one at a time"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.rows = 0
+
+    def __enter__(self) -> "RowWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, row: Dict[str, Any]):
+        """Write one row keyed by COLUMN_NAMES"""
+        raise NotImplementedError
+
+    def close(self):
+        """Flush and close the file"""
+        raise NotImplementedError
+
+
+class NdjsonRowWriter(RowWriter):
+    """One JSON object per line"""
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._file = open(self.path, "w", encoding="utf-8")
+
+    def write(self, row: Dict[str, Any]):
+        self._file.write(json.dumps(row) + "\n")
+        self.rows += 1
+
+    def close(self):
+        self._file.close()
+
+
+class CsvRowWriter(RowWriter):
+    """CSV with a header row; nulls are empty cells"""
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._file = open(self.path, "w", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=COLUMN_NAMES)
+        self._writer.writeheader()
+
+    def write(self, row: Dict[str, Any]):
+        self._writer.writerow(row)
+        self.rows += 1
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetRowWriter(RowWriter):
+    """Parquet via pyarrow, written in row groups so memory stays bounded"""
+
+    BATCH_ROWS = 10000
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)") from None
+
+        types = {"int": pa.int64(), "float": pa.float64(), "str": pa.string(), "bool": pa.bool_()}
+        self._pa = pa
+        self._schema = pa.schema([(name, types[kind]) for name, kind in EXPORT_COLUMNS],
+                                 metadata={"tmops_export_schema_version": str(EXPORT_SCHEMA_VERSION)})
+        self._writer = pq.ParquetWriter(str(self.path), self._schema)
+        self._batch: List[Dict[str, Any]] = []
+
+    def write(self, row: Dict[str, Any]):
+        self._batch.append(row)
+        self.rows += 1
+        if len(self._batch) >= self.BATCH_ROWS:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+    def _flush(self):
+        if self._batch:
+            self._writer.write_table(self._pa.Table.from_pylist(self._batch, schema=self._schema))
+            self._batch = []
+
+
+def open_row_writer(path: Path, fmt: str) -> RowWriter:
+    """
+    Open a streaming writer for an export file
+
+    Args:
+        path: Output path
+        fmt: One of EXPORT_FORMATS
+
+    Returns:
+        A RowWriter (use as a context manager)
+
+    Raises:
+        RuntimeError: If Parquet is requested but pyarrow is not installed
+    """
+    writers = {"ndjson": NdjsonRowWriter, "csv": CsvRowWriter, "parquet": ParquetRowWriter}
+    return writers[fmt](path)
+
+
+def _parse_csv_cell(value: str, kind: str) -> Any:
+    """Convert a CSV cell back to its column type (empty cells are null)"""
+    if value == "":
+        return None
+    if kind == "int":
+        return int(value)
+    if kind == "float":
+        return float(value)
+    if kind == "bool":
+        return value == "True"
+    return value
+
+
+def read_export_rows(path: Path, fmt: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read an export file back as typed rows, in file order
+
+    Args:
+        path: Export file path
+        fmt: One of EXPORT_FORMATS
+
+    Yields:
+        Rows keyed by COLUMN_NAMES (columns missing from older files are null)
+
+    Raises:
+        RuntimeError: If a Parquet file is given but pyarrow is not installed
+    """
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Reading Parquet exports requires pyarrow (pip install pyarrow)") from None
+        for batch in pq.ParquetFile(str(path)).iter_batches(batch_size=ParquetRowWriter.BATCH_ROWS):
+            for row in batch.to_pylist():
+                yield dict(dict.fromkeys(COLUMN_NAMES), **row)
+        return
+
+    with open(path, encoding="utf-8", newline="" if fmt == "csv" else None) as f:
+        if fmt == "csv":
+            kinds = dict(EXPORT_COLUMNS)
+            for row in csv.DictReader(f):
+                yield {name: _parse_csv_cell(row.get(name, ""), kinds[name]) for name in COLUMN_NAMES}
+        else:
+            for line in f:
+                if line.strip():
+                    yield dict(dict.fromkeys(COLUMN_NAMES), **json.loads(line))
@@ -0,0 +1,276 @@
+# tmops_tools/metrics_query.py
+# Vectorized (NumPy) filtering and aggregation over many extracted run summaries
+
+import math
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterable, Sequence
+
+from checkpoint_index import checkpoint_phase
+from metrics_export import SUMMARY_COLUMNS
+
+PHASES = ("discovery", "testing", "implementation", "verification")
+
+# Query metric -> key in a run summary
+SUMMARY_METRICS = {
+    "pass_rate": "test_pass_rate",
+    "tests_total": "total_tests",
+    "issues_found": "issues_found",
+    "files_changed": "files_changed",
+    "coverage_percent": "test_coverage",
+}
+DURATION_METRICS = [f"duration_{phase}" for phase in PHASES] + ["duration_total"]
+QUERY_METRICS = list(SUMMARY_METRICS) + DURATION_METRICS
+STATUSES = ("success", "failed")
+DEFAULT_PERCENTILES = (50, 90, 95)
+
+# Accepted by parse_iso where datetime.fromisoformat is missing (Python 3.6)
+_ISO_FORMATS = ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S",
+                "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M", "%Y-%m-%d")
+
+
+def parse_timestamp(value: Optional[str]) -> float:
+    """
+    Convert a checkpoint timestamp to epoch seconds
+
+    Args:
+        value: Timestamp such as "2025-01-19 10:00:00"
+
+    Returns:
+        Epoch seconds, or NaN if missing or unparseable
+    """
+    if not value:
+        return math.nan
+    try:
+        return parse_iso(value).timestamp()
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def parse_iso(value: str) -> datetime:
+    """
+    datetime.fromisoformat, with a fallback for Python 3.6 covering the formats the tools write
+
+    Args:
+        value: ISO 8601 date and time, e.g. "2025-01-19 10:00:00" or "2025-01-19T10:00:00.250"
+
+    Returns:
+        The naive or aware datetime
+
+    Raises:
+        ValueError: If the value can't be parsed
+    """
+    if hasattr(datetime, "fromisoformat"):
+        return datetime.fromisoformat(value)
+    for fmt in _ISO_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid isoformat string: {value!r}")
+
+
+def phase_durations(timeline: Sequence[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Derive phase durations (seconds) from a run timeline
+
+    A phase lasts from the checkpoint just before its first checkpoint (usually
+    its trigger) to its last checkpoint; the total runs from the first to the
+    last checkpoint of the run. Phases without parseable timestamps are omitted.
+
+    Args:
+        timeline: Entries with "checkpoint" and "timestamp", in checkpoint order
+
+    Returns:
+        Seconds keyed by DURATION_METRICS name
+    """
+    times = [parse_timestamp(entry["timestamp"]) for entry in timeline]
+    durations: Dict[str, float] = {}
+
+    for phase in PHASES:
+        indices = [i for i, entry in enumerate(timeline) if checkpoint_phase(entry["checkpoint"]) == phase]
+        if not indices:
+            continue
+        start, end = times[max(indices[0] - 1, 0)], times[indices[-1]]
+        if not (math.isnan(start) or math.isnan(end)):
+            durations[f"duration_{phase}"] = end - start
+
+    known = [t for t in times if not math.isnan(t)]
+    if known:
+        durations["duration_total"] = known[-1] - known[0]
+    return durations
+
+
+class RunTable:
+    """Column-oriented table of run summaries backed by NumPy arrays"""
+
+    def __init__(self, runs: Iterable[Dict[str, Any]]):
+        """
+        Build the table
+
+        Args:
+            runs: Dicts with feature, run, summary and (optional) phase_durations,
+                e.g. the "runs" of an extract_fleet_metrics document
+
+        Raises:
+            RuntimeError: If numpy is not installed
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            raise RuntimeError("Metrics queries require numpy (pip install numpy)") from None
+
+        self.np = np
+        runs = list(runs)
+        self.feature = np.array([r["feature"] for r in runs], dtype=object)
+        self.run = np.array([r["run"] for r in runs], dtype=object)
+        self.ended = np.array([parse_timestamp(r["summary"].get("last_checkpoint")) for r in runs], dtype=float)
+        self.success = np.array([bool(r["summary"].get("success")) for r in runs], dtype=bool)
+        self.columns: Dict[str, Any] = {}
+        for metric, key in SUMMARY_METRICS.items():
+            self.columns[metric] = np.array([_number(r["summary"].get(key)) for r in runs], dtype=float)
+        for metric in DURATION_METRICS:
+            self.columns[metric] = np.array([_number(r.get("phase_durations", {}).get(metric)) for r in runs],
+                                            dtype=float)
+
+    def __len__(self) -> int:
+        return len(self.feature)
+
+    def filter(self, features: Optional[List[str]] = None, since: Optional[float] = None,
+               until: Optional[float] = None, status: Optional[str] = None,
+               last: Optional[int] = None) -> "RunTable":
+        """
+        Select runs
+
+        Args:
+            features: Keep only these features
+            since: Keep runs whose last checkpoint is at or after this epoch time
+            until: Keep runs whose last checkpoint is before this epoch time
+            status: "success" or "failed"
+            last: Then keep only the N most recent runs
+
+        Returns:
+            A new, filtered RunTable
+        """
+        np = self.np
+        mask = np.ones(len(self), dtype=bool)
+        if features:
+            mask &= np.isin(self.feature, features)
+        if since is not None:
+            mask &= self.ended >= since
+        if until is not None:
+            mask &= self.ended < until
+        if status is not None:
+            mask &= self.success if status == "success" else ~self.success
+
+        selected = np.flatnonzero(mask)
+        if last is not None:
+            # Undated runs sort oldest
+            order = np.argsort(np.nan_to_num(self.ended[selected], nan=-np.inf), kind="stable")
+            selected = np.sort(selected[order[-last:]]) if last > 0 else selected[:0]
+        return self._take(selected)
+
+    def aggregate(self, metrics: Optional[List[str]] = None, percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+                  group_by_feature: bool = False) -> List[Dict[str, Any]]:
+        """
+        Compute count, mean and percentiles of each metric, ignoring runs that lack it
+
+        Args:
+            metrics: Metrics to aggregate (default: all QUERY_METRICS)
+            percentiles: Percentiles to report (0-100)
+            group_by_feature: One result set per feature instead of one overall
+
+        Returns:
+            Rows with group, metric, count, mean and p<N> keys (None where no data)
+        """
+        np = self.np
+        metrics = metrics or QUERY_METRICS
+
+        if group_by_feature:
+            groups, inverse = np.unique(self.feature.astype(str), return_inverse=True)
+            order = np.argsort(inverse, kind="stable")
+            bounds = np.searchsorted(inverse[order], np.arange(len(groups) + 1))
+            slices = [(str(g), order[bounds[i]:bounds[i + 1]]) for i, g in enumerate(groups)]
+        else:
+            slices = [("all", np.arange(len(self)))]
+
+        results = []
+        for metric in metrics:
+            column = self.columns[metric]
+            for group, rows in slices:
+                values = column[rows]
+                values = values[~np.isnan(values)]
+                result: Dict[str, Any] = {"group": group, "metric": metric, "count": int(values.size),
+                                          "mean": float(values.mean()) if values.size else None}
+                points = np.percentile(values, percentiles) if values.size else [None] * len(percentiles)
+                for p, value in zip(percentiles, points):
+                    result[f"p{p:g}"] = None if value is None else float(value)
+                results.append(result)
+        return results
+
+    def _take(self, rows) -> "RunTable":
+        """Row subset sharing no arrays with this table"""
+        table = RunTable.__new__(RunTable)
+        table.np = self.np
+        table.feature = self.feature[rows]
+        table.run = self.run[rows]
+        table.ended = self.ended[rows]
+        table.success = self.success[rows]
+        table.columns = {name: column[rows] for name, column in self.columns.items()}
+        return table
+
+
+def _number(value: Any) -> float:
+    """Coerce a summary value to float (NaN when missing or non-numeric)"""
+    if value is None or value == "" or isinstance(value, bool):
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def runs_from_export_rows(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Rebuild run summaries and phase durations from flat export rows
+
+    Args:
+        rows: Rows of an extract_metrics.py --export file (checkpoint rows precede their run row)
+
+    Returns:
+        Dicts with feature, run, source, summary and phase_durations
+    """
+    runs = []
+    timeline: List[Dict[str, Any]] = []
+    for row in rows:
+        if row["row_type"] == "checkpoint":
+            timeline.append({"checkpoint": row["checkpoint"], "timestamp": row["timestamp"]})
+            continue
+        summary = {key: row[column] for key, column in SUMMARY_COLUMNS.items() if row[column] is not None}
+        runs.append({"feature": row["feature"], "run": row["run"], "source": row["source"],
+                     "summary": summary, "phase_durations": phase_durations(timeline)})
+        timeline = []
+    return runs
+
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    """
+    Render aggregate rows as a plain-text table
+
+    Args:
+        results: Output of RunTable.aggregate
+
+    Returns:
+        The table
+    """
+    if not results:
+        return "No results"
+    stat_keys = [k for k in results[0] if k not in ("group", "metric")]
+    group_width = max(5, *(len(r["group"]) for r in results))
+    lines = [f"{'group':{group_width}}  {'metric':24}" + "".join(f"{k:>12}" for k in stat_keys)]
+    for r in results:
+        cells = []
+        for k in stat_keys:
+            value = r[k]
+            cells.append(f"{'-':>12}" if value is None else f"{value:>12}" if k == "count" else f"{value:>12.2f}")
+        lines.append(f"{r['group']:{group_width}}  {r['metric']:24}" + "".join(cells))
+    return "\n".join(lines)
@@ -1,41 +1,482 @@
 #!/usr/bin/env python3
 # tmops_tools/monitor_checkpoints.py
-# Checkpoint monitoring with exponential backoff and logging
+# Checkpoint monitoring with inotify wake-ups, exponential backoff and logging
 
 import os
 import sys
 import time
 import json
+import errno
+import select
+import struct
+import queue
+import random
+import atexit
+import ctypes
+import ctypes.util
 import argparse
+import sqlite3
+import threading
+from fnmatch import fnmatch, fnmatchcase
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple, Iterator, Callable
+
+from checkpoint_index import (CheckpointIndex, read_checkpoint_header, shard_checkpoint_name, shard_pattern,
+                              parse_shard_name, sidecar_path, is_sidecar, is_hidden)
+from feature_lock import FeatureLock
+from tracing import span, instrumented
+from wait_stats import WaitStats, WaitRecord
+
+# inotify(7) event flags we care about: a writer closed the file, or a file
+# was renamed into the directory (atomic tmp + mv writers)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+CHECKPOINT_EVENTS = IN_CLOSE_WRITE | IN_MOVED_TO
+
+# Additionally needed to report removed checkpoints in watch mode
+IN_MOVED_FROM = 0x00000040
+IN_DELETE = 0x00000200
+WATCH_EVENTS = CHECKPOINT_EVENTS | IN_MOVED_FROM | IN_DELETE
+
+# Delivered without being asked for: the kernel queue filled up and events were dropped
+IN_Q_OVERFLOW = 0x00004000
+
+
+class ShardTimeoutError(TimeoutError):
+    """A shard barrier timed out; carries which shards arrived and which are missing"""
+    
+    def __init__(self, name: str, shards: int, required: int, present: List[int], missing: List[int],
+                 timeout: float):
+        self.name = name
+        self.shards = shards
+        self.required = required
+        self.present = present
+        self.missing = missing
+        super().__init__(f"Timeout: {len(present)}/{shards} shards of {name} after {timeout}s "
+                         f"(need {required}; missing shards: {', '.join(map(str, missing))})")
+
+
+class InotifyWatcher:
+    """Minimal ctypes binding to Linux inotify for watching checkpoint directories"""
+
+    _EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+    def __init__(self, libc):
+        """
+        Initialize the watcher (use InotifyWatcher.create() instead)
+
+        Args:
+            libc: The loaded C library exposing the inotify calls
+        """
+        self._libc = libc
+        self._watches: Dict[int, Path] = {}
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    @classmethod
+    def create(cls) -> Optional["InotifyWatcher"]:
+        """
+        Create a watcher if inotify is usable on this platform
+
+        Returns:
+            An InotifyWatcher, or None when inotify is unavailable
+        """
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            libc.inotify_init1  # Raises AttributeError on libcs without inotify
+            return cls(libc)
+        except (OSError, AttributeError):
+            return None
+
+    def add_watch(self, directory: Path, mask: int = CHECKPOINT_EVENTS) -> int:
+        """
+        Watch a directory for the given event mask
+
+        Args:
+            directory: Directory to watch (symlinks such as runs/current are followed)
+            mask: inotify event mask
+
+        Returns:
+            The watch descriptor
+        """
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), str(directory))
+        self._watches[wd] = Path(directory)
+        return wd
+
+    def remove_watch(self, wd: int):
+        """
+        Stop watching a directory, e.g. after runs/current was re-pointed
+
+        Args:
+            wd: The watch descriptor returned by add_watch
+        """
+        if self._watches.pop(wd, None) is not None:
+            # Fails harmlessly if the kernel already dropped the watch (directory deleted)
+            self._libc.inotify_rm_watch(self.fd, wd)
+
+    def wait(self, timeout: float) -> List[Tuple[Optional[Path], str, int]]:
+        """
+        Block until events arrive or the timeout expires
+
+        Args:
+            timeout: Maximum time to block in seconds
+
+        Returns:
+            List of (directory, filename, mask) tuples; empty on timeout (see read_events)
+        """
+        try:
+            ready, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        except InterruptedError:
+            return []
+        if not ready:
+            return []
+        return self.read_events()
+
+    def read_events(self) -> List[Tuple[Optional[Path], str, int]]:
+        """
+        Drain all pending events without blocking
+
+        Returns:
+            List of (directory, filename, mask) tuples; a queue overflow is
+            reported as (None, "", IN_Q_OVERFLOW) and means events were lost
+        """
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                if e.errno == errno.EINTR:
+                    continue
+                raise
+            if not data:
+                break
+
+            offset = 0
+            while offset + self._EVENT_HEADER.size <= len(data):
+                wd, mask, _cookie, name_len = self._EVENT_HEADER.unpack_from(data, offset)
+                offset += self._EVENT_HEADER.size
+                name = data[offset:offset + name_len].rstrip(b"\0").decode(errors="surrogateescape")
+                offset += name_len
+                if wd in self._watches:
+                    events.append((self._watches[wd], name, mask))
+                elif mask & IN_Q_OVERFLOW:
+                    events.append((None, "", mask))
+        return events
+
+    def close(self):
+        """Release the inotify file descriptor"""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+# Waiting without inotify; overridable per monitor or via TMOPS_WATCH_MODE / TMOPS_FAST_POLL_SECONDS.
+# "auto" uses inotify where it works, "poll" always polls (NFS, bind mounts in containers)
+WATCH_MODES = ("auto", "poll")
+FAST_POLL_INTERVAL = 0.2  # Mean seconds between polls during the fast initial cadence
+
+# A directory whose mtime is this close to our last listing may change again
+# without its mtime moving (coarse timestamps), so it is re-listed regardless
+RACY_LISTING_SECONDS = 2.0
+
+
+class DirectoryListing:
+    """Cached listing of one directory, re-read only when a stat shows it changed"""
+
+    def __init__(self, directory: Path, max_age: float = 10.0):
+        """
+        Prepare the listing (nothing is read until names or match)
+
+        Args:
+            directory: The directory to list
+            max_age: Re-list at least this often even if the stat looks unchanged
+        """
+        self.directory = Path(directory)
+        self.max_age = max_age
+        self.listings = 0
+        self._key: Optional[Tuple[int, int, int]] = None
+        self._names: List[str] = []
+        self._listed_at = 0.0
+
+    def names(self) -> List[str]:
+        """
+        Current entry names, from one stat when nothing changed
+
+        Returns:
+            Sorted entry names (empty if the directory does not exist)
+        """
+        try:
+            stat = os.stat(self.directory)
+        except FileNotFoundError:
+            self._key, self._names = None, []
+            return self._names
+
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_ctime_ns)
+        now = time.time()
+        racy = self._listed_at - stat.st_mtime < RACY_LISTING_SECONDS
+        if key != self._key or racy or now - self._listed_at >= self.max_age:
+            try:
+                with span("list_directory", "io"):
+                    self._names = sorted(os.listdir(self.directory))
+            except FileNotFoundError:
+                self._names = []
+            self._key = key
+            self._listed_at = now
+            self.listings += 1
+        return self._names
+
+    def match(self, pattern: str) -> List[Path]:
+        """
+        Entries matching a glob pattern, matched in memory
+
+        Args:
+            pattern: Filename pattern (no directory part)
+
+        Returns:
+            Matching paths, sorted
+        """
+        return [self.directory / name for name in self.names() if fnmatchcase(name, pattern)]
+
+
+# Log backend defaults; overridable per monitor or via TMOPS_LOG_* environment variables
+LOG_FORMATS = ("text", "json")
+DEFAULT_LOG_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_LOG_BACKUPS = 3
+
+
+def rotate_log(path: Path, backups: int):
+    """Shift <log>.N-1 -> <log>.N ... <log> -> <log>.1, dropping the oldest"""
+    if backups <= 0:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        return
+    for index in range(backups - 1, 0, -1):
+        older = path.with_name(f"{path.name}.{index}")
+        if older.exists():
+            os.replace(older, path.with_name(f"{path.name}.{index + 1}"))
+    os.replace(path, path.with_name(f"{path.name}.1"))
+
+
+class _LogWriter:
+    """Background thread that owns open log handles and writes queued lines in batches"""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._handles: Dict[Path, Any] = {}
+        self._thread = threading.Thread(target=self._run, name="tmops-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def write(self, path: Path, line: str, max_bytes: int, backups: int):
+        """Queue one log line for path"""
+        self._queue.put((path, line, max_bytes, backups))
+
+    def flush(self, timeout: float = 5.0):
+        """Block until every line queued so far is written and flushed"""
+        if os.getpid() != self.pid:
+            return  # Forked child: the writer thread only exists in the parent
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _run(self):
+        """Writer loop: take one item, drain the rest, write per file, flush"""
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            with span("log_write", "io", lines=len(batch)):
+                self._write_batch(batch)
+
+    def _write_batch(self, batch: List[Any]):
+        """Write and flush one batch of queued lines, then release its flush waiters"""
+        touched = set()
+        waiters = []
+        for item in batch:
+            if isinstance(item, threading.Event):
+                waiters.append(item)
+                continue
+            path, line, max_bytes, backups = item
+            try:
+                handle = self._handle_for(path, len(line.encode()), max_bytes, backups)
+                handle.write(line)
+                touched.add(path)
+            except OSError as e:
+                print(f"ERROR: Could not write log {path}: {e}", file=sys.stderr)
+
+        for path in touched:
+            try:
+                self._handles[path].flush()
+            except (OSError, KeyError):
+                pass
+        for done in waiters:
+            done.set()
+
+    def _handle_for(self, path: Path, incoming: int, max_bytes: int, backups: int):
+        """Return an open append handle for path, rotating it first if it would exceed max_bytes"""
+        handle = self._handles.get(path)
+        if handle is not None:
+            # Another process may have rotated the file from under us
+            try:
+                if os.fstat(handle.fileno()).st_ino != os.stat(path).st_ino:
+                    handle.close()
+                    handle = None
+            except OSError:
+                handle.close()
+                handle = None
+
+        if handle is None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handle = open(path, "a")
+            self._handles[path] = handle
+
+        if max_bytes > 0 and handle.tell() > 0 and handle.tell() + incoming > max_bytes:
+            handle.close()
+            rotate_log(path, backups)
+            handle = open(path, "a")
+            self._handles[path] = handle
+
+        return handle
+
+
+_log_writer: Optional[_LogWriter] = None
+_log_writer_lock = threading.Lock()
+
+
+def _get_log_writer() -> _LogWriter:
+    """Start the shared log writer on first use"""
+    global _log_writer
+    with _log_writer_lock:
+        if _log_writer is None or _log_writer.pid != os.getpid():
+            _log_writer = _LogWriter()
+        return _log_writer
+
+
+class CheckpointLogger:
+    """Per-role log front-end: formats entries and hands them to the shared writer"""
+
+    def __init__(self, log_file: Path, role: str, feature: str, log_format: Optional[str] = None,
+                 max_bytes: Optional[int] = None, backups: Optional[int] = None):
+        """
+        Initialize the logger
+
+        Args:
+            log_file: Path of logs/<role>.log (made absolute now, since the writer thread
+                opens it later, whatever the working directory is by then)
+            role: The instance role
+            feature: The feature name
+            log_format: "text" (default) or "json" for NDJSON (env: TMOPS_LOG_FORMAT)
+            max_bytes: Rotate when the log would exceed this size, 0 disables (env: TMOPS_LOG_MAX_BYTES)
+            backups: Rotated files to keep (env: TMOPS_LOG_BACKUPS)
+        """
+        # Absolute but unresolved, so a re-pointed runs/current is still followed
+        self.log_file = Path(os.path.abspath(log_file))
+        self.role = role
+        self.feature = feature
+        self.log_format = log_format or os.environ.get("TMOPS_LOG_FORMAT", "text")
+        if self.log_format not in LOG_FORMATS:
+            raise ValueError(f"Unknown log format: {self.log_format} (expected one of {', '.join(LOG_FORMATS)})")
+        self.max_bytes = max_bytes if max_bytes is not None else \
+            int(os.environ.get("TMOPS_LOG_MAX_BYTES", DEFAULT_LOG_MAX_BYTES))
+        self.backups = backups if backups is not None else \
+            int(os.environ.get("TMOPS_LOG_BACKUPS", DEFAULT_LOG_BACKUPS))
+
+    def write(self, message: str, level: str = "INFO", event: Optional[str] = None, **fields):
+        """
+        Queue a log entry; ERROR entries are flushed before returning
+
+        Args:
+            message: The message to log
+            level: Log level (INFO, WARNING, ERROR)
+            event: Machine-readable event name for structured logs
+            **fields: Extra structured fields (JSON mode only)
+        """
+        with span("log", event=event):
+            self._write(message, level, event, fields)
+
+    def _write(self, message: str, level: str, event: Optional[str], fields: Dict[str, Any]):
+        """Format one entry and hand it to the log writer (see write)"""
+        now = datetime.now()
+        if self.log_format == "json":
+            entry = {
+                "timestamp": now.isoformat(timespec="milliseconds"),
+                "level": level,
+                "role": self.role,
+                "feature": self.feature,
+                "event": event or "message",
+                "message": message
+            }
+            entry.update(fields)
+            line = json.dumps(entry, default=str) + "\n"
+        else:
+            timestamp = now.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+            line = f"[{timestamp}] [{level}] {message}\n"
+
+        writer = _get_log_writer()
+        writer.write(self.log_file, line, self.max_bytes, self.backups)
+        if level == "ERROR":
+            writer.flush()
+
+    def flush(self):
+        """Block until all queued entries are on disk"""
+        _get_log_writer().flush()
+
 
 class CheckpointMonitor:
     """Monitor and manage TeamOps checkpoints with logging and exponential backoff"""
     
-    def __init__(self, feature: str, instance_role: str):
+    def __init__(self, feature: str, instance_role: str, log_format: Optional[str] = None,
+                 watch_mode: Optional[str] = None, fast_poll: Optional[float] = None):
         """
         Initialize the checkpoint monitor
         
         Args:
             feature: The feature name being worked on
             instance_role: The role of this instance (orchestrator, tester, impl, verify)
+            log_format: "text" or "json" (default: TMOPS_LOG_FORMAT or text)
+            watch_mode: "auto" (inotify when available) or "poll" (default: TMOPS_WATCH_MODE or auto)
+            fast_poll: Seconds of jittered sub-second polling at the start of each wait,
+                before the exponential backoff (default: TMOPS_FAST_POLL_SECONDS or 0)
         """
+        self.watch_mode = watch_mode or os.environ.get("TMOPS_WATCH_MODE", "auto")
+        if self.watch_mode not in WATCH_MODES:
+            raise ValueError(f"Unknown watch mode {self.watch_mode!r} (expected one of {', '.join(WATCH_MODES)})")
+        self.fast_poll = fast_poll if fast_poll is not None else \
+            float(os.environ.get("TMOPS_FAST_POLL_SECONDS", 0))
         self.feature = feature
         self.role = instance_role
-        self.checkpoint_dir = Path(f"../.tmops/{feature}/runs/current/checkpoints")
+        self.feature_dir = Path(f"../.tmops/{feature}")
+        self.checkpoint_dir = self.feature_dir / "runs/current/checkpoints"
         self.log_file = Path(f"../.tmops/{feature}/runs/current/logs/{instance_role}.log")
         
         # Ensure directories exist
         self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
         self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        self.logger = CheckpointLogger(self.log_file, instance_role, feature, log_format)
+        self._index: Optional[CheckpointIndex] = None
+        self.stats = WaitStats(feature, instance_role)
         
-        self.log(f"CheckpointMonitor initialized for {feature}/{instance_role}")
+        self.log(f"CheckpointMonitor initialized for {feature}/{instance_role}", event="init")
     
     def wait_for_checkpoint(self, checkpoint_pattern: str, timeout: int = 300) -> str:
         """
-        Poll for a checkpoint file with exponential backoff
+        Wait for a checkpoint file and return its content
         
         Args:
             checkpoint_pattern: Glob pattern to match checkpoint files (e.g., "001-*.md")
@@ -47,48 +488,341 @@ class CheckpointMonitor:
         Raises:
             TimeoutError: If no matching checkpoint is found within timeout
         """
+        checkpoint_file = self.wait_for_checkpoint_file(checkpoint_pattern, timeout)
+        with span("read_checkpoint", "io", checkpoint=checkpoint_file.name):
+            return checkpoint_file.read_text()
+    
+    def wait_for_checkpoint_header(self, checkpoint_pattern: str, timeout: int = 300) -> Dict[str, Any]:
+        """
+        Wait for a checkpoint file without reading its body
+        
+        Only the header block is read, so waiting on checkpoints with large
+        pasted logs costs no more memory than waiting on small ones.
+        
+        Args:
+            checkpoint_pattern: Glob pattern to match checkpoint files (e.g., "001-*.md")
+            timeout: Maximum time to wait in seconds (default 5 minutes)
+        
+        Returns:
+            Dict with name, path, size and the parsed header fields (from, to, timestamp, feature)
+        
+        Raises:
+            TimeoutError: If no matching checkpoint is found within timeout
+        """
+        checkpoint_file = self.wait_for_checkpoint_file(checkpoint_pattern, timeout)
+        info: Dict[str, Any] = {"name": checkpoint_file.name, "path": str(checkpoint_file),
+                                "size": checkpoint_file.stat().st_size}
+        info.update(read_checkpoint_header(checkpoint_file))
+        return info
+    
+    def wait_for_checkpoint_file(self, checkpoint_pattern: str, timeout: int = 300) -> Path:
+        """
+        Wait for a checkpoint file, waking on inotify events when available
+        
+        Falls back to polling with exponential backoff when inotify cannot be
+        used (non-Linux hosts, exhausted watch limits, some network mounts).
+        
+        Args:
+            checkpoint_pattern: Glob pattern to match checkpoint files (e.g., "001-*.md")
+            timeout: Maximum time to wait in seconds (default 5 minutes)
+        
+        Returns:
+            Path of the first matching checkpoint (by name)
+        
+        Raises:
+            TimeoutError: If no matching checkpoint is found within timeout
+        """
+        with span("wait", pattern=checkpoint_pattern):
+            found, record = self._wait_for_matches(checkpoint_pattern, timeout, lambda matches: matches[:1])
+        checkpoint_file = found[0]
+        self.log(f"Found checkpoint: {checkpoint_file.name}", event="checkpoint_found",
+                 pattern=checkpoint_pattern, checkpoint=checkpoint_file.name,
+                 waited_seconds=round(record.wait_seconds, 3), **record.summary())
+        return checkpoint_file
+    
+    def wait_for_shards(self, name: str, shards: int, required: Optional[int] = None,
+                        timeout: int = 300) -> List[Path]:
+        """
+        Barrier: wait until enough shard checkpoints of a fanned-out phase exist
+        
+        Args:
+            name: The unsharded checkpoint name (e.g. "004-tests-complete.md")
+            shards: Number of shards the phase was split into (M)
+            required: Shards that must be present (N, default all M)
+            timeout: Maximum time to wait in seconds (default 5 minutes)
+        
+        Returns:
+            Paths of the shard checkpoints present, ordered by shard number
+        
+        Raises:
+            ShardTimeoutError: If fewer than required shards exist at timeout; lists the missing shards
+        """
+        required = shards if required is None else required
+        if not 1 <= required <= shards:
+            raise ValueError(f"Required shards must be within 1..{shards}, got {required}")
+        pattern = shard_pattern(name, shards)
+        
+        def present(matches: List[Path]) -> List[Path]:
+            by_shard = {}
+            for path in matches:
+                parsed = parse_shard_name(path.name)
+                if parsed and 1 <= parsed[1] <= shards:
+                    by_shard[parsed[1]] = path
+            return [by_shard[k] for k in sorted(by_shard)]
+        
+        try:
+            with span("wait_shards", pattern=pattern, required=required):
+                found, record = self._wait_for_matches(
+                    pattern, timeout, lambda matches: present(matches) if len(present(matches)) >= required else None)
+        except TimeoutError:
+            found = present(sorted(self.checkpoint_dir.glob(pattern)))
+            have = {parse_shard_name(path.name)[1] for path in found}
+            missing = [k for k in range(1, shards + 1) if k not in have]
+            raise ShardTimeoutError(name, shards, required, sorted(have), missing, timeout) from None
+        
+        self.log(f"Found {len(found)}/{shards} shards of {name}", event="shards_found", pattern=pattern,
+                 checkpoints=[path.name for path in found], required=required,
+                 waited_seconds=round(record.wait_seconds, 3), **record.summary())
+        return found
+    
+    def _wait_for_matches(self, checkpoint_pattern: str, timeout: int,
+                          ready: Callable[[List[Path]], Optional[List[Path]]]) -> Tuple[List[Path], WaitRecord]:
+        """
+        Re-glob a pattern until ready() accepts the matches
+        
+        Args:
+            checkpoint_pattern: Glob pattern to match checkpoint files
+            timeout: Maximum time to wait in seconds
+            ready: Given the sorted matches, returns the files to hand back, or a falsy value to keep waiting
+        
+        Returns:
+            What ready() returned, and the finished wait record
+        
+        Raises:
+            TimeoutError: If ready() never accepted the matches within timeout
+        """
         start_time = time.time()
         wait_time = 2  # Initial wait time in seconds
         max_wait = 10  # Maximum wait time between checks
+        progress_interval = 30  # Seconds between "still waiting" logs
+        next_progress = start_time + progress_interval
+        record = WaitRecord(checkpoint_pattern)
+        matching_files: List[Path] = []
         
-        self.log(f"Waiting for checkpoint matching: {checkpoint_pattern}")
+        self.log(f"Waiting for checkpoint matching: {checkpoint_pattern}", event="wait_start",
+                 pattern=checkpoint_pattern, timeout=timeout)
         
-        while time.time() - start_time < timeout:
-            # Check for matching checkpoints
-            matching_files = list(self.checkpoint_dir.glob(checkpoint_pattern))
-            
-            if matching_files:
-                checkpoint_file = matching_files[0]  # Take the first match
-                self.log(f"Found checkpoint: {checkpoint_file.name}")
+        # Register the watch before the first glob so nothing lands unnoticed in between
+        watcher = InotifyWatcher.create() if self.watch_mode == "auto" else None
+        if watcher:
+            try:
+                watcher.add_watch(self.checkpoint_dir)
+            except OSError as e:
+                self.log(f"inotify unavailable ({e}), falling back to polling", level="WARNING",
+                         event="inotify_unavailable")
+                watcher.close()
+                watcher = None
+        
+        # Without inotify, each poll stats the directory and only re-lists it when it changed
+        listing = None
+        if not watcher and "/" not in checkpoint_pattern:
+            listing = DirectoryListing(self.checkpoint_dir, max_wait)
+        fast_until = start_time + self.fast_poll
+        
+        try:
+            while time.time() - start_time < timeout:
+                # Check for matching checkpoints
+                glob_start = time.perf_counter()
+                with span("poll", "io"):
+                    candidates = listing.match(checkpoint_pattern) if listing else \
+                        self.checkpoint_dir.glob(checkpoint_pattern)
+                    matching_files = sorted(path for path in candidates
+                                            if not is_sidecar(path.name) and not is_hidden(path.name))
+                record.glob_seconds.append(time.perf_counter() - glob_start)
+                record.polls += 1
+                record.listings = listing.listings if listing else record.polls
                 
-                content = checkpoint_file.read_text()
-                return content
-            
-            # Log periodic status
-            elapsed = int(time.time() - start_time)
-            if elapsed % 30 == 0 and elapsed > 0:  # Log every 30 seconds
-                self.log(f"Still waiting for {checkpoint_pattern} ({elapsed}s elapsed)")
-            
-            # Wait with exponential backoff
-            time.sleep(wait_time)
-            wait_time = min(wait_time * 1.5, max_wait)
+                found = ready(matching_files) if matching_files else None
+                if found:
+                    # Only meaningful when the file appeared while we were waiting
+                    if record.polls > 1:
+                        try:
+                            newest = max(path.stat().st_mtime for path in found)
+                            record.detect_latency = max(time.time() - newest, 0.0)
+                        except FileNotFoundError:
+                            pass
+                    record.outcome = "found"
+                    self.finish_wait(record, start_time)
+                    return found, record
+                
+                # Log periodic status
+                now = time.time()
+                if now >= next_progress:
+                    elapsed = int(now - start_time)
+                    self.log(f"Still waiting for {checkpoint_pattern} ({elapsed}s elapsed)", event="wait_progress",
+                             pattern=checkpoint_pattern, elapsed_seconds=elapsed, polls=record.polls,
+                             matches=len(matching_files))
+                    while next_progress <= now:
+                        next_progress += progress_interval
+                
+                if watcher:
+                    # Sleep until a relevant file lands; re-glob at least every max_wait as a safety net
+                    remaining = timeout - (time.time() - start_time)
+                    deadline = time.time() + min(remaining, max_wait, max(next_progress - time.time(), 0))
+                    name_pattern = Path(checkpoint_pattern).name
+                    while time.time() < deadline:
+                        events = watcher.wait(deadline - time.time())
+                        # After an overflow the matching event may be among the lost ones
+                        if any(mask & IN_Q_OVERFLOW or fnmatch(name, name_pattern) for _, name, mask in events):
+                            record.wakeups += 1
+                            break
+                elif time.time() < fast_until:
+                    # Fast initial cadence, jittered so many waiters don't poll the file server in lockstep
+                    time.sleep(min(FAST_POLL_INTERVAL * random.uniform(0.5, 1.5), max(fast_until - time.time(), 0)))
+                else:
+                    # Wait with exponential backoff
+                    time.sleep(min(wait_time, max(next_progress - time.time(), 0)))
+                    wait_time = min(wait_time * 1.5, max_wait)
+        finally:
+            if watcher:
+                watcher.close()
         
         # Timeout reached
-        error_msg = f"Timeout: No checkpoint matching {checkpoint_pattern} after {timeout}s"
-        self.log(error_msg, level="ERROR")
+        record.outcome = "timeout"
+        self.finish_wait(record, start_time)
+        if matching_files:
+            error_msg = f"Timeout: Only {len(matching_files)} checkpoints matching {checkpoint_pattern} after {timeout}s"
+        else:
+            error_msg = f"Timeout: No checkpoint matching {checkpoint_pattern} after {timeout}s"
+        self.log(error_msg, level="ERROR", event="wait_timeout", pattern=checkpoint_pattern, timeout=timeout,
+                 **record.summary())
         raise TimeoutError(error_msg)
     
-    def create_checkpoint(self, name: str, content: str, metadata: Optional[Dict[str, Any]] = None):
+    def finish_wait(self, record: WaitRecord, start_time: float):
+        """
+        Close a wait record and fold it into the role's cumulative stats
+        
+        Args:
+            record: The finished wait, with its outcome set
+            start_time: Epoch time the wait started
+        """
+        record.wait_seconds = time.time() - start_time
+        try:
+            self.stats.record(record)
+        except OSError as e:
+            self.log(f"Could not update wait stats ({e})", level="WARNING", event="stats_unavailable")
+    
+    def watch_checkpoints(self, since: Optional[float] = None,
+                          poll_interval: float = 1.0) -> Iterator[Dict[str, Any]]:
+        """
+        Follow the checkpoint directory, yielding one event per change
+        
+        Each event has "event" (new, modified or removed), "feature", "name",
+        "size", "mtime" and, except for removals, the header fields "from", "to"
+        and "timestamp". Runs until the caller stops iterating.
+        
+        Args:
+            since: Replay checkpoints modified at or after this epoch time as
+                "new" events first (None only reports changes from now on)
+            poll_interval: Seconds between directory scans when inotify is unavailable
+        
+        Yields:
+            Checkpoint event dicts
+        """
+        watcher = InotifyWatcher.create() if self.watch_mode == "auto" else None
+        if watcher:
+            try:
+                watcher.add_watch(self.checkpoint_dir, WATCH_EVENTS)
+            except OSError as e:
+                self.log(f"inotify unavailable ({e}), falling back to polling", level="WARNING",
+                         event="inotify_unavailable")
+                watcher.close()
+                watcher = None
+        
+        try:
+            known = self._scan_checkpoints()
+            if since is not None:
+                for name, (size, mtime_ns) in sorted(known.items()):
+                    if mtime_ns / 1e9 >= since:
+                        event = self._watch_event("new", name, size, mtime_ns)
+                        if event:
+                            yield event
+            
+            while True:
+                if watcher:
+                    # Events only trigger a rescan; a periodic rescan covers overflowed queues
+                    watcher.wait(10)
+                else:
+                    time.sleep(poll_interval)
+                
+                current = self._scan_checkpoints()
+                for name in sorted(set(known) | set(current)):
+                    before, after = known.get(name), current.get(name)
+                    if before == after:
+                        continue
+                    if after is None:
+                        event = {"event": "removed", "feature": self.feature, "name": name,
+                                 "size": before[0], "mtime": before[1] / 1e9}
+                    else:
+                        event = self._watch_event("new" if before is None else "modified", name, *after)
+                    if event:
+                        yield event
+                known = current
+        finally:
+            if watcher:
+                watcher.close()
+    
+    def _scan_checkpoints(self) -> Dict[str, Tuple[int, int]]:
+        """Map checkpoint name to (size, mtime_ns), tolerating a missing directory"""
+        snapshot = {}
+        try:
+            with os.scandir(self.checkpoint_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".md") and entry.is_file():
+                        stat = entry.stat()
+                        snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            pass
+        return snapshot
+    
+    def _watch_event(self, kind: str, name: str, size: int, mtime_ns: int) -> Optional[Dict[str, Any]]:
+        """Build a new/modified watch event, or None if the file vanished meanwhile"""
+        try:
+            header = read_checkpoint_header(self.checkpoint_dir / name)
+        except FileNotFoundError:
+            return None
+        return {"event": kind, "feature": self.feature, "name": name, "size": size,
+                "mtime": mtime_ns / 1e9, "from": header.get("from"), "to": header.get("to"),
+                "timestamp": header.get("timestamp")}
+    
+    def create_checkpoint(self, name: str, content: str, metadata: Optional[Dict[str, Any]] = None,
+                          shard: Optional[int] = None, shards: Optional[int] = None) -> Path:
         """
         Create a checkpoint file with proper formatting
         
+        The file is written under a temporary name and renamed into place while
+        holding the feature's "checkpoint" lock, so parallel instances (shards)
+        never expose partial files or race on the checkpoint index. Its JSON
+        sidecar ("<name>.json", with header, metadata and parsed metrics) is
+        renamed into place first, so it exists whenever the checkpoint does.
+        
         Args:
             name: The checkpoint filename (e.g., "003-tests-complete.md")
             content: The main content of the checkpoint
             metadata: Optional metadata to include in the checkpoint
+            shard: This instance's shard number (1-based) when the phase is fanned out
+            shards: Total number of shards (required with shard)
+        
+        Returns:
+            Path of the written checkpoint
         """
+        if shard is not None or shards is not None:
+            if shard is None or shards is None:
+                raise ValueError("shard and shards must be given together")
+            name = shard_checkpoint_name(name, shard, shards)
         checkpoint_path = self.checkpoint_dir / name
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        shard_line = f"**Shard:** {shard}/{shards}\n" if shard is not None else ""
         
         # Build the checkpoint content
         formatted_content = f"""# Checkpoint: {name}
@@ -97,7 +831,7 @@ class CheckpointMonitor:
 **To:** {"orchestrator" if self.role != "orchestrator" else "working instances"}
 **Timestamp:** {timestamp}
 **Feature:** {self.feature}
-
+{shard_line}
 ## Content
 
 {content}
@@ -109,9 +843,87 @@ class CheckpointMonitor:
             formatted_content += json.dumps(metadata, indent=2)
             formatted_content += "\n```\n"
         
-        # Write the checkpoint
-        checkpoint_path.write_text(formatted_content)
-        self.log(f"Created checkpoint: {name}")
+        # Imported here so waits, listings and the broker client never load the metrics extractor
+        from extract_metrics import checkpoint_sidecar
+        with span("build_sidecar", checkpoint=name):
+            sidecar = checkpoint_sidecar(name, formatted_content, {
+                "from": self.role,
+                "to": "orchestrator" if self.role != "orchestrator" else "working instances",
+                "feature": self.feature,
+                "shard": shard,
+                "shards": shards,
+                "metadata": metadata or {},
+            })
+        
+        # Write sidecar, then checkpoint. The temp files live in the run directory, so watchers of
+        # checkpoints/ only ever see the finished files being renamed in
+        with span("lock_and_write", "io", checkpoint=name), \
+                FeatureLock(self.feature, "checkpoint", tmops_dir=self.feature_dir.parent):
+            dir_mtime_before = self.checkpoint_dir.stat().st_mtime_ns
+            tmp_sidecar, tmp_checkpoint = (self.checkpoint_dir.parent / f".{path.name}.{os.getpid()}.tmp"
+                                           for path in (sidecar_path(checkpoint_path), checkpoint_path))
+            try:
+                tmp_checkpoint.write_text(formatted_content)
+                # The rename keeps the mtime, so the sidecar pins down exactly the file it describes
+                sidecar["mtime_ns"] = tmp_checkpoint.stat().st_mtime_ns
+                tmp_sidecar.write_text(json.dumps(sidecar))
+                os.replace(tmp_sidecar, sidecar_path(checkpoint_path))
+                os.replace(tmp_checkpoint, checkpoint_path)
+            except BaseException:
+                for tmp_path in (tmp_sidecar, tmp_checkpoint):
+                    if tmp_path.exists():
+                        tmp_path.unlink()
+                raise
+            
+            index = self.index
+            if index:
+                index.record(checkpoint_path, dir_mtime_before, role=self.role, timestamp=timestamp)
+        self.log(f"Created checkpoint: {name}", event="checkpoint_created", checkpoint=name)
+        return checkpoint_path
+    
+    @property
+    def index(self) -> Optional[CheckpointIndex]:
+        """
+        The feature's checkpoint index, opened on first use
+        
+        Returns:
+            The CheckpointIndex, or None if it cannot be opened (callers fall back to globbing)
+        """
+        if self._index is None:
+            try:
+                self._index = CheckpointIndex(self.feature_dir)
+            except (sqlite3.Error, OSError) as e:
+                self.log(f"Checkpoint index unavailable ({e}), using directory scans", level="WARNING",
+                         event="index_unavailable")
+                self._index = False
+        return self._index or None
+    
+    def indexed_checkpoints(self) -> List[Dict[str, Any]]:
+        """
+        List checkpoints of the current run with their indexed details
+        
+        Returns:
+            Rows with name, role, timestamp, size, mtime_ns and phase, sorted by name
+        """
+        index = self.index
+        if index:
+            with span("index_sync", "io"):
+                return index.checkpoints(index.sync(self.checkpoint_dir))
+        return [{"name": f.name} for f in sorted(self.checkpoint_dir.glob("*.md")) if not is_hidden(f.name)]
+    
+    def reindex(self) -> int:
+        """
+        Rebuild the feature's checkpoint index from disk
+        
+        Returns:
+            Number of checkpoints indexed
+        """
+        index = self.index
+        if not index:
+            return 0
+        count = index.reindex()
+        self.log(f"Reindexed {count} checkpoints", event="reindexed", count=count)
+        return count
     
     def list_checkpoints(self) -> list:
         """
@@ -120,45 +932,82 @@ class CheckpointMonitor:
         Returns:
             List of checkpoint filenames
         """
-        checkpoints = sorted([f.name for f in self.checkpoint_dir.glob("*.md")])
-        self.log(f"Found {len(checkpoints)} checkpoints")
+        checkpoints = [row["name"] for row in self.indexed_checkpoints()]
+        self.log(f"Found {len(checkpoints)} checkpoints", event="checkpoints_listed", count=len(checkpoints))
         return checkpoints
     
-    def get_checkpoint_content(self, name: str) -> Optional[str]:
+    def get_checkpoint_content(self, name: str, max_bytes: Optional[int] = None,
+                               run: Optional[str] = None) -> Optional[str]:
         """
         Read the content of a specific checkpoint
         
         Args:
             name: The checkpoint filename
+            max_bytes: Read at most this many bytes (None reads the whole file)
+            run: Read from this run instead of the current one: a run under runs/ or an
+                archived run under .archive/, loose or packed (read without unpacking)
         
         Returns:
             The checkpoint content, or None if not found
         """
         checkpoint_path = self.checkpoint_dir / name
+        if run is not None:
+            checkpoint_path = self._run_dir(run) / "checkpoints" / name
         
-        if checkpoint_path.exists():
-            return checkpoint_path.read_text()
+        run_dir = checkpoint_path.parent.parent
+        # Imported here so the plain monitor never loads the pack reader
+        from run_pack import RunPack, is_pack
+        if is_pack(run_dir):
+            with RunPack(run_dir) as pack:
+                content = pack.read_text(f"checkpoints/{name}", max_bytes)
+            if content is not None:
+                return content
+        else:
+            try:
+                if max_bytes is None:
+                    return checkpoint_path.read_text()
+                with open(checkpoint_path, "rb") as f:
+                    # Same newline handling as read_text(); a cut multi-byte character is replaced
+                    return f.read(max_bytes).decode(errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+            except FileNotFoundError:
+                pass
         
-        self.log(f"Checkpoint not found: {name}", level="WARNING")
+        self.log(f"Checkpoint not found: {name}", level="WARNING", event="checkpoint_missing", checkpoint=name)
         return None
     
-    def log(self, message: str, level: str = "INFO"):
+    def _run_dir(self, run: str) -> Path:
+        """
+        Locate a run of this feature by name
+        
+        Args:
+            run: Run name under runs/, or archive name under .archive/ (with or without .tmpack)
+        
+        Returns:
+            The run directory or pack (the runs/ path if nothing matches)
+        """
+        from run_pack import is_pack, pack_path_for
+        for parent in (self.feature_dir / "runs", self.feature_dir / ".archive"):
+            candidate = parent / run
+            if candidate.is_dir() or is_pack(candidate):
+                return candidate
+            if is_pack(pack_path_for(candidate)):
+                return pack_path_for(candidate)
+        return self.feature_dir / "runs" / run
+    
+    def log(self, message: str, level: str = "INFO", event: Optional[str] = None, **fields):
         """
         Write a message to the instance log file
         
+        Entries are queued to a background writer that keeps the log open,
+        batches writes and rotates by size; ERROR entries are flushed at once.
+        
         Args:
             message: The message to log
             level: Log level (INFO, WARNING, ERROR)
+            event: Event name recorded in structured (json) logs
+            **fields: Extra fields recorded in structured (json) logs
         """
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-        log_entry = f"[{timestamp}] [{level}] {message}\n"
-        
-        # Ensure log directory exists
-        self.log_file.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Append to log file
-        with open(self.log_file, 'a') as f:
-            f.write(log_entry)
+        self.logger.write(message, level, event, **fields)
         
         # Also print to console if it's an error
         if level == "ERROR":
@@ -172,11 +1021,14 @@ class CheckpointMonitor:
             Dictionary with run information
         """
         run_dir = self.checkpoint_dir.parent
+        details = self.indexed_checkpoints()
         
         info = {
             "feature": self.feature,
+            "run": CheckpointIndex.run_name(self.checkpoint_dir),
             "run_dir": str(run_dir),
-            "checkpoints": self.list_checkpoints(),
+            "checkpoints": [row["name"] for row in details],
+            "checkpoint_details": details,
             "log_file": str(self.log_file)
         }
         
@@ -193,6 +1045,19 @@ def main():
     parser = argparse.ArgumentParser(description="Monitor TeamOps checkpoints")
     parser.add_argument("feature", help="Feature name")
     parser.add_argument("role", help="Instance role (orchestrator, tester, impl, verify)")
+    parser.add_argument("--log-format", choices=LOG_FORMATS,
+                        help="Log line format (default: TMOPS_LOG_FORMAT or text)")
+    parser.add_argument("--watch-mode", choices=WATCH_MODES,
+                        help="auto uses inotify when available, poll always polls with stat-gated listings "
+                             "(default: TMOPS_WATCH_MODE or auto)")
+    parser.add_argument("--fast-poll", type=float, metavar="SECONDS",
+                        help="Poll every ~0.2s (jittered) for the first SECONDS of a wait "
+                             "(default: TMOPS_FAST_POLL_SECONDS or 0)")
+    parser.add_argument("--trace", action="store_true",
+                        help="Write timed spans as Chrome trace JSON to runs/<run>/logs (or set TMOPS_TRACE=1)")
+    parser.add_argument("--profile", action="store_true", help="Write cProfile stats to runs/<run>/logs")
+    parser.add_argument("--no-broker", action="store_true",
+                        help="Work on disk even when a checkpoint broker is listening (or set TMOPS_BROKER=off)")
     
     subparsers = parser.add_subparsers(dest="command", help="Command to execute")
     
@@ -200,11 +1065,28 @@ def main():
     wait_parser = subparsers.add_parser("wait", help="Wait for a checkpoint")
     wait_parser.add_argument("pattern", help="Checkpoint pattern to wait for")
     wait_parser.add_argument("--timeout", type=int, default=300, help="Timeout in seconds")
+    wait_parser.add_argument("--header-only", action="store_true",
+                             help="Print the path and header fields as JSON instead of the content")
     
     # Create command
     create_parser = subparsers.add_parser("create", help="Create a checkpoint")
     create_parser.add_argument("name", help="Checkpoint name")
     create_parser.add_argument("content", help="Checkpoint content")
+    create_parser.add_argument("--shard", metavar="K/M",
+                               help="Write shard K of M (name becomes <name>.shard-K-of-M.md)")
+    
+    # Shard barrier command
+    shards_parser = subparsers.add_parser("wait-shards", help="Wait until N of M shard checkpoints exist")
+    shards_parser.add_argument("name", help="Unsharded checkpoint name (e.g. 004-tests-complete.md)")
+    shards_parser.add_argument("shards", type=int, help="Number of shards (M)")
+    shards_parser.add_argument("--required", type=int, help="Shards that must be present (N, default M)")
+    shards_parser.add_argument("--timeout", type=int, default=300, help="Timeout in seconds")
+    
+    # Watch command
+    watch_parser = subparsers.add_parser("watch", help="Stream checkpoint events as NDJSON until interrupted")
+    watch_parser.add_argument("--since", nargs="?", const="0", metavar="WHEN",
+                              help="Replay existing checkpoints first (all, or those modified since "
+                                   "an epoch time or ISO date)")
     
     # List command
     subparsers.add_parser("list", help="List all checkpoints")
@@ -212,14 +1094,81 @@ def main():
     # Info command
     subparsers.add_parser("info", help="Get run information")
     
+    # Stats command
+    stats_parser = subparsers.add_parser("stats", help="Show cumulative wait statistics for this role")
+    stats_parser.add_argument("--prometheus", action="store_true", help="Print in Prometheus text format")
+    
+    # Reindex command
+    subparsers.add_parser("reindex", help="Rebuild the checkpoint index from disk")
+    
     args = parser.parse_args()
     
+    # Hand create, list and wait to a running broker; without one, work on disk
+    if args.command in ("create", "list", "wait") and not args.no_broker:
+        from broker_client import connect
+        client = connect()
+        if client is not None:
+            with client:
+                _run_via_broker(args, client)
+            return
+    
     # Create monitor instance
-    monitor = CheckpointMonitor(args.feature, args.role)
+    monitor = CheckpointMonitor(args.feature, args.role, args.log_format, args.watch_mode, args.fast_poll)
     
+    with instrumented("monitor_checkpoints", monitor.log_file.parent, args.trace, args.profile):
+        _run_command(parser, args, monitor)
+
+
+def _run_via_broker(args: argparse.Namespace, client) -> None:
+    """Execute create, list or wait through a checkpoint broker, printing what the disk path prints"""
+    try:
+        if args.command == "create":
+            shard = shards = None
+            if args.shard:
+                try:
+                    shard, shards = (int(part) for part in args.shard.split("/"))
+                except ValueError as e:
+                    print(f"Error: Invalid --shard {args.shard} ({e})", file=sys.stderr)
+                    sys.exit(1)
+            reply = client.request("create", feature=args.feature, role=args.role, name=args.name,
+                                   content=args.content, shard=shard, shards=shards)
+            print(f"Created checkpoint: {Path(reply['path']).name}")
+        
+        elif args.command == "list":
+            checkpoints = client.request("list", feature=args.feature, role=args.role)["checkpoints"]
+            if checkpoints:
+                print("Checkpoints:")
+                for cp in checkpoints:
+                    print(f"  - {cp}")
+            else:
+                print("No checkpoints found")
+        
+        elif args.command == "wait":
+            reply = client.request("wait", feature=args.feature, role=args.role, pattern=args.pattern,
+                                   timeout=args.timeout)
+            checkpoint_file = Path(reply["path"])
+            if args.header_only:
+                info: Dict[str, Any] = {"name": checkpoint_file.name, "path": str(checkpoint_file),
+                                        "size": checkpoint_file.stat().st_size}
+                info.update(read_checkpoint_header(checkpoint_file))
+                print(json.dumps(info))
+                return
+            print(f"Found checkpoint matching {args.pattern}")
+            print("-" * 40)
+            print(checkpoint_file.read_text())
+    except (RuntimeError, ConnectionError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _run_command(parser: argparse.ArgumentParser, args: argparse.Namespace, monitor: CheckpointMonitor):
+    """Execute the parsed command-line command"""
     # Execute command
     if args.command == "wait":
         try:
+            if args.header_only:
+                print(json.dumps(monitor.wait_for_checkpoint_header(args.pattern, args.timeout)))
+                return
             content = monitor.wait_for_checkpoint(args.pattern, args.timeout)
             print(f"Found checkpoint matching {args.pattern}")
             print("-" * 40)
@@ -228,9 +1177,43 @@ def main():
             print(f"Error: {e}", file=sys.stderr)
             sys.exit(1)
     
+    elif args.command == "watch":
+        since = None
+        if args.since is not None:
+            try:
+                since = float(args.since)
+            except ValueError:
+                from metrics_query import parse_iso
+                try:
+                    since = parse_iso(args.since).timestamp()
+                except ValueError:
+                    print(f"Error: Invalid --since value: {args.since}", file=sys.stderr)
+                    sys.exit(1)
+        try:
+            for event in monitor.watch_checkpoints(since):
+                print(json.dumps(event), flush=True)
+        except (KeyboardInterrupt, BrokenPipeError):
+            pass
+    
     elif args.command == "create":
-        monitor.create_checkpoint(args.name, args.content)
-        print(f"Created checkpoint: {args.name}")
+        if args.shard:
+            try:
+                shard, shards = (int(part) for part in args.shard.split("/"))
+                checkpoint_path = monitor.create_checkpoint(args.name, args.content, shard=shard, shards=shards)
+            except ValueError as e:
+                print(f"Error: Invalid --shard {args.shard} ({e})", file=sys.stderr)
+                sys.exit(1)
+        else:
+            checkpoint_path = monitor.create_checkpoint(args.name, args.content)
+        print(f"Created checkpoint: {checkpoint_path.name}")
+    
+    elif args.command == "wait-shards":
+        try:
+            for path in monitor.wait_for_shards(args.name, args.shards, args.required, args.timeout):
+                print(path)
+        except (ValueError, ShardTimeoutError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
     
     elif args.command == "list":
         checkpoints = monitor.list_checkpoints()
@@ -245,6 +1228,16 @@ def main():
         info = monitor.get_run_info()
         print(json.dumps(info, indent=2))
     
+    elif args.command == "stats":
+        if args.prometheus:
+            print(monitor.stats.prometheus(), end="")
+        else:
+            print(json.dumps(monitor.stats.load(), indent=2))
+    
+    elif args.command == "reindex":
+        count = monitor.reindex()
+        print(f"Indexed {count} checkpoints for {args.feature}")
+    
     else:
         parser.print_help()
 
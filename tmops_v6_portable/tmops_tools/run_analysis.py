@@ -0,0 +1,346 @@
+# tmops_tools/run_analysis.py
+# Where a run's wall-clock time went: phase durations, role busy/wait time, handoffs and the critical path
+
+import re
+import json
+import math
+from fnmatch import fnmatchcase
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+
+from checkpoint_index import checkpoint_phase, shard_pattern, parse_shard_name
+from metrics_query import PHASES, parse_timestamp, phase_durations
+
+# Text log lines: "[2025-01-19 10:00:00.123] [INFO] message"
+_TEXT_LINE = re.compile(r'^\[([^\]]+)\] \[(\w+)\] (.*)$')
+
+# Messages written by CheckpointMonitor / AsyncCheckpointMonitor, for logs in text format
+_TEXT_EVENTS = [
+    ("wait_start", re.compile(r'^Waiting for checkpoint matching: (?P<pattern>.+)$')),
+    ("checkpoint_found", re.compile(r'^Found checkpoint: (?P<checkpoint>.+)$')),
+    ("shards_found", re.compile(r'^Found \d+/(?P<shards>\d+) shards of (?P<checkpoint>.+)$')),
+    ("wait_timeout", re.compile(r'^Timeout: (?:No|Only \d+) checkpoints? matching (?P<pattern>.+) after [\d.]+s$')),
+    ("checkpoint_created", re.compile(r'^Created checkpoint: (?P<checkpoint>.+)$')),
+]
+_WAIT_END_EVENTS = ("checkpoint_found", "shards_found", "wait_timeout")
+
+
+def _unsharded(name: str) -> str:
+    """The checkpoint a shard belongs to (shards are merged into one timeline entry)"""
+    parsed = parse_shard_name(name)
+    return parsed[0] if parsed else name
+
+
+def parse_log_line(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse one role log line (text or NDJSON format)
+
+    Args:
+        line: The line, with or without its newline
+
+    Returns:
+        Dict with time (epoch seconds), event and, where known, pattern and checkpoint;
+        event is "message" for lines that are not wait/handoff events. None if unparseable
+    """
+    line = line.strip()
+    if line.startswith("{"):
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return None
+        time = parse_timestamp(entry.get("timestamp"))
+        if math.isnan(time):
+            return None
+        event = {"time": time, "event": entry.get("event", "message")}
+        for key in ("pattern", "checkpoint"):
+            if entry.get(key):
+                event[key] = entry[key]
+        if event["event"] == "shards_found" and entry.get("checkpoints"):
+            event["checkpoint"] = _unsharded(entry["checkpoints"][-1])
+        return event
+
+    match = _TEXT_LINE.match(line)
+    if not match:
+        return None
+    time = parse_timestamp(match.group(1))
+    if math.isnan(time):
+        return None
+    message = match.group(3)
+    for name, pattern in _TEXT_EVENTS:
+        found = pattern.match(message)
+        if found:
+            event = {"time": time, "event": name}
+            event.update({k: v for k, v in found.groupdict().items() if k != "shards"})
+            if name == "shards_found":
+                event["pattern"] = shard_pattern(found.group("checkpoint"), int(found.group("shards")))
+            return event
+    return {"time": time, "event": "message"}
+
+
+def parse_role_log(lines: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    Parse a role's log into events, in time order
+
+    Args:
+        lines: Log lines (rotated files first, oldest to newest)
+
+    Returns:
+        Results of parse_log_line, skipping unparseable lines
+    """
+    events = [event for event in map(parse_log_line, lines) if event]
+    events.sort(key=lambda e: e["time"])
+    return events
+
+
+def wait_intervals(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Pair each wait_start with the event that ended it
+
+    A found checkpoint ends the oldest open wait whose pattern matches it, so
+    interleaved waits (async monitor, several processes of one role) pair up.
+
+    Args:
+        events: Result of parse_role_log
+
+    Returns:
+        Waits with pattern, start, end, seconds, outcome (found, timeout or open) and checkpoint
+    """
+    open_waits: List[Dict[str, Any]] = []
+    waits = []
+    for event in events:
+        if event["event"] == "wait_start":
+            wait = {"pattern": event.get("pattern", ""), "start": event["time"], "end": None,
+                    "outcome": "open", "checkpoint": None}
+            open_waits.append(wait)
+            waits.append(wait)
+        elif event["event"] in _WAIT_END_EVENTS:
+            if event["event"] == "checkpoint_found" and event.get("checkpoint"):
+                ended = [w for w in open_waits if fnmatchcase(event["checkpoint"], w["pattern"])][:1]
+            elif event.get("pattern") is not None:
+                ended = [w for w in open_waits if w["pattern"] == event["pattern"]][:1]
+            else:
+                # The async monitor logs one timeout, without a pattern, for everything it waited on
+                ended = list(open_waits) if event["event"] == "wait_timeout" else []
+            for wait in ended:
+                wait["end"] = event["time"]
+                wait["outcome"] = "timeout" if event["event"] == "wait_timeout" else "found"
+                wait["checkpoint"] = event.get("checkpoint")
+                open_waits.remove(wait)
+
+    for wait in waits:
+        wait["seconds"] = None if wait["end"] is None else wait["end"] - wait["start"]
+    return waits
+
+
+def _merged_seconds(intervals: List[Tuple[float, float]]) -> float:
+    """Total length of possibly overlapping intervals"""
+    total = 0.0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def _iso(value: Optional[float]) -> Optional[str]:
+    """Epoch seconds as an ISO 8601 local time (None stays None)"""
+    if value is None or math.isnan(value):
+        return None
+    return datetime.fromtimestamp(value).isoformat(timespec="milliseconds")
+
+
+def _seconds(value: Optional[float]) -> Optional[float]:
+    """Round a duration for output"""
+    return None if value is None or math.isnan(value) else round(value, 3)
+
+
+def analyze_run(timeline: List[Dict[str, Any]], role_logs: Dict[str, Iterable[str]]) -> Dict[str, Any]:
+    """
+    Analyze where a run's wall-clock time went
+
+    Args:
+        timeline: The run's metrics timeline (checkpoint and timestamp per entry, in name order)
+        role_logs: Log lines per role (e.g. from logs/<role>.log)
+
+    Returns:
+        Dict with phases, roles, handoffs and critical_path (times as ISO strings, durations in seconds)
+    """
+    role_events = {role: parse_role_log(lines) for role, lines in role_logs.items()}
+
+    # Log times (ms) are more precise than checkpoint headers (s); prefer the creator's log entry.
+    # A sharded checkpoint is complete when its last shard is written
+    created: Dict[str, Tuple[float, str]] = {}
+    created_files: Dict[str, Tuple[float, str]] = {}
+    for role, events in role_events.items():
+        for event in events:
+            if event["event"] == "checkpoint_created" and event.get("checkpoint"):
+                created_files.setdefault(event["checkpoint"], (event["time"], role))
+                name = _unsharded(event["checkpoint"])
+                if name not in created or (name != event["checkpoint"] and event["time"] > created[name][0]):
+                    created[name] = (event["time"], role)
+
+    checkpoints = []
+    for entry in timeline:
+        name = entry["checkpoint"]
+        time, creator = created.get(name, (parse_timestamp(entry["timestamp"]), None))
+        checkpoints.append({"checkpoint": name, "phase": checkpoint_phase(name), "time": time, "from": creator})
+
+    # Phases
+    durations = phase_durations([{"checkpoint": c["checkpoint"], "timestamp": _iso(c["time"])} for c in checkpoints])
+    phases = {}
+    for phase in PHASES:
+        times = [c["time"] for c in checkpoints if c["phase"] == phase and not math.isnan(c["time"])]
+        if times:
+            # Like phase_durations, a phase starts at the checkpoint that triggered it
+            duration = durations.get(f"duration_{phase}")
+            start = max(times) - duration if duration is not None else min(times)
+            phases[phase] = {"start": _iso(start), "end": _iso(max(times)), "duration_seconds": _seconds(duration)}
+
+    # Roles
+    by_name = {c["checkpoint"]: c for c in checkpoints}
+    roles = {}
+    handoffs = []
+    noticed: Dict[str, List[Tuple[float, str]]] = {}
+    for role, events in sorted(role_events.items()):
+        if not events:
+            continue
+        waits = wait_intervals(events)
+        first, last = events[0]["time"], events[-1]["time"]
+        waiting = _merged_seconds([(w["start"], w["end"] if w["end"] is not None else last) for w in waits])
+        active = last - first
+        roles[role] = {
+            "first_seen": _iso(first),
+            "last_seen": _iso(last),
+            "active_seconds": _seconds(active),
+            "waiting_seconds": _seconds(waiting),
+            "busy_seconds": _seconds(max(active - waiting, 0.0)),
+            "waits": [{"pattern": w["pattern"], "start": _iso(w["start"]), "end": _iso(w["end"]),
+                       "seconds": _seconds(w["seconds"]), "outcome": w["outcome"], "checkpoint": w["checkpoint"]}
+                      for w in waits],
+        }
+        for wait in waits:
+            if wait["outcome"] == "found" and wait["checkpoint"]:
+                noticed.setdefault(wait["checkpoint"], []).append((wait["end"], role))
+
+    # Handoffs: checkpoint (or shard) written -> a waiting role noticed it
+    for name, receivers in sorted(noticed.items()):
+        checkpoint = by_name.get(name)
+        time_created, creator = created_files.get(name) or (
+            (checkpoint["time"], checkpoint["from"]) if checkpoint else (math.nan, None))
+        if math.isnan(time_created):
+            continue
+        for time, role in sorted(receivers):
+            handoffs.append({"checkpoint": name, "from": creator, "to": role,
+                             "created": _iso(time_created), "noticed": _iso(time),
+                             "latency_seconds": _seconds(max(time - time_created, 0.0))})
+
+    merged_noticed: Dict[str, List[Tuple[float, str]]] = {}
+    for name, receivers in noticed.items():
+        merged_noticed.setdefault(_unsharded(name), []).extend(receivers)
+
+    return {
+        "phases": phases,
+        "roles": roles,
+        "handoffs": handoffs,
+        "critical_path": critical_path(checkpoints, merged_noticed),
+    }
+
+
+def critical_path(checkpoints: List[Dict[str, Any]],
+                  noticed: Optional[Dict[str, List[Tuple[float, str]]]] = None) -> Dict[str, Any]:
+    """
+    Chain of checkpoint-to-checkpoint segments from the first to the last checkpoint
+
+    The pipeline is a chain of handoffs, so each segment ends at a checkpoint and
+    starts at the one before it in time. Sharded checkpoints are merged upstream,
+    so only the last shard to finish lies on the path. Where the creator's log
+    shows when it noticed the previous checkpoint, the segment is split into
+    handoff (detection) and work time.
+
+    Args:
+        checkpoints: Dicts with checkpoint, phase, time (epoch) and from (creating role or None)
+        noticed: Checkpoint name -> [(time, role)] of waits that found it
+
+    Returns:
+        Dict with segments, total_seconds and bottleneck_phase
+    """
+    noticed = noticed or {}
+    ordered = sorted((c for c in checkpoints if not math.isnan(c["time"])), key=lambda c: c["time"])
+    segments = []
+    per_phase: Dict[str, float] = {}
+    for previous, checkpoint in zip(ordered, ordered[1:]):
+        duration = checkpoint["time"] - previous["time"]
+        segment = {"checkpoint": checkpoint["checkpoint"], "phase": checkpoint["phase"], "from": checkpoint["from"],
+                   "start": _iso(previous["time"]), "end": _iso(checkpoint["time"]),
+                   "duration_seconds": _seconds(duration), "handoff_seconds": None, "work_seconds": None}
+        # The creator logs "Created" after writing, so a fast waiter can log "Found" a little earlier
+        seen = [time for time, role in noticed.get(previous["checkpoint"], [])
+                if role == checkpoint["from"] and time <= checkpoint["time"]]
+        if seen:
+            noticed_at = max(min(seen), previous["time"])
+            segment["handoff_seconds"] = _seconds(noticed_at - previous["time"])
+            segment["work_seconds"] = _seconds(checkpoint["time"] - noticed_at)
+        segments.append(segment)
+        if checkpoint["phase"]:
+            per_phase[checkpoint["phase"]] = per_phase.get(checkpoint["phase"], 0.0) + duration
+
+    total = ordered[-1]["time"] - ordered[0]["time"] if ordered else None
+    return {
+        "segments": segments,
+        "total_seconds": _seconds(total),
+        "bottleneck_phase": max(per_phase, key=per_phase.get) if per_phase else None,
+    }
+
+
+def format_analysis(analysis: Dict[str, Any]) -> List[str]:
+    """
+    Render an analysis as Markdown report lines
+
+    Args:
+        analysis: Result of analyze_run
+
+    Returns:
+        Report lines (joined with newlines by the caller)
+    """
+    def fmt(value: Optional[float]) -> str:
+        return "N/A" if value is None else f"{value:.1f}s"
+
+    lines = ["\n## Pipeline Analysis"]
+    path = analysis["critical_path"]
+    lines.append(f"\n**Critical path:** {fmt(path['total_seconds'])}"
+                 + (f" (bottleneck: {path['bottleneck_phase']})" if path["bottleneck_phase"] else ""))
+
+    if analysis["phases"]:
+        lines.append("\n| Phase | Start | End | Duration |")
+        lines.append("|-------|-------|-----|----------|")
+        for phase, info in analysis["phases"].items():
+            lines.append(f"| {phase} | {info['start']} | {info['end']} | {fmt(info['duration_seconds'])} |")
+
+    if analysis["roles"]:
+        lines.append("\n| Role | Active | Busy | Waiting | Waits |")
+        lines.append("|------|--------|------|---------|-------|")
+        for role, info in analysis["roles"].items():
+            lines.append(f"| {role} | {fmt(info['active_seconds'])} | {fmt(info['busy_seconds'])} | "
+                         f"{fmt(info['waiting_seconds'])} | {len(info['waits'])} |")
+
+    if analysis["handoffs"]:
+        lines.append("\n### Handoffs")
+        for handoff in analysis["handoffs"]:
+            source = f" from {handoff['from']}" if handoff["from"] else ""
+            lines.append(f"- **{handoff['checkpoint']}**{source} -> {handoff['to']}: "
+                         f"{fmt(handoff['latency_seconds'])}")
+
+    if path["segments"]:
+        lines.append("\n### Critical Path")
+        for segment in path["segments"]:
+            split = ""
+            if segment["handoff_seconds"] is not None:
+                split = f" (handoff {fmt(segment['handoff_seconds'])}, work {fmt(segment['work_seconds'])})"
+            lines.append(f"- {segment['checkpoint']}: {fmt(segment['duration_seconds'])}{split}")
+    return lines
@@ -21,12 +21,15 @@ Commands:
   clear [--what checkpoints|logs|both] \
         [--desc "reason"]              Archive current run artifacts and clear
   switch --name <run>                   Switch current to an existing run
+  gc [--keep-runs N] [--max-age DAYS] \
+     [--max-bytes SIZE] [--dry-run]     Prune old runs/archives, rotate logs, pack archives
 
 Examples:
   $0 data-enrichment list
   $0 data-enrichment new --name cycle-20251002-1145 --spec new
   $0 data-enrichment clear --what both --desc "Reset after bugfix"
   $0 data-enrichment switch --name cycle-20251002-1145
+  $0 data-enrichment gc --keep-runs 5 --max-age 30 --dry-run
 EOF
 }
 
@@ -145,7 +148,8 @@ EOF
       source_spec="$RUNS_DIR/$from_ref/TASK_SPEC.md"
     fi
     if [[ -n "$source_spec" && -f "$source_spec" ]]; then
-      cp "$source_spec" "$spec_path"
+      # Reflinked where the filesystem supports it; the spec stays editable either way
+      snapshot_tree copy "$source_spec" "$spec_path"
     else
       # fallback to new
       cat > "$spec_path" << EOF
@@ -199,19 +203,16 @@ cmd_clear() {
   archive_dir="$(archive_path_for "$cur")"
   mkdir -p "$archive_dir"
 
-  # Archive and clear selected artifacts
+  # Archive and clear selected artifacts (files are renamed, not copied, so this is
+  # independent of their size; the directories stay for running monitors)
   if [[ "$what" == "checkpoints" || "$what" == "both" ]]; then
     if [[ -d "$cur_dir/checkpoints" ]]; then
-      mkdir -p "$archive_dir/checkpoints"
-      cp -r "$cur_dir/checkpoints/"* "$archive_dir/checkpoints/" 2>/dev/null || true
-      rm -f "$cur_dir/checkpoints/"* 2>/dev/null || true
+      snapshot_tree move "$cur_dir/checkpoints" "$archive_dir/checkpoints"
     fi
   fi
   if [[ "$what" == "logs" || "$what" == "both" ]]; then
     if [[ -d "$cur_dir/logs" ]]; then
-      mkdir -p "$archive_dir/logs"
-      cp -r "$cur_dir/logs/"* "$archive_dir/logs/" 2>/dev/null || true
-      rm -f "$cur_dir/logs/"* 2>/dev/null || true
+      snapshot_tree move "$cur_dir/logs" "$archive_dir/logs"
     fi
   fi
 
@@ -223,6 +224,12 @@ cmd_clear() {
     echo "ARCHIVED=$(date -u +"%Y-%m-%dT%H:%M:%SZ")"
   } > "$archive_dir/ARCHIVE_META.txt"
 
+  # One indexed file per archived run instead of many small ones
+  pack_archived_runs "$archive_dir"
+  if [[ -f "$archive_dir.tmpack" ]]; then
+    archive_dir="$archive_dir.tmpack"
+  fi
+
   log_success "Archived and cleared: $what for run $cur"
   echo "Archive: $archive_dir"
 }
@@ -252,11 +259,18 @@ cmd_switch() {
   log_success "Switched current run → $name"
 }
 
+cmd_gc() {
+  shift 2 || true
+  # tmops_gc.py takes the run-manager lock itself and skips the feature if it is held
+  python3 "$SCRIPT_DIR/tmops_gc.py" --tmops-dir "$TMOPS_DIR" "$FEATURE" "$@" || error_exit "Garbage collection failed for $FEATURE"
+}
+
 case "$SUBCMD" in
   list)   cmd_list ;;
   new)    cmd_new "$@" ;;
   clear)  cmd_clear "$@" ;;
   switch) cmd_switch "$@" ;;
+  gc)     cmd_gc "$@" ;;
   *) usage; exit 1 ;;
 esac
 
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+# tmops_tools/run_pack.py
+# Pack archived run directories into one indexed SQLite file and read members without unpacking
+
+import io
+import os
+import sys
+import stat
+import shutil
+import hashlib
+import sqlite3
+import argparse
+from datetime import datetime
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple
+
+PACK_SUFFIX = ".tmpack"
+PACK_FORMAT_VERSION = 2
+CHUNK_BYTES = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE files (
+    path TEXT PRIMARY KEY,
+    mode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    data BLOB
+);
+CREATE TABLE chunks (
+    path TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (path, seq)
+);
+"""
+
+
+def is_pack(path: Path) -> bool:
+    """True if path is a packed run file"""
+    return path.suffix == PACK_SUFFIX and path.is_file()
+
+
+def pack_path_for(run_dir: Path) -> Path:
+    """The pack file a run directory is packed into (<run_dir>.tmpack)"""
+    return run_dir.with_name(run_dir.name + PACK_SUFFIX)
+
+
+def run_name(run_dir: Path) -> str:
+    """Run name of a run directory or pack (pack suffix removed)"""
+    return run_dir.name[:-len(PACK_SUFFIX)] if run_dir.name.endswith(PACK_SUFFIX) else run_dir.name
+
+
+def pack_run(run_dir: Path, remove: bool = True) -> Path:
+    """
+    Pack a run directory into <run_dir>.tmpack
+
+    Files are streamed into the pack in chunks of CHUNK_BYTES: the first chunk is
+    stored with the file's row, any further ones in the chunks table, so memory
+    stays bounded for large checkpoints. The pack is written under a temporary
+    name, checked, and only then renamed into place; the directory is removed last.
+
+    Args:
+        run_dir: Run directory (e.g. .tmops/<feature>/.archive/<ts>-<run>)
+        remove: Delete the directory once the pack is in place
+
+    Returns:
+        Path of the pack
+
+    Raises:
+        ValueError: If run_dir is not a directory or its pack already exists
+    """
+    run_dir = Path(run_dir)
+    if run_dir.is_symlink() or not run_dir.is_dir():
+        raise ValueError(f"Not a run directory: {run_dir}")
+    pack_path = pack_path_for(run_dir)
+    if pack_path.exists():
+        raise ValueError(f"Pack already exists: {pack_path}")
+
+    tmp_path = pack_path.with_name(f"{pack_path.name}.{os.getpid()}.tmp")
+    _unlink(tmp_path)
+    db = sqlite3.connect(str(tmp_path), isolation_level=None)
+    files = total = 0
+    try:
+        db.execute("PRAGMA journal_mode=OFF")
+        db.execute("PRAGMA synchronous=OFF")
+        db.executescript(_SCHEMA)
+        db.execute("BEGIN")
+        for root, dirs, names in os.walk(run_dir):
+            dirs.sort()
+            rel_root = Path(root).relative_to(run_dir)
+            for name in dirs:
+                st = os.lstat(os.path.join(root, name))
+                if stat.S_ISDIR(st.st_mode):
+                    # Kept so empty directories (e.g. logs/) come back on unpack
+                    db.execute("INSERT INTO files VALUES (?, ?, 0, ?, NULL)",
+                               ((rel_root / name).as_posix(), st.st_mode, st.st_mtime_ns))
+            for name in sorted(names):
+                path = os.path.join(root, name)
+                st = os.lstat(path)
+                if not stat.S_ISREG(st.st_mode):
+                    continue
+                member = (rel_root / name).as_posix()
+                with open(path, "rb") as f:
+                    db.execute("INSERT INTO files VALUES (?, ?, ?, ?, ?)",
+                               (member, st.st_mode, st.st_size, st.st_mtime_ns, f.read(CHUNK_BYTES)))
+                    seq = 1
+                    while True:
+                        chunk = f.read(CHUNK_BYTES)
+                        if not chunk:
+                            break
+                        db.execute("INSERT INTO chunks VALUES (?, ?, ?)", (member, seq, chunk))
+                        seq += 1
+                files += 1
+                total += st.st_size
+        meta = {"format_version": PACK_FORMAT_VERSION, "run": run_dir.name,
+                "packed_at": datetime.now().isoformat(), "files": files, "bytes": total}
+        db.executemany("INSERT INTO meta VALUES (?, ?)", [(k, str(v)) for k, v in meta.items()])
+        db.execute("COMMIT")
+        packed_files, packed_bytes = db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length(data)), 0) + (SELECT COALESCE(SUM(length(data)), 0) FROM chunks) "
+            "FROM files WHERE data IS NOT NULL").fetchone()
+    except BaseException:
+        db.close()
+        _unlink(tmp_path)
+        raise
+    db.close()
+
+    if (packed_files, packed_bytes) != (files, total):
+        _unlink(tmp_path)
+        raise OSError(f"Pack check failed for {run_dir}: {packed_files}/{files} files, "
+                      f"{packed_bytes}/{total} bytes")
+
+    with open(tmp_path, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, pack_path)
+    if remove:
+        shutil.rmtree(run_dir)
+    return pack_path
+
+
+def unpack_run(pack_path: Path, dest: Optional[Path] = None) -> Path:
+    """
+    Restore a packed run as a directory
+
+    Args:
+        pack_path: The .tmpack file
+        dest: Target directory (default: the pack path without its suffix)
+
+    Returns:
+        The restored directory
+
+    Raises:
+        ValueError: If the target already exists
+    """
+    pack_path = Path(pack_path)
+    dest = Path(dest) if dest else pack_path.with_name(run_name(pack_path))
+    if dest.exists():
+        raise ValueError(f"Target already exists: {dest}")
+
+    with RunPack(pack_path) as pack:
+        dest.mkdir(parents=True)
+        entries = pack.entries()
+        for member, (mode, _, _) in entries.items():
+            target = dest / member
+            if stat.S_ISDIR(mode):
+                target.mkdir(parents=True, exist_ok=True)
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with pack.open(member) as src, open(target, "wb") as out:
+                shutil.copyfileobj(src, out, CHUNK_BYTES)
+            os.chmod(target, stat.S_IMODE(mode))
+        # Directory mtimes last, since filling them changes them
+        for member, (mode, _, mtime_ns) in sorted(entries.items(), reverse=True):
+            os.utime(dest / member, ns=(mtime_ns, mtime_ns))
+    return dest
+
+
+def _unlink(path: Path):
+    """Remove a file if it exists"""
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class _ChunkReader(io.RawIOBase):
+    """Raw binary stream over a packed file's chunks, for io.BufferedReader/TextIOWrapper
+
+    Chunks are fetched one query at a time, so at most one chunk is held in memory.
+    """
+
+    def __init__(self, db: sqlite3.Connection, member: str, first: bytes):
+        self._db = db
+        self._member = member
+        self._chunk = first
+        self._offset = 0
+        self._seq = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while self._offset >= len(self._chunk):
+            if self._seq is None:
+                return 0
+            self._seq += 1
+            row = self._db.execute("SELECT data FROM chunks WHERE path = ? AND seq = ?",
+                                   (self._member, self._seq)).fetchone()
+            if row is None:
+                self._seq = None
+                return 0
+            self._chunk, self._offset = row[0], 0
+        data = self._chunk[self._offset:self._offset + len(buffer)]
+        buffer[:len(data)] = data
+        self._offset += len(data)
+        return len(data)
+
+
+class RunPack:
+    """Read-only access to a packed run; members are addressed by relative path"""
+
+    def __init__(self, path: Path):
+        """
+        Open a pack
+
+        Args:
+            path: The .tmpack file
+
+        Raises:
+            ValueError: If the file is not a supported pack
+        """
+        self.path = Path(path)
+        # Packs never change once renamed into place
+        uri = self.path.resolve().as_uri() + "?mode=ro&immutable=1"
+        try:
+            self.db = sqlite3.connect(uri, uri=True)
+            self.meta = dict(self.db.execute("SELECT key, value FROM meta"))
+        except sqlite3.Error as e:
+            raise ValueError(f"Not a run pack: {self.path} ({e})") from None
+        if self.meta.get("format_version") != str(PACK_FORMAT_VERSION):
+            self.db.close()
+            raise ValueError(f"Unsupported pack format {self.meta.get('format_version')}: {self.path}")
+
+    def __enter__(self) -> "RunPack":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Close the pack"""
+        self.db.close()
+
+    def entries(self) -> Dict[str, Tuple[int, int, int]]:
+        """
+        Every member, directories included
+
+        Returns:
+            (mode, size, mtime_ns) keyed by relative path, in path order
+        """
+        return {row[0]: row[1:] for row in self.db.execute(
+            "SELECT path, mode, size, mtime_ns FROM files ORDER BY path")}
+
+    def names(self, directory: str = "", pattern: str = "*") -> List[str]:
+        """
+        Names of the files directly inside a directory of the run
+
+        Args:
+            directory: Relative directory, e.g. "checkpoints" ("" for the run root)
+            pattern: Glob the names must match
+
+        Returns:
+            Sorted file names
+        """
+        prefix = f"{directory.strip('/')}/" if directory.strip("/") else ""
+        names = []
+        for (path,) in self.db.execute("SELECT path FROM files WHERE data IS NOT NULL AND substr(path, 1, ?) = ?",
+                                       (len(prefix), prefix)):
+            name = path[len(prefix):]
+            if "/" not in name and fnmatch(name, pattern):
+                names.append(name)
+        return sorted(names)
+
+    def stat(self, member: str) -> Optional[Tuple[int, int]]:
+        """
+        Size and mtime of a file as it was when packed
+
+        Args:
+            member: Relative path, e.g. "checkpoints/001-discovery-trigger.md"
+
+        Returns:
+            (size, mtime_ns), or None if there is no such file
+        """
+        row = self.db.execute("SELECT size, mtime_ns FROM files WHERE path = ? AND data IS NOT NULL",
+                              (member,)).fetchone()
+        return tuple(row) if row else None
+
+    def open(self, member: str) -> io.BufferedReader:
+        """
+        Stream a file's bytes without loading it whole
+
+        Args:
+            member: Relative path
+
+        Returns:
+            A binary file object
+
+        Raises:
+            FileNotFoundError: If there is no such file
+        """
+        row = self.db.execute("SELECT data FROM files WHERE path = ? AND data IS NOT NULL", (member,)).fetchone()
+        if not row:
+            raise FileNotFoundError(f"{self.path}: no member {member}")
+        return io.BufferedReader(_ChunkReader(self.db, member, row[0]), CHUNK_BYTES)
+
+    def read_bytes(self, member: str, max_bytes: Optional[int] = None) -> Optional[bytes]:
+        """
+        Read a file's bytes
+
+        Args:
+            member: Relative path
+            max_bytes: Read at most this many bytes (None reads the whole file)
+
+        Returns:
+            The bytes, or None if there is no such file
+        """
+        try:
+            with self.open(member) as f:
+                return f.read() if max_bytes is None else f.read(max_bytes)
+        except FileNotFoundError:
+            return None
+
+    def read_text(self, member: str, max_bytes: Optional[int] = None) -> Optional[str]:
+        """
+        Read a file as text with the same newline handling as Path.read_text()
+
+        Args:
+            member: Relative path
+            max_bytes: Read at most this many bytes; a cut multi-byte character is replaced
+
+        Returns:
+            The text, or None if there is no such file
+        """
+        data = self.read_bytes(member, max_bytes)
+        if data is None:
+            return None
+        text = data.decode() if max_bytes is None else data.decode(errors="replace")
+        return text.replace("\r\n", "\n").replace("\r", "\n")
+
+    def digest(self, member: str) -> str:
+        """
+        SHA-256 of a file, hashed in chunks
+
+        Args:
+            member: Relative path
+
+        Returns:
+            Hex digest
+        """
+        digest = hashlib.sha256()
+        with self.open(member) as f:
+            for chunk in iter(lambda: f.read(CHUNK_BYTES), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+
+def main():
+    """Command-line interface for run packs"""
+    parser = argparse.ArgumentParser(description="Pack archived TeamOps runs into single indexed files")
+
+    subparsers = parser.add_subparsers(dest="command", help="Command to execute")
+
+    pack_parser = subparsers.add_parser("pack", help="Pack run directories into <dir>.tmpack")
+    pack_parser.add_argument("run_dirs", nargs="+", help="Run directories to pack")
+    pack_parser.add_argument("--keep", action="store_true", help="Keep the directories after packing")
+
+    unpack_parser = subparsers.add_parser("unpack", help="Restore a pack as a directory")
+    unpack_parser.add_argument("pack", help="Pack file")
+    unpack_parser.add_argument("--dest", help="Target directory (default: pack path without .tmpack)")
+
+    list_parser = subparsers.add_parser("list", help="List the files in a pack")
+    list_parser.add_argument("pack", help="Pack file")
+
+    cat_parser = subparsers.add_parser("cat", help="Print one file from a pack")
+    cat_parser.add_argument("pack", help="Pack file")
+    cat_parser.add_argument("member", help="Relative path, e.g. checkpoints/001-discovery-trigger.md")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "pack":
+            for run_dir in args.run_dirs:
+                print(f"Packed: {pack_run(Path(run_dir), remove=not args.keep)}")
+        elif args.command == "unpack":
+            print(f"Unpacked: {unpack_run(Path(args.pack), Path(args.dest) if args.dest else None)}")
+        elif args.command == "list":
+            with RunPack(Path(args.pack)) as pack:
+                for member, (mode, size, _) in pack.entries().items():
+                    if not stat.S_ISDIR(mode):
+                        print(f"{size:>12}  {member}")
+        elif args.command == "cat":
+            with RunPack(Path(args.pack)) as pack, pack.open(args.member) as f:
+                shutil.copyfileobj(f, sys.stdout.buffer, CHUNK_BYTES)
+        else:
+            parser.print_help()
+    except (ValueError, OSError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
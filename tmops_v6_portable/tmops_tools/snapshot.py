@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# tmops_tools/snapshot.py
+# Copy-on-write snapshots of run trees: reflinks, hardlinks for immutable checkpoints, content-hash dedup
+
+import os
+import sys
+import errno
+import fcntl
+import shutil
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Dict, Tuple
+
+# ioctl(dst, FICLONE, src) from linux/fs.h: share all extents of src (btrfs, XFS, bcachefs, ...)
+FICLONE = 0x40049409
+
+# Checkpoints (and their sidecars) are written to a temp file and renamed into
+# place, never rewritten, so a hardlink to one is as good as a copy
+IMMUTABLE_DIRS = ("checkpoints",)
+
+# Only files up to this size are hashed for dedup, so snapshots of runs with
+# large logs don't have to read them
+DEDUP_MAX_BYTES = 1024 * 1024
+HASH_CHUNK_BYTES = 1024 * 1024
+
+METHODS = ("reflink", "hardlink", "dedup", "copy", "move")
+
+
+def reflink(src: Path, dst: Path) -> bool:
+    """
+    Create dst as a copy-on-write clone of src
+
+    Args:
+        src: Existing file
+        dst: New file (must not exist)
+
+    Returns:
+        True if cloned; False if the filesystem or platform can't (dst is not left behind)
+    """
+    try:
+        src_fd = os.open(src, os.O_RDONLY)
+    except OSError:
+        return False
+    try:
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except OSError:
+        os.close(src_fd)
+        return False
+    try:
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+        cloned = True
+    except OSError:
+        cloned = False
+    finally:
+        os.close(dst_fd)
+        os.close(src_fd)
+    if cloned:
+        shutil.copystat(src, dst)
+    else:
+        os.unlink(dst)
+    return cloned
+
+
+def is_immutable(relative: Path) -> bool:
+    """Whether a file (path relative to the snapshot root) lives in a write-once directory"""
+    return any(part in IMMUTABLE_DIRS for part in relative.parent.parts)
+
+
+class Snapshotter:
+    """Copies and moves files with the cheapest method the filesystem allows
+
+    copy_file tries, in order: a reflink (shared extents, safe for any file), a
+    hardlink (immutable files only), a hardlink to an identical small file this
+    snapshot already copied (dedup), and finally a byte copy. move_file renames
+    and only falls back to copy-and-delete across filesystems.
+    """
+
+    def __init__(self, dedup: bool = True):
+        """
+        Start a snapshot
+
+        Args:
+            dedup: Hardlink byte-copied files with identical content to each other
+                (files that end up shared are made read-only)
+        """
+        self.dedup = dedup
+        self.counts: Dict[str, int] = dict.fromkeys(METHODS, 0)
+        self.bytes_copied = 0
+        self._copies: Dict[Tuple[int, str], Path] = {}
+
+    def copy_file(self, src: Path, dst: Path, immutable: bool = False) -> str:
+        """
+        Snapshot one file
+
+        Args:
+            src: Source file
+            dst: Destination (must not exist; its directory must)
+            immutable: src is never modified in place, so dst may share its inode
+
+        Returns:
+            The method used (see METHODS)
+        """
+        if reflink(src, dst):
+            return self._count("reflink")
+
+        if immutable:
+            try:
+                os.link(src, dst)
+                return self._count("hardlink")
+            except OSError:
+                pass
+
+        size = os.stat(src).st_size
+        key = None
+        if self.dedup and size <= DEDUP_MAX_BYTES:
+            key = (size, _file_digest(src))
+            first = self._copies.get(key)
+            if first is not None:
+                try:
+                    os.link(first, dst)
+                except OSError:
+                    pass
+                else:
+                    # Both names now share one inode, which must stay identical, so it becomes read-only
+                    os.chmod(dst, os.stat(dst).st_mode & ~0o222)
+                    return self._count("dedup")
+
+        shutil.copy2(src, dst)
+        self.bytes_copied += size
+        if key is not None:
+            self._copies.setdefault(key, dst)
+        return self._count("copy")
+
+    def move_file(self, src: Path, dst: Path, immutable: bool = False) -> str:
+        """
+        Move one file, by rename where possible
+
+        Args:
+            src: Source file (removed on success)
+            dst: Destination (replaced if it exists)
+            immutable: Passed to copy_file for cross-filesystem moves
+
+        Returns:
+            "move", or the copy method used before src was deleted
+        """
+        try:
+            os.replace(src, dst)
+            return self._count("move")
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+        tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+        method = self.copy_file(src, tmp, immutable)
+        os.replace(tmp, dst)
+        os.unlink(src)
+        return method
+
+    def copy_tree(self, src: Path, dst: Path):
+        """
+        Snapshot a directory tree, like cp -r src dst (symlinks are copied as symlinks)
+
+        Args:
+            src: Source directory
+            dst: Destination directory (must not exist)
+
+        Raises:
+            ValueError: If dst already exists
+        """
+        src, dst = Path(src), Path(dst)
+        if dst.exists() or dst.is_symlink():
+            raise ValueError(f"Target already exists: {dst}")
+        dst.mkdir(parents=True)
+        for root, dirs, names in os.walk(src):
+            dirs.sort()
+            relative = Path(root).relative_to(src)
+            for name in list(dirs):
+                path = Path(root) / name
+                if path.is_symlink():
+                    # os.walk would not descend anyway; recreate the link itself
+                    os.symlink(os.readlink(path), dst / relative / name)
+                    dirs.remove(name)
+                else:
+                    (dst / relative / name).mkdir()
+            for name in sorted(names):
+                path = Path(root) / name
+                if path.is_symlink():
+                    os.symlink(os.readlink(path), dst / relative / name)
+                elif path.is_file():
+                    self.copy_file(path, dst / relative / name, is_immutable(relative / name))
+        for root, dirs, _ in os.walk(src):
+            for name in dirs + ["."]:
+                path = Path(root) / name
+                if not path.is_symlink():
+                    shutil.copystat(path, dst / Path(root).relative_to(src) / name)
+
+    def move_tree(self, src: Path, dst: Path):
+        """
+        Move the files of a directory tree into dst, keeping src's (now empty) directories
+
+        Directories stay in place so watchers of e.g. checkpoints/ keep working.
+        Hidden files (in-flight temp files) are left alone, as with a shell glob.
+
+        Args:
+            src: Source directory
+            dst: Destination directory (created if missing)
+        """
+        src, dst = Path(src), Path(dst)
+        dst.mkdir(parents=True, exist_ok=True)
+        for root, dirs, names in os.walk(src):
+            dirs[:] = sorted(name for name in dirs if not name.startswith("."))
+            relative = Path(root).relative_to(src)
+            (dst / relative).mkdir(parents=True, exist_ok=True)
+            for name in sorted(names):
+                path = Path(root) / name
+                if name.startswith(".") or not (path.is_file() or path.is_symlink()):
+                    continue
+                self.move_file(path, dst / relative / name, is_immutable(relative / name))
+
+    def summary(self) -> str:
+        """One line describing what the snapshot did"""
+        total = sum(self.counts.values())
+        used = ", ".join(f"{n} {method}" for method, n in self.counts.items() if n)
+        return f"{total} files ({used or 'none'}); {format_bytes(self.bytes_copied)} copied"
+
+    def _count(self, method: str) -> str:
+        self.counts[method] += 1
+        return method
+
+
+def _file_digest(path: Path) -> str:
+    """SHA-256 of a file's content, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def format_bytes(size: float) -> str:
+    """Human-readable byte count"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def main():
+    """Command-line interface for snapshots"""
+    parser = argparse.ArgumentParser(description="Snapshot TeamOps run trees with reflinks, hardlinks and dedup")
+
+    subparsers = parser.add_subparsers(dest="command", help="Command to execute")
+
+    copy_parser = subparsers.add_parser("copy", help="Snapshot a file or directory to a new path (like cp -r)")
+    copy_parser.add_argument("src", help="Source file or directory")
+    copy_parser.add_argument("dst", help="Destination (must not exist)")
+    copy_parser.add_argument("--no-dedup", action="store_true", help="Don't hardlink identical copied files")
+
+    move_parser = subparsers.add_parser("move", help="Move a directory's files into another, keeping its directories")
+    move_parser.add_argument("src", help="Source directory")
+    move_parser.add_argument("dst", help="Destination directory (created if missing)")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "copy":
+            src, dst = Path(args.src), Path(args.dst)
+            # A single file has nothing in this snapshot to dedup against. Linking it to an earlier
+            # run's copy instead would make edits to the new run's TASK_SPEC.md change that run's too,
+            # so single files rely on reflinks alone
+            snapshot = Snapshotter(dedup=src.is_dir() and not args.no_dedup)
+            if src.is_dir():
+                snapshot.copy_tree(src, dst)
+            elif dst.exists():
+                raise ValueError(f"Target already exists: {dst}")
+            else:
+                snapshot.copy_file(src, dst)
+            print(f"Snapshot: {snapshot.summary()}")
+        elif args.command == "move":
+            snapshot = Snapshotter()
+            if not Path(args.src).is_dir():
+                raise ValueError(f"Not a directory: {args.src}")
+            snapshot.move_tree(Path(args.src), Path(args.dst))
+            print(f"Moved: {snapshot.summary()}")
+        else:
+            parser.print_help()
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+# tmops_tools/tmops_gc.py
+# Retention policy for .tmops: prune old runs and archives (last N, max age, byte budget), rotate logs, pack archives
+
+import os
+import sys
+import time
+import json
+import shutil
+import argparse
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Set, Tuple
+
+from checkpoint_index import CheckpointIndex, INDEX_FILENAME
+from feature_lock import FeatureLock
+from monitor_checkpoints import DEFAULT_LOG_MAX_BYTES, DEFAULT_LOG_BACKUPS, rotate_log
+from run_pack import PACK_SUFFIX, pack_run, run_name
+from snapshot import format_bytes
+
+TMOPS_DIR = Path("../.tmops")
+DEFAULT_KEEP_RUNS = 10
+
+# The lock run_manager.sh takes for new/clear; held for the whole collection of a feature
+GC_LOCK_TYPE = "run-manager"
+
+# Top-level trees left by cleanup_safe.sh (archived features, backups), collected as groups of their own
+SHARED_GROUPS = {".archive": "feature-archive", ".backups": "backup"}
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(text: str) -> int:
+    """
+    Parse a byte count such as "1048576", "500M", "2G" or "1.5GiB"
+
+    Args:
+        text: The size
+
+    Returns:
+        Bytes
+
+    Raises:
+        ValueError: If the size can't be parsed
+    """
+    value = text.strip().upper()
+    for suffix in ("IB", "B"):
+        if value.endswith(suffix) and len(value) > len(suffix):
+            value = value[:-len(suffix)]
+            break
+    unit = value[-1] if value and value[-1] in _SIZE_UNITS else ""
+    number = value[:-1] if unit else value
+    try:
+        return int(float(number) * _SIZE_UNITS[unit])
+    except ValueError:
+        raise ValueError(f"Invalid size: {text}") from None
+
+
+def disk_usage(path: Path, seen: Optional[Set[Tuple[int, int]]] = None) -> int:
+    """
+    Bytes allocated to a file or tree, like du (hardlinked files count once)
+
+    Args:
+        path: File or directory (symlinks are not followed)
+        seen: (device, inode) pairs already counted, shared across calls
+
+    Returns:
+        Allocated bytes
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [Path(path)]
+    while stack:
+        current = stack.pop()
+        try:
+            st = os.lstat(current)
+        except FileNotFoundError:
+            continue
+        if (st.st_dev, st.st_ino) not in seen:
+            seen.add((st.st_dev, st.st_ino))
+            total += st.st_blocks * 512
+        if os.path.isdir(current) and not os.path.islink(current):
+            with os.scandir(current) as entries:
+                stack.extend(Path(entry.path) for entry in entries)
+    return total
+
+
+def _last_modified(path: Path) -> float:
+    """Newest mtime of a run (its directory and the directories directly inside it)"""
+    mtime = path.lstat().st_mtime
+    if path.is_dir() and not path.is_symlink():
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    mtime = max(mtime, entry.stat(follow_symlinks=False).st_mtime)
+    return mtime
+
+
+def protected_runs(feature_dir: Path) -> Set[str]:
+    """
+    Runs that are never collected: the current run and the one it builds on
+
+    Args:
+        feature_dir: The .tmops/<feature> directory
+
+    Returns:
+        Run names
+    """
+    runs = set()
+    for link in (feature_dir / "current", feature_dir / "runs" / "current"):
+        if link.exists():
+            runs.add(link.resolve().name)
+    previous = feature_dir / "runs" / "PREVIOUS_RUN.txt"
+    if previous.is_file():
+        name = previous.read_text().strip()
+        if name:
+            runs.add(Path(name).name)
+    return runs
+
+
+def feature_history(feature_dir: Path) -> List[Dict[str, Any]]:
+    """
+    Collectable runs and archives of a feature, newest first
+
+    Args:
+        feature_dir: The .tmops/<feature> directory
+
+    Returns:
+        Entries with path, kind ("run" or "archive"), name, mtime and bytes
+    """
+    protected = protected_runs(feature_dir)
+    history = []
+    for kind, parent in (("run", feature_dir / "runs"), ("archive", feature_dir / ".archive")):
+        if not parent.is_dir():
+            continue
+        for path in parent.iterdir():
+            if path.is_symlink() or path.name.endswith(".tmp"):
+                continue
+            if not (path.is_dir() or (kind == "archive" and path.name.endswith(PACK_SUFFIX))):
+                continue
+            if kind == "run" and path.name in protected:
+                continue
+            history.append({"path": path, "kind": kind, "name": run_name(path),
+                            "mtime": _last_modified(path), "bytes": disk_usage(path)})
+    history.sort(key=lambda item: item["mtime"], reverse=True)
+    return history
+
+
+def shared_history(tmops_dir: Path, group: str) -> List[Dict[str, Any]]:
+    """
+    Entries of a top-level .archive/ or .backups/ tree, newest first
+
+    Args:
+        tmops_dir: The .tmops directory
+        group: ".archive" (features archived by cleanup_safe.sh) or ".backups"
+
+    Returns:
+        Entries like feature_history's, with kind "feature-archive" or "backup"
+    """
+    parent = tmops_dir / group
+    history = []
+    if parent.is_dir():
+        for path in parent.iterdir():
+            if path.is_dir() and not path.is_symlink():
+                history.append({"path": path, "kind": SHARED_GROUPS[group], "name": path.name,
+                                "mtime": _last_modified(path), "bytes": disk_usage(path)})
+    history.sort(key=lambda item: item["mtime"], reverse=True)
+    return history
+
+
+def budget_shortfall(histories: Dict[str, List[Dict[str, Any]]], max_bytes: int, total_bytes: int) -> int:
+    """
+    Bytes by which .tmops would still exceed the budget with every collectable entry deleted
+
+    Args:
+        histories: Collectable entries per group
+        max_bytes: Byte budget for the whole .tmops directory
+        total_bytes: Current size of .tmops
+
+    Returns:
+        The shortfall, 0 if the budget can be met
+    """
+    collectable = sum(item["bytes"] for history in histories.values() for item in history)
+    return max(0, total_bytes - collectable - max_bytes)
+
+
+def plan_deletions(histories: Dict[str, List[Dict[str, Any]]], keep_runs: Optional[int] = None,
+                   max_age: Optional[float] = None, max_bytes: Optional[int] = None,
+                   total_bytes: int = 0, now: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Apply the retention policy
+
+    Each feature keeps its newest keep_runs runs and archives, and nothing older
+    than max_age; archived features and backups are only subject to max_age. If
+    .tmops is still over max_bytes after that, the oldest remaining entries of
+    any group go until it fits. Only collectable bytes count against the budget:
+    if the rest of .tmops (current runs, locked features, indexes) is over it on
+    its own, no entry is deleted for the budget (see budget_shortfall).
+
+    Args:
+        histories: feature_history per feature, plus shared_history per top-level group
+        keep_runs: Runs and archives to keep per feature (None keeps all)
+        max_age: Maximum age in seconds (None for no limit)
+        max_bytes: Byte budget for the whole .tmops directory (None for no budget)
+        total_bytes: Current size of .tmops
+        now: Reference time (default: now)
+
+    Returns:
+        History entries to delete, each with feature (the group) and reason added
+    """
+    now = time.time() if now is None else now
+    doomed = []
+    remaining = []
+    for feature, history in histories.items():
+        kept = 0
+        for item in history:
+            item = dict(item, feature=feature)
+            per_feature = item["kind"] in ("run", "archive")
+            if per_feature and keep_runs is not None and kept >= keep_runs:
+                doomed.append(dict(item, reason=f"beyond the last {keep_runs}"))
+            elif max_age is not None and now - item["mtime"] > max_age:
+                doomed.append(dict(item, reason=f"older than {max_age / 86400:g} days"))
+            else:
+                kept += per_feature
+                remaining.append(item)
+
+    if max_bytes is not None and not budget_shortfall(histories, max_bytes, total_bytes):
+        projected = total_bytes - sum(item["bytes"] for item in doomed)
+        for item in sorted(remaining, key=lambda item: item["mtime"]):
+            if projected <= max_bytes:
+                break
+            doomed.append(dict(item, reason=f"over the {format_bytes(max_bytes)} budget"))
+            projected -= item["bytes"]
+    return doomed
+
+
+def compact_logs(logs_dir: Path, max_bytes: int, backups: int, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Rotate oversized role logs and drop rotated files beyond the backup count
+
+    Logs written before rotation existed can be arbitrarily large. Rotating by
+    rename is safe while a monitor is writing: it reopens the log when the
+    file it holds was moved away.
+
+    Args:
+        logs_dir: A runs/<run>/logs directory
+        max_bytes: Rotate logs larger than this (0 disables rotation)
+        backups: Rotated files to keep per log
+        dry_run: Only report what would happen
+
+    Returns:
+        Counts of rotated logs and removed backups, and the bytes removed
+    """
+    result = {"rotated": 0, "removed": 0, "bytes": 0}
+    if not logs_dir.is_dir():
+        return result
+    for path in sorted(logs_dir.iterdir()):
+        if not path.is_file() or path.is_symlink():
+            continue
+        base, _, index = path.name.rpartition(".")
+        if base.endswith(".log") and index.isdigit():
+            if int(index) > backups:
+                result["removed"] += 1
+                result["bytes"] += path.stat().st_blocks * 512
+                if not dry_run:
+                    path.unlink()
+        elif path.name.endswith(".log") and max_bytes > 0 and path.stat().st_size > max_bytes:
+            result["rotated"] += 1
+            if not dry_run:
+                rotate_log(path, backups)
+    return result
+
+
+def _busy_lock(tmops_dir: Path, feature: str) -> Optional[str]:
+    """Name of another acquire_lock lock currently held for the feature, if any"""
+    for lock_file in sorted(tmops_dir.glob(f"{feature}.*.lock")):
+        lock_type = lock_file.name[len(feature) + 1:-len(".lock")]
+        if lock_type == GC_LOCK_TYPE:
+            continue
+        try:
+            FeatureLock(feature, lock_type, timeout=0, tmops_dir=tmops_dir).acquire().release()
+        except TimeoutError:
+            return lock_type
+    return None
+
+
+def collect_garbage(tmops_dir: Path = TMOPS_DIR, features: Optional[List[str]] = None,
+                    keep_runs: Optional[int] = DEFAULT_KEEP_RUNS, max_age_days: Optional[float] = None,
+                    max_bytes: Optional[int] = None, log_max_bytes: int = DEFAULT_LOG_MAX_BYTES,
+                    log_backups: int = DEFAULT_LOG_BACKUPS, pack: bool = True,
+                    dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Enforce the retention policy on .tmops
+
+    Features whose run-manager lock (or any other acquire_lock lock) is held are
+    skipped entirely; the others stay locked against run_manager.sh until done.
+    The current run and PREVIOUS_RUN are never deleted. When collecting all
+    features, the top-level .archive/ and .backups/ trees are collected too.
+
+    Args:
+        tmops_dir: The .tmops directory
+        features: Features to collect (default: all)
+        keep_runs: Runs and archives to keep per feature (None keeps all)
+        max_age_days: Delete runs and archives older than this
+        max_bytes: Byte budget for the whole .tmops directory
+        log_max_bytes: Rotate role logs larger than this
+        log_backups: Rotated files to keep per log
+        pack: Pack the loose archives that are kept (see run_pack.py)
+        dry_run: Only report what would happen
+
+    Returns:
+        Report with bytes_before, bytes_after, reclaimed, warnings, and per-feature actions
+    """
+    tmops_dir = Path(tmops_dir)
+    if not tmops_dir.is_dir():
+        raise ValueError(f"Directory not found: {tmops_dir}")
+    shared = features is None
+    if features is None:
+        features = sorted(path.name for path in tmops_dir.iterdir()
+                          if path.is_dir() and not path.is_symlink() and not path.name.startswith(".")
+                          and ((path / "runs").is_dir() or (path / ".archive").is_dir()))
+
+    report: Dict[str, Any] = {"dry_run": dry_run, "features": {}, "skipped": {}, "warnings": []}
+    locks = []
+    try:
+        histories = {}
+        for feature in features:
+            if not (tmops_dir / feature).is_dir():
+                report["skipped"][feature] = "not found"
+                continue
+            lock = FeatureLock(feature, GC_LOCK_TYPE, timeout=0, tmops_dir=tmops_dir)
+            try:
+                lock.acquire()
+            except TimeoutError:
+                report["skipped"][feature] = f"{GC_LOCK_TYPE} lock held"
+                continue
+            busy = _busy_lock(tmops_dir, feature)
+            if busy:
+                lock.release()
+                report["skipped"][feature] = f"{busy} lock held"
+                continue
+            locks.append(lock)
+            histories[feature] = feature_history(tmops_dir / feature)
+        if shared:
+            for group in SHARED_GROUPS:
+                if (tmops_dir / group).is_dir():
+                    histories[group] = shared_history(tmops_dir, group)
+
+        bytes_before = disk_usage(tmops_dir)
+        shortfall = budget_shortfall(histories, max_bytes, bytes_before) if max_bytes is not None else 0
+        if shortfall:
+            report["warnings"].append(
+                f"The {format_bytes(max_bytes)} budget can't be met: .tmops would still be "
+                f"{format_bytes(shortfall)} over it with every collectable run, archive and backup deleted, "
+                f"so none were deleted for the budget")
+        doomed = plan_deletions(histories, keep_runs,
+                                max_age_days * 86400 if max_age_days is not None else None,
+                                max_bytes, bytes_before)
+        doomed_paths = {item["path"] for item in doomed}
+
+        for feature, history in histories.items():
+            actions: Dict[str, Any] = {"deleted": [], "packed": [], "logs": {"rotated": 0, "removed": 0}}
+            reclaimed = 0
+            forgotten = []
+            for item in doomed:
+                if item["feature"] != feature:
+                    continue
+                actions["deleted"].append({"kind": item["kind"], "name": item["path"].name,
+                                           "bytes": item["bytes"], "reason": item["reason"]})
+                reclaimed += item["bytes"]
+                if not dry_run:
+                    if item["path"].is_dir():
+                        shutil.rmtree(item["path"])
+                    else:
+                        item["path"].unlink()
+                    if item["kind"] == "run":
+                        forgotten.append(item["name"])
+
+            index_file = tmops_dir / feature / INDEX_FILENAME
+            if forgotten and index_file.exists():
+                index = CheckpointIndex(tmops_dir / feature)
+                try:
+                    for run in forgotten:
+                        index.forget(run)
+                finally:
+                    index.close()
+
+            if feature in SHARED_GROUPS:
+                actions["reclaimed"] = reclaimed
+                report["features"][feature] = actions
+                continue
+
+            runs_dir = tmops_dir / feature / "runs"
+            kept = [item["path"] for item in history if item["path"] not in doomed_paths and item["path"].is_dir()]
+            if runs_dir.is_dir():
+                kept += [path for path in runs_dir.iterdir()
+                         if path.is_dir() and not path.is_symlink() and path not in kept]
+            for run_dir in kept:
+                logs = compact_logs(run_dir / "logs", log_max_bytes, log_backups, dry_run)
+                actions["logs"]["rotated"] += logs["rotated"]
+                actions["logs"]["removed"] += logs["removed"]
+                reclaimed += logs["bytes"]
+
+            if pack:
+                for item in history:
+                    if item["kind"] == "archive" and item["path"] not in doomed_paths and item["path"].is_dir():
+                        if not dry_run:
+                            try:
+                                pack_run(item["path"])
+                            except (ValueError, OSError) as e:
+                                print(f"Warning: archive left unpacked: {e}", file=sys.stderr)
+                                continue
+                        actions["packed"].append(item["path"].name)
+
+            actions["reclaimed"] = reclaimed
+            report["features"][feature] = actions
+
+        report["bytes_before"] = bytes_before
+        if dry_run:
+            report["bytes_after"] = bytes_before - sum(a["reclaimed"] for a in report["features"].values())
+        else:
+            report["bytes_after"] = disk_usage(tmops_dir)
+        report["reclaimed"] = report["bytes_before"] - report["bytes_after"]
+    finally:
+        for lock in locks:
+            lock.release()
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """
+    Render a collect_garbage report for the terminal
+
+    Args:
+        report: Result of collect_garbage
+
+    Returns:
+        Report text
+    """
+    lines = []
+    prefix = "Would " if report["dry_run"] else ""
+    for feature, actions in report["features"].items():
+        lines.append(f"{feature}:")
+        start = len(lines)
+        for item in actions["deleted"]:
+            lines.append(f"  {prefix}delete {item['kind']} {item['name']} "
+                         f"({format_bytes(item['bytes'])}, {item['reason']})")
+        for name in actions["packed"]:
+            lines.append(f"  {prefix}pack archive {name}")
+        logs = actions["logs"]
+        if logs["rotated"] or logs["removed"]:
+            lines.append(f"  {prefix}rotate {logs['rotated']} logs, remove {logs['removed']} old log files")
+        if len(lines) == start:
+            lines.append("  nothing to do")
+    for feature, reason in report["skipped"].items():
+        lines.append(f"{feature}: skipped ({reason})")
+    for warning in report["warnings"]:
+        lines.append(f"Warning: {warning}")
+    if report["reclaimed"] >= 0:
+        change = f"{'would reclaim' if report['dry_run'] else 'reclaimed'} {format_bytes(report['reclaimed'])}"
+    else:
+        # Packing can cost a little more than the loose files it replaces
+        change = f"grew by {format_bytes(-report['reclaimed'])}"
+    lines.append(f"\n.tmops: {format_bytes(report['bytes_before'])} -> {format_bytes(report['bytes_after'])} "
+                 f"({change})")
+    return "\n".join(lines)
+
+
+def main():
+    """Command-line interface for .tmops garbage collection"""
+    parser = argparse.ArgumentParser(description="Prune old TeamOps runs and archives according to a retention policy",
+                                     epilog="The current run and PREVIOUS_RUN are always kept; features with a "
+                                            "held lock (run_manager.sh, preflight, ...) are skipped.")
+    parser.add_argument("features", nargs="*", help="Features to collect (default: all)")
+    parser.add_argument("--keep-runs", type=int, default=int(os.environ.get("TMOPS_GC_KEEP_RUNS", DEFAULT_KEEP_RUNS)),
+                        help="Runs and archives to keep per feature, newest first "
+                             "(default: TMOPS_GC_KEEP_RUNS or %(default)s; 0 keeps only the current and previous run)")
+    parser.add_argument("--max-age", type=float, metavar="DAYS",
+                        default=float(os.environ["TMOPS_GC_MAX_AGE_DAYS"]) if os.environ.get("TMOPS_GC_MAX_AGE_DAYS")
+                        else None,
+                        help="Delete runs and archives not modified for this many days (default: TMOPS_GC_MAX_AGE_DAYS)")
+    parser.add_argument("--max-bytes", type=parse_size, metavar="SIZE", default=os.environ.get("TMOPS_GC_MAX_BYTES"),
+                        help="Byte budget for all of .tmops, e.g. 2G; the oldest runs, archives and backups go "
+                             "first, and nothing is deleted for it if it can't be met (default: TMOPS_GC_MAX_BYTES)")
+    parser.add_argument("--tmops-dir", default=str(TMOPS_DIR), help="The .tmops directory (default: %(default)s)")
+    parser.add_argument("--no-pack", action="store_true", help="Leave kept archives loose instead of packing them")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would be deleted without changing anything")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    args = parser.parse_args()
+
+    if args.keep_runs < 0:
+        parser.error("--keep-runs must not be negative")
+    if args.max_age is not None and args.max_age < 0:
+        parser.error("--max-age must not be negative")
+
+    try:
+        report = collect_garbage(
+            Path(args.tmops_dir), args.features or None, keep_runs=args.keep_runs, max_age_days=args.max_age,
+            max_bytes=args.max_bytes,
+            log_max_bytes=int(os.environ.get("TMOPS_LOG_MAX_BYTES", DEFAULT_LOG_MAX_BYTES)),
+            log_backups=int(os.environ.get("TMOPS_LOG_BACKUPS", DEFAULT_LOG_BACKUPS)),
+            pack=not args.no_pack and os.environ.get("TMOPS_PACK_ARCHIVES", "1") != "0",
+            dry_run=args.dry_run)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        for warning in report["warnings"]:
+            print(f"Warning: {warning}", file=sys.stderr)
+    else:
+        print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
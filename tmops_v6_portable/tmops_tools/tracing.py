@@ -0,0 +1,169 @@
+# tmops_tools/tracing.py
+# Nested timed spans written as Chrome trace JSON, plus opt-in cProfile dumps
+
+import os
+import sys
+import json
+import time
+import cProfile
+import threading
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterator
+
+# Set to 1/true/yes/on to trace every run of the tools without passing --trace
+TRACE_ENV = "TMOPS_TRACE"
+
+# A reusable no-op context manager (contextlib.nullcontext needs Python 3.7)
+_NO_SPAN = suppress()
+
+
+class Tracer:
+    """Collects complete ("ph": "X") events in the Chrome trace event format"""
+
+    def __init__(self, tool: str):
+        """
+        Start a trace
+
+        Args:
+            tool: Name of the traced tool, used in the file name
+        """
+        self.tool = tool
+        self.pid = os.getpid()
+        self.started = datetime.now()
+        self.events: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter()
+        self._threads: Dict[int, str] = {}
+
+    @contextmanager
+    def span(self, name: str, category: str = "tmops", **args) -> Iterator[Dict[str, Any]]:
+        """
+        Time the enclosed block as one span
+
+        Spans opened inside the block nest below it in the trace viewer.
+
+        Args:
+            name: Span name (e.g. "parse_checkpoint")
+            category: Event category, for filtering in the viewer
+            **args: Details shown with the span
+
+        Yields:
+            The span's args dict, so details known only at the end can be added
+        """
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter()
+            tid = _thread_id()
+            if tid not in self._threads:
+                self._threads[tid] = threading.current_thread().name
+            event = {"name": name, "cat": category, "ph": "X", "pid": self.pid, "tid": tid,
+                     "ts": (start - self._origin) * 1e6, "dur": (end - start) * 1e6}
+            if args:
+                event["args"] = args
+            self.events.append(event)
+
+    def write(self, log_dir: Path) -> Path:
+        """
+        Write the trace as JSON (open in chrome://tracing or ui.perfetto.dev)
+
+        Args:
+            log_dir: Directory to write to, normally runs/<run>/logs
+
+        Returns:
+            Path of the trace file
+        """
+        log_dir = Path(log_dir)
+        log_dir.mkdir(parents=True, exist_ok=True)
+        path = log_dir / f"trace-{self.tool}-{self.started:%Y%m%d-%H%M%S}-{self.pid}.json"
+
+        metadata = [{"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": self.tool}}]
+        metadata += [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+                     for tid, name in self._threads.items()]
+        document = {
+            "traceEvents": metadata + sorted(self.events, key=lambda e: e["ts"]),
+            "displayTimeUnit": "ms",
+            "otherData": {"tool": self.tool, "started": self.started.isoformat(), "argv": sys.argv},
+        }
+
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_text(json.dumps(document))
+        os.replace(tmp_path, path)
+        return path
+
+
+_tracer: Optional[Tracer] = None
+
+
+def _thread_id() -> int:
+    """OS thread id shown in the trace viewer (the Python thread id before 3.8)"""
+    get_native_id = getattr(threading, "get_native_id", threading.get_ident)
+    return get_native_id()
+
+
+def span(name: str, category: str = "tmops", **args):
+    """
+    Time a block if tracing is on; a shared no-op context otherwise
+
+    Args:
+        name: Span name
+        category: Event category
+        **args: Details shown with the span
+
+    Returns:
+        A context manager
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NO_SPAN
+    return tracer.span(name, category, **args)
+
+
+def tracing_requested(flag: bool = False) -> bool:
+    """Whether --trace was given or TMOPS_TRACE is set"""
+    return flag or os.environ.get(TRACE_ENV, "").lower() in ("1", "true", "yes", "on")
+
+
+@contextmanager
+def instrumented(tool: str, log_dir: Path, trace: bool = False, profile: bool = False) -> Iterator[None]:
+    """
+    Trace and/or profile the enclosed block and write the results to log_dir
+
+    The trace goes to trace-<tool>-<time>-<pid>.json and the cProfile stats to
+    profile-<tool>-<time>-<pid>.prof (read with python -m pstats). Both paths
+    are reported on stderr, also when the block exits with an error.
+
+    Args:
+        tool: Name of the tool
+        log_dir: Output directory, normally runs/<run>/logs
+        trace: Trace even if TMOPS_TRACE is not set
+        profile: Run the block under cProfile
+    """
+    global _tracer
+    tracer = Tracer(tool) if tracing_requested(trace) else None
+    profiler = cProfile.Profile() if profile else None
+
+    _tracer = tracer
+    if profiler:
+        profiler.enable()
+    try:
+        with span(tool, "main"):
+            yield
+    finally:
+        if profiler:
+            profiler.disable()
+        _tracer = None
+
+        started = tracer.started if tracer else datetime.now()
+        try:
+            if tracer:
+                print(f"Trace written to {tracer.write(log_dir)}", file=sys.stderr)
+            if profiler:
+                Path(log_dir).mkdir(parents=True, exist_ok=True)
+                path = Path(log_dir) / f"profile-{tool}-{started:%Y%m%d-%H%M%S}-{os.getpid()}.prof"
+                profiler.dump_stats(path)
+                print(f"Profile written to {path}", file=sys.stderr)
+        except OSError as e:
+            print(f"Warning: could not write trace/profile to {log_dir}: {e}", file=sys.stderr)
@@ -0,0 +1,174 @@
+# tmops_tools/wait_stats.py
+# Cumulative checkpoint wait statistics per feature and role, with Prometheus textfile export
+
+import os
+import json
+import fcntl
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+# node_exporter's textfile collector reads *.prom from one directory. Dotted so
+# feature listings, fleet extraction and gc never take it for a feature named "metrics"
+DEFAULT_METRICS_DIR = Path("../.tmops/.metrics")
+STATS_VERSION = 1
+
+# Upper bounds (seconds) of the histogram buckets; +Inf is implicit
+HISTOGRAM_BUCKETS = {
+    "glob_seconds": [0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0],
+    "detect_latency_seconds": [0.01, 0.05, 0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0],
+    "wait_seconds": [1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0],
+}
+
+_HISTOGRAM_HELP = {
+    "glob_seconds": "Time spent globbing the checkpoint directory per poll",
+    "detect_latency_seconds": "Gap between a checkpoint's mtime and the waiter noticing it",
+    "wait_seconds": "Total duration of checkpoint waits",
+}
+
+
+class WaitRecord:
+    """Counters and samples collected during a single wait_for_checkpoint call"""
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.polls = 0
+        self.listings = 0
+        self.wakeups = 0
+        self.glob_seconds: List[float] = []
+        self.detect_latency: Optional[float] = None
+        self.wait_seconds = 0.0
+        self.outcome = "pending"
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-wait fields for the found/timeout log events"""
+        return {"polls": self.polls, "listings": self.listings, "wakeups": self.wakeups,
+                "glob_seconds_total": round(sum(self.glob_seconds), 6),
+                "detect_latency_seconds": None if self.detect_latency is None else round(self.detect_latency, 3)}
+
+
+class WaitStats:
+    """Cumulative wait statistics of one feature/role, stored next to its .prom file"""
+
+    def __init__(self, feature: str, role: str, metrics_dir: Optional[Path] = None):
+        """
+        Initialize the stats store
+
+        Args:
+            feature: The feature name
+            role: The instance role
+            metrics_dir: Output directory (default: TMOPS_METRICS_DIR or ../.tmops/.metrics)
+        """
+        self.feature = feature
+        self.role = role
+        self.metrics_dir = Path(metrics_dir or os.environ.get("TMOPS_METRICS_DIR") or DEFAULT_METRICS_DIR)
+        self.stats_file = self.metrics_dir / f"{feature}.{role}.stats.json"
+        self.prom_file = self.metrics_dir / f"{feature}.{role}.prom"
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Read the cumulative stats
+
+        Returns:
+            Stats dict (zeroed if nothing was recorded yet)
+        """
+        try:
+            stats = json.loads(self.stats_file.read_text())
+            if stats.get("version") == STATS_VERSION:
+                return stats
+        except (OSError, ValueError):
+            pass
+        return {
+            "version": STATS_VERSION,
+            "feature": self.feature,
+            "role": self.role,
+            "waits": {"found": 0, "timeout": 0},
+            "polls_total": 0,
+            "listings_total": 0,
+            "wakeups_total": 0,
+            "histograms": {name: {"buckets": bounds, "counts": [0] * (len(bounds) + 1), "sum": 0.0, "count": 0}
+                           for name, bounds in HISTOGRAM_BUCKETS.items()},
+            "last_wait": None,
+        }
+
+    def record(self, wait: WaitRecord):
+        """
+        Fold one finished wait into the stats and rewrite both output files
+
+        Args:
+            wait: The finished wait
+        """
+        self.metrics_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.metrics_dir / f"{self.feature}.{self.role}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+            stats = self.load()
+            stats["waits"][wait.outcome] = stats["waits"].get(wait.outcome, 0) + 1
+            stats["polls_total"] += wait.polls
+            stats["listings_total"] = stats.get("listings_total", 0) + wait.listings
+            stats["wakeups_total"] += wait.wakeups
+            for value in wait.glob_seconds:
+                self._observe(stats, "glob_seconds", value)
+            if wait.detect_latency is not None:
+                self._observe(stats, "detect_latency_seconds", wait.detect_latency)
+            self._observe(stats, "wait_seconds", wait.wait_seconds)
+            stats["last_wait"] = dict(wait.summary(), pattern=wait.pattern, outcome=wait.outcome,
+                                      wait_seconds=round(wait.wait_seconds, 3))
+
+            self._write(self.stats_file, json.dumps(stats, indent=2))
+            self._write(self.prom_file, self.prometheus(stats))
+
+    def prometheus(self, stats: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Render stats in the Prometheus text exposition format
+
+        Args:
+            stats: Stats to render (default: load from disk)
+
+        Returns:
+            The textfile contents
+        """
+        stats = stats or self.load()
+        labels = f'feature="{self.feature}",role="{self.role}"'
+        lines = [
+            "# HELP tmops_checkpoint_waits_total Checkpoint waits by outcome",
+            "# TYPE tmops_checkpoint_waits_total counter",
+        ]
+        for outcome, count in sorted(stats["waits"].items()):
+            lines.append(f'tmops_checkpoint_waits_total{{{labels},outcome="{outcome}"}} {count}')
+        lines += [
+            "# HELP tmops_checkpoint_wait_polls_total Directory checks performed while waiting",
+            "# TYPE tmops_checkpoint_wait_polls_total counter",
+            f"tmops_checkpoint_wait_polls_total{{{labels}}} {stats['polls_total']}",
+            "# HELP tmops_checkpoint_wait_listings_total Directory listings performed while waiting",
+            "# TYPE tmops_checkpoint_wait_listings_total counter",
+            f"tmops_checkpoint_wait_listings_total{{{labels}}} {stats.get('listings_total', 0)}",
+            "# HELP tmops_checkpoint_wait_wakeups_total inotify wake-ups while waiting",
+            "# TYPE tmops_checkpoint_wait_wakeups_total counter",
+            f"tmops_checkpoint_wait_wakeups_total{{{labels}}} {stats['wakeups_total']}",
+        ]
+        for name, hist in stats["histograms"].items():
+            metric = f"tmops_checkpoint_{name}"
+            lines += [f"# HELP {metric} {_HISTOGRAM_HELP[name]}", f"# TYPE {metric} histogram"]
+            cumulative = 0
+            for bound, count in zip(hist["buckets"] + ["+Inf"], hist["counts"]):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{metric}_sum{{{labels}}} {hist['sum']}")
+            lines.append(f"{metric}_count{{{labels}}} {hist['count']}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _observe(stats: Dict[str, Any], name: str, value: float):
+        """Add one sample to a histogram"""
+        hist = stats["histograms"][name]
+        index = next((i for i, bound in enumerate(hist["buckets"]) if value <= bound), len(hist["buckets"]))
+        hist["counts"][index] += 1
+        hist["sum"] += value
+        hist["count"] += 1
+
+    @staticmethod
+    def _write(path: Path, text: str):
+        """Atomically replace a file so collectors never read a partial one"""
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(text)
+        os.replace(tmp, path)